@@ -1,63 +1,81 @@
 # agents/nust_agent.py
-import os
-import json
 import asyncio
-from bs4 import BeautifulSoup
 from tools.university_scraper_agent import UniversityScraperAgent
 from tools.web_scraper import WebScraper
-from database.supabase_client import SupabaseClient
+from tools.pdf_downloader import is_pdf_link
+from core.corrections import CorrectionsService
+from database.storage import StorageBackend
+from database.async_supabase_client import AsyncSupabaseClient
+from database.visited_url_buffer import VisitedUrlBuffer
 
 class NustAgent(UniversityScraperAgent):
     name = "nust_agent"
+    base_domain = "https://nust.edu.pk"
+    default_start_urls = [
+        "https://ugadmissions.nust.edu.pk/",
+        "https://nust.edu.pk/academics/undergraduate",
+        "https://nust.edu.pk/admissions/undergraduates/list-of-ug-programmes-and-institutions/",
+    ]
 
-    def __init__(self, supabase_client: SupabaseClient):
+    def __init__(self, supabase_client: StorageBackend, corrections: CorrectionsService = None,
+                 start_urls: list = None, base_domain: str = None):
         self.supabase_client = supabase_client
-        self.known_programs = self.supabase_client.get_corrected_programs("NUST")
+        self.corrections = corrections or CorrectionsService(self.supabase_client)
+        self.known_programs = self.corrections.get("NUST")
         self.visited = set(self.supabase_client.get_visited_urls("NUST"))
+        self.async_db = AsyncSupabaseClient(self.supabase_client)
+        self.visited_buffer = VisitedUrlBuffer(
+            self.async_db, spill_path=f"memory/{self.name}/pending_visited_urls.json"
+        )
         self.scraper = WebScraper()
-        self.start_urls = [
-            "https://ugadmissions.nust.edu.pk/",
-            "https://nust.edu.pk/academics/undergraduate",
-            "https://nust.edu.pk/admissions/undergraduates/list-of-ug-programmes-and-institutions/",
-        ]
+        self.pdf_links = set()
+        self.start_urls = list(start_urls or self.default_start_urls)
+        if base_domain:
+            self.base_domain = base_domain.rstrip("/")
         self.scraped_pages = []
 
     async def extract_programs(self):
         await self.scraper.setup()
+        # Pages are appended to the store as they are scraped
+        self.page_store.clear()
 
         for url in self.start_urls:
             if url in self.visited:
                 continue
             page_data = await self.scraper.get_page_data(url)
             if page_data and page_data["url"] not in self.visited:
-                self.scraped_pages.append(page_data)
-                self.supabase_client.save_visited_url("NUST", page_data["url"])
+                self._store_page(page_data)
+                self.visited_buffer.add("NUST", page_data["url"])
                 self.visited.add(page_data["url"])
 
-                soup = BeautifulSoup(page_data["html"], "html.parser")
+                anchors = self._page_anchors(page_data)
+                self.pdf_links.update(self._pdf_links(anchors, page_data["url"]))
                 internal_links = {
-                    a["href"] if a["href"].startswith("http") else "https://nust.edu.pk" + a["href"]
-                    for a in soup.find_all("a", href=True)
+                    a["href"] if a["href"].startswith("http") else self.base_domain + a["href"]
+                    for a in anchors
                     if any(k in a["href"].lower() for k in ["program", "faculty", "admission"])
+                    and not is_pdf_link(a["href"])
                 }
+                # The HTML is in the page store; don't hold it through the sub-page crawl
+                page_data.pop("html", None)
 
                 for link in internal_links:
                     if link not in self.visited:
                         try:
                             sub_page = await self.scraper.get_page_data(link)
                             if sub_page:
-                                self.scraped_pages.append(sub_page)
-                                self.supabase_client.save_visited_url("NUST", link)
+                                self._store_page(sub_page)
+                                self.visited_buffer.add("NUST", link)
                                 self.visited.add(link)
                                 await asyncio.sleep(1)
                         except Exception as e:
                             print(f"⚠️ Error fetching {link}: {e}")
 
         await self.scraper.close()
-
-        os.makedirs("memory/nust_agent", exist_ok=True)
-        with open("memory/nust_agent/scraped_pages.json", "w", encoding="utf-8") as f:
-            json.dump(self.scraped_pages, f, indent=2, ensure_ascii=False)
+        await self.process_pdf_links(self.pdf_links)
+        await self.visited_buffer.close()
+        await self.async_db.close()
+        self.page_store.close()
 
         print(f"✅ Scraped {len(self.scraped_pages)} pages for NUST.")
         return self.scraped_pages
\ No newline at end of file
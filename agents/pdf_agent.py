@@ -1,16 +1,37 @@
 # agents/pdf_agent.py
 
 import os
-from tools.pdf_extractor import extract_text_from_pdf
-from tools.classify_programs import classify_programs
+from tools.pdf_cache import PDFPageCache
+from tools.pdf_extractor import iter_pdf_pages
+from tools.classify_programs import classify_stream
 
 class PDFAgent:
-    def __init__(self, file_path):
+    def __init__(self, file_path, ocr=True, max_workers=None, cache=None):
         self.file_path = file_path
+        self.ocr = ocr
+        self.max_workers = max_workers
+        # Pass cache=False to always re-extract; the default reuses memory/pdf_cache.db
+        self.cache = PDFPageCache() if cache is None else (cache or None)
+        self.stats = {"pages": 0, "ocr_pages": 0, "lines": 0}
+
+    def _iter_lines(self):
+        pages = iter_pdf_pages(self.file_path, ocr=self.ocr, max_workers=self.max_workers, cache=self.cache)
+        for page in pages:
+            self.stats["pages"] += 1
+            if page["source"] == "ocr":
+                self.stats["ocr_pages"] += 1
+            for line in page["text"].split('\n'):
+                if line.strip():
+                    self.stats["lines"] += 1
+                    yield line.strip()
+
+    def iter_programs(self):
+        """Yield programs as each page is extracted, instead of after the whole PDF."""
+        yield from classify_stream(self._iter_lines())
 
     def extract_programs(self):
         print(f"📄 Extracting text from PDF: {self.file_path}")
-        
+
         # File existence check
         if not os.path.exists(self.file_path):
             print("❌ PDF file not found.")
@@ -22,17 +43,12 @@ class PDFAgent:
             return []
 
         try:
-            raw_text = extract_text_from_pdf(self.file_path)
+            structured_programs = list(self.iter_programs())
         except Exception as e:
             print(f"❌ Error reading PDF: {e}")
             return []
 
-        lines = raw_text.split('\n')
-        cleaned_lines = [line.strip() for line in lines if line.strip()]
-
-        print(f"📊 {len(cleaned_lines)} lines extracted from PDF.")
-
-        structured_programs = classify_programs(cleaned_lines)
+        print(f"📊 {self.stats['lines']} lines extracted from {self.stats['pages']} pages ({self.stats['ocr_pages']} OCR'd).")
 
         print(f"✅ {len(structured_programs)} programs detected.")
         return structured_programs
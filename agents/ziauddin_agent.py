@@ -2,11 +2,16 @@
 import os
 import json
 import asyncio
-from bs4 import BeautifulSoup
 from typing import Dict, List, Set
 from tools.university_scraper_agent import UniversityScraperAgent
 from tools.web_scraper import WebScraper
+from tools.pdf_downloader import is_pdf_link
 from database.supabase_client import SupabaseClient
+from core.corrections import CorrectionsService
+from core.metrics import host_of, metrics
+from database.storage import StorageBackend
+from database.async_supabase_client import AsyncSupabaseClient
+from database.visited_url_buffer import VisitedUrlBuffer
 import logging
 from urllib.parse import urljoin, urlparse
 
@@ -16,25 +21,44 @@ logger = logging.getLogger(__name__)
 
 class ZiauddinAgent(UniversityScraperAgent):
     name = "ziauddin_agent"
+    # Point both at tools/fixture_site_server.py to crawl a local replay or synthetic site
+    base_domain = "https://zu.edu.pk"
+    default_start_urls = [
+        "https://zu.edu.pk/undergraduate-programmes/",
+        "https://admission.zu.edu.pk/programs-list-table",
+        "https://zu.edu.pk/",
+    ]
 
     def __init__(
         self,
-        supabase_client: SupabaseClient,
+        supabase_client: StorageBackend,
         max_internal_links: int = 3,
         min_text_length: int = 200,
         delay_min: float = 10.0,
-        delay_max: float = 15.0
+        delay_max: float = 15.0,
+        extraction_mode: str = "html",
+        corrections: CorrectionsService = None,
+        start_urls: List[str] = None,
+        base_domain: str = None
     ):
         """Initialize agent with configurable parameters."""
         self.supabase_client = supabase_client
-        self.known_programs = self.supabase_client.get_corrected_programs("Ziauddin University")
+        # Shared with main.py so corrections are loaded once per run
+        self.corrections = corrections or CorrectionsService(self.supabase_client)
+        self.known_programs = self.corrections.get("Ziauddin University")
         self.visited = set(self.supabase_client.get_visited_urls("Ziauddin University"))
-        self.scraper = WebScraper()
-        self.start_urls = [
-            "https://zu.edu.pk/undergraduate-programmes/",
-            "https://admission.zu.edu.pk/programs-list-table",
-            "https://zu.edu.pk/",
-        ]
+        # Database calls made during the crawl run off the event loop
+        self.async_db = AsyncSupabaseClient(self.supabase_client)
+        # Visited URLs are written behind the crawl in batches
+        self.visited_buffer = VisitedUrlBuffer(
+            self.async_db, spill_path=f"memory/{self.name}/pending_visited_urls.json"
+        )
+        self.scraper = WebScraper(extraction_mode=extraction_mode)
+        # Prospectus PDFs seen during the crawl, processed after it
+        self.pdf_links = set()
+        self.start_urls = list(start_urls or self.default_start_urls)
+        if base_domain:
+            self.base_domain = base_domain.rstrip("/")
         self.scraped_pages = []
         self.extracted_programs = []
         self.max_internal_links = max_internal_links
@@ -54,7 +78,10 @@ class ZiauddinAgent(UniversityScraperAgent):
     async def close(self):
         """Close the scraper with cleanup logging."""
         try:
+            await self.visited_buffer.close()
+            await self.async_db.close()
             await self.scraper.close()
+            self.page_store.close()
             logger.info("🔒 ZiauddinAgent closed")
         except Exception as e:
             logger.error(f"❌ Close failed: {e}")
@@ -62,9 +89,16 @@ class ZiauddinAgent(UniversityScraperAgent):
 
     def _extract_program_links(self, html: str, base_url: str) -> Set[str]:
         """Extract internal links with keyword filtering - simplified version."""
-        soup = BeautifulSoup(html, "html.parser")
+        anchors = self._page_anchors({"html": html})
+        return self._filter_program_links(anchors, base_url)
+
+    def _filter_program_links(self, anchors: List[Dict], base_url: str) -> Set[str]:
+        """Keep program-related internal links from a list of {"text", "href"} anchors."""
         internal_links = set()
-        base_domain = "https://zu.edu.pk"
+        base_domain = self.base_domain
+        # Subdomains such as admission.zu.edu.pk count as internal
+        site = urlparse(base_domain).hostname or ""
+        site = site[4:] if site.startswith("www.") else site
         
         # Use the working keyword list from old code
         program_keywords = [
@@ -73,20 +107,24 @@ class ZiauddinAgent(UniversityScraperAgent):
             "department", "school", "college", "bs", "ms", "mba", "bba", "programmes"
         ]
         
-        for a in soup.find_all("a", href=True):
+        for a in anchors:
             href = a["href"].strip()
-            text = a.get_text().strip().lower()
+            text = (a.get("text") or "").strip().lower()
+            if is_pdf_link(href):
+                continue
             
             # Check if URL or text contains program keywords
             if any(keyword in href.lower() or keyword in text for keyword in program_keywords):
                 if href.startswith("http"):
-                    if "zu.edu.pk" in href:
+                    host = urlparse(href).hostname or ""
+                    if host == site or host.endswith("." + site):
                         internal_links.add(href)
                 elif href.startswith("/"):
                     internal_links.add(base_domain + href)
                 elif not href.startswith("#") and not href.startswith("mailto:"):
                     internal_links.add(base_domain + "/" + href)
         
+        metrics.incr("program_links", len(internal_links), host=host_of(base_url))
         logger.info(f"🔗 Found {len(internal_links)} program-related links from {base_url}")
         return internal_links
 
@@ -94,10 +132,12 @@ class ZiauddinAgent(UniversityScraperAgent):
         """Extract programs from all start URLs - simplified approach."""
         try:
             await self.setup()
+            # Pages are appended to the store as they are scraped
+            self.page_store.clear()
             logger.info(f"🚀 Starting extraction for {len(self.start_urls)} URLs")
 
             if not force_scrape:
-                self.visited = set(self.supabase_client.get_visited_urls("Ziauddin University"))
+                self.visited = set(await self.async_db.get_visited_urls("Ziauddin University"))
                 logger.info(f"📂 Loaded {len(self.visited)} previously visited URLs")
 
             for i, url in enumerate(self.start_urls):
@@ -116,15 +156,19 @@ class ZiauddinAgent(UniversityScraperAgent):
                         logger.info(f"✅ Successfully scraped: {url} (text length: {text_length})")
                         
                         if text_length > self.min_text_length:
-                            self.scraped_pages.append(page_data)
+                            self._store_page(page_data)
                             
                             if url not in self.visited:
-                                self.supabase_client.save_visited_url("Ziauddin University", page_data["url"])
+                                self.visited_buffer.add("Ziauddin University", page_data["url"])
                                 self.visited.add(page_data["url"])
 
                             # Extract and process internal links
-                            if page_data.get("html"):
-                                internal_links = self._extract_program_links(page_data["html"], url)
+                            if page_data.get("html") or page_data.get("links"):
+                                anchors = self._page_anchors(page_data)
+                                self.pdf_links.update(self._pdf_links(anchors, url))
+                                internal_links = self._filter_program_links(anchors, url)
+                                # The HTML is in the page store; don't hold it through the sub-page crawl
+                                page_data.pop("html", None)
                                 
                                 for j, link in enumerate(list(internal_links)[:self.max_internal_links]):
                                     if link not in self.visited or force_scrape:
@@ -134,9 +178,10 @@ class ZiauddinAgent(UniversityScraperAgent):
                                             
                                             if sub_page and len(sub_page.get("text", "")) > self.min_text_length:
                                                 logger.info(f"✅ Successfully scraped internal link: {link}")
-                                                self.scraped_pages.append(sub_page)
+                                                self._store_page(sub_page)
+                                                self.pdf_links.update(self._pdf_links(self._page_anchors(sub_page), link))
                                                 if link not in self.visited:
-                                                    self.supabase_client.save_visited_url("Ziauddin University", link)
+                                                    self.visited_buffer.add("Ziauddin University", link)
                                                     self.visited.add(link)
                                             
                                             # Dynamic delay based on load time
@@ -164,12 +209,12 @@ class ZiauddinAgent(UniversityScraperAgent):
                     logger.info(f"⏳ Delaying for {delay:.2f}s before next start URL")
                     await asyncio.sleep(delay)
 
-            # Save data to separate files
+            logger.info(f"📄 Processing {len(self.pdf_links)} linked PDFs")
+            await self.process_pdf_links(self.pdf_links)
+
+            # Pages are already in the page store; save visited URLs separately
             os.makedirs(f"memory/{self.name}", exist_ok=True)
-            pages_file = f"memory/{self.name}/scraped_pages.json"
-            with open(pages_file, "w", encoding="utf-8") as f:
-                json.dump(self.scraped_pages, f, indent=2, ensure_ascii=False)
-            logger.info(f"💾 Saved {len(self.scraped_pages)} pages to {pages_file}")
+            logger.info(f"💾 Stored {len(self.page_store)} pages in {self.page_store.directory}")
 
             visited_file = f"memory/{self.name}/visited_urls.json"
             with open(visited_file, "w", encoding="utf-8") as f:
@@ -191,17 +236,23 @@ class ZiauddinAgent(UniversityScraperAgent):
             logger.warning("⚠️ No structured data to save")
             return
 
-        logger.info(f"💾 Saving {len(structured_data)} programs to Supabase...")
-        success_count = 0
-        for program in structured_data:
-            try:
-                self.supabase_client.upsert_extracted_program(program)
-                success_count += 1
-            except Exception as e:
-                logger.error(f"⚠️ Error saving program {program.get('program_name', 'Unknown')}: {e}")
-                continue
+        logger.info(f"💾 Syncing {len(structured_data)} programs to Supabase...")
+        try:
+            # Only new, changed and removed programs are written
+            summary = self.program_sync.sync(self.get_university_name(), structured_data)
+        except Exception as e:
+            logger.error(f"⚠️ Error saving programs: {e}")
+            return []
+
+        for outcome in summary["outcomes"]:
+            if outcome["status"] != "upserted":
+                logger.error(f"⚠️ Error saving program {outcome.get('program_name') or 'Unknown'}: {outcome['status']} ({outcome['error']})")
 
-        logger.info(f"✅ Successfully saved {success_count}/{len(structured_data)} programs to Supabase")
+        logger.info(
+            f"✅ Synced {len(structured_data)} programs: {summary['inserted']} new, {summary['updated']} changed, "
+            f"{summary['deleted']} removed, {summary['unchanged']} unchanged"
+        )
+        return summary["outcomes"]
 
 if __name__ == "__main__":
     from dotenv import load_dotenv
@@ -0,0 +1,130 @@
+# benchmarks/bench_classify.py - Throughput of the program classifier on a large line corpus
+#
+#   python -m benchmarks.bench_classify --lines 200000
+#
+# Builds a corpus from the saved scraped pages (split on the scraper's " | "
+# separators) plus synthetic program/faculty/news lines and compares the
+# batch classifier against the original per-call implementation. The
+# "speedup" depends heavily on the corpus and the machine (runs have ranged
+# from about 1.25x to 2x), and the legacy baseline skips the masters and phd
+# categories, so the figures are not like-for-like.
+import argparse
+import json
+import random
+import re
+import time
+
+from tools import page_store
+from tools.classify_programs import classify_programs
+from tools.fixture_site_server import CAMPUSES, FIELDS
+
+DEFAULT_PAGES = "memory/ziauddin_agent/scraped_pages.json"
+
+SYNTHETIC = [
+    "Bachelor of Science in {field}",
+    "BS ({field})",
+    "Master of Science in {field}",
+    "MSc ({field}) Evening Program",
+    "PhD in {field} - Admissions Open",
+    "Doctor of Philosophy in {field}",
+    "MBBS Program at {campus} Campus",
+    "Dr. {name} Assistant Professor of {field}",
+    "Lecturer{name} MS {field}",
+    "{campus} campus hosts annual sports day",
+    "Seminar on {field} organized by students",
+    "Last date to apply for {field} is 10-Sep-2025",
+]
+NAMES = ["Ahmed Khan", "Sara Ali", "Bilal Raza", "Ayesha Siddiqui"]
+
+
+def legacy_classify_programs(programs):
+    """The classifier as it was before batching, kept as the benchmark baseline."""
+    faculty_prefixes = re.compile(
+        r"^(Mr|Ms|Mrs|Dr|Prof|Professor|Lecturer|Assistant Professor|Associate Professor|Engr)\b",
+        re.IGNORECASE
+    )
+
+    def is_probably_faculty(text):
+        text = text.strip()
+        text = re.sub(r"(?i)\b(Lecturer|Professor|Assistant Professor|Associate Professor|Engr)(?=[A-Z])", r"\1 ", text)
+        if faculty_prefixes.match(text):
+            return True
+        if re.search(r"\b(hosts?|organized|conducted|celebrates?|sports day|event|seminar)\b", text, re.IGNORECASE):
+            return True
+        if len(text.split()) <= 3:
+            return True
+        return False
+
+    cleaned = []
+    seen = set()
+    degree_patterns = {
+        "undergraduate": re.compile(r"\b(Bachelor of [A-Za-z\s]+|BS\s?\([A-Za-z\s]+\)|Bachelors of [A-Za-z\s]|bachelors|bachelor|bs|bsc|ba|bba|pharm[\- ]?d|mbbs|bds|b\.?ed|b\.?com|BSc)\b", re.IGNORECASE),
+        "medical": re.compile(r"\b(MBBS|BDS|BSN|Pharm[\- ]?D)\b", re.IGNORECASE)
+    }
+    for prog in programs:
+        text = prog.strip()
+        text = re.sub(r"\s+", " ", text)
+        text = re.sub(r"[^\w\s\-\&\(\)]", "", text)
+        if is_probably_faculty(text):
+            continue
+        if len(text) < 6 or len(text) > 500:
+            continue
+        if text.lower() in seen:
+            continue
+        category = None
+        for level, pattern in degree_patterns.items():
+            if pattern.search(text):
+                category = level
+                break
+        if category:
+            cleaned.append({"program_name": text, "category": category})
+            seen.add(text.lower())
+    return cleaned
+
+
+def build_corpus(pages_file: str, size: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    base = []
+    for page in page_store.load_pages(pages_file):
+        base.extend(line for line in page.get("text", "").split(" | ") if line.strip())
+    lines = []
+    while len(lines) < size:
+        if base and rng.random() < 0.6:
+            line = rng.choice(base)
+        else:
+            line = rng.choice(SYNTHETIC).format(
+                field=rng.choice(FIELDS), campus=rng.choice(CAMPUSES), name=rng.choice(NAMES)
+            )
+        # Vary lines so deduplication doesn't short-circuit the work
+        lines.append(f"{line} {rng.randint(0, size)}" if rng.random() < 0.5 else line)
+    return lines
+
+
+def measure(fn, lines: list, repeat: int) -> dict:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(lines)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return {"seconds": round(best, 4), "lines_per_sec": round(len(lines) / best), "programs": len(result)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark classify_programs on a large line corpus")
+    parser.add_argument("--pages-file", default=DEFAULT_PAGES)
+    parser.add_argument("--lines", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    lines = build_corpus(args.pages_file, args.lines)
+    results = {"lines": len(lines), "batch": measure(classify_programs, lines, args.repeat)}
+    if not args.skip_legacy:
+        results["legacy"] = measure(legacy_classify_programs, lines, args.repeat)
+        results["speedup"] = round(results["legacy"]["seconds"] / results["batch"]["seconds"], 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
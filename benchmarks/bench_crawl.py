@@ -0,0 +1,193 @@
+# benchmarks/bench_crawl.py - Crawl throughput and memory against the local fixture site
+#
+#   python -m benchmarks.bench_crawl --pages 2000 --concurrency 16 --latency 0.05
+#   python -m benchmarks.bench_crawl --mode agent --pages 50   # needs Playwright's Chromium
+#
+# Starts tools/fixture_site_server.py with a synthetic university site (or
+# replayed pages with --replay) and crawls it breadth-first. "http" mode
+# fetches with httpx and runs the scraper's HTML cleaning and the Ziauddin
+# agent's link discovery on every page, so it measures the Python side of a
+# crawl without a browser (the server shares the process, so the numbers
+# are a lower bound). "agent" mode runs ZiauddinAgent itself, with
+# Playwright and a throwaway SQLite database, pointed at the fixture site.
+import argparse
+import asyncio
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import httpx
+
+from tools.fixture_site_server import CHALLENGE_COOKIE, FixtureSiteServer, SyntheticSite
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 4)
+
+
+async def crawl_http(server: FixtureSiteServer, max_pages: int, concurrency: int, challenge_delay: float) -> dict:
+    """Breadth-first crawl with httpx, cleaning each page and extracting its program links."""
+    from agents.ziauddin_agent import ZiauddinAgent
+    from tools.web_scraper import WebScraper
+
+    scraper = WebScraper()
+    # Only the link filter is needed; it reads base_domain and nothing set up by __init__
+    agent = ZiauddinAgent.__new__(ZiauddinAgent)
+    agent.base_domain = server.base_url
+
+    queue = asyncio.Queue()
+    start_url = server.url("/")
+    queue.put_nowait(start_url)
+    seen = {start_url}
+    latencies = []
+    counts = {"pages": 0, "failed": 0, "challenged": 0, "links": 0, "bytes": 0}
+
+    async def fetch(client: httpx.AsyncClient, url: str):
+        start = time.perf_counter()
+        response = await client.get(url)
+        if response.status_code == 503 and scraper._is_cloudflare_challenge(response.text):
+            # Stand in for the browser running the challenge script
+            counts["challenged"] += 1
+            await asyncio.sleep(challenge_delay)
+            client.cookies.set(CHALLENGE_COOKIE, "1")
+            response = await client.get(url)
+        latencies.append(time.perf_counter() - start)
+        return response
+
+    async def worker(client: httpx.AsyncClient):
+        while True:
+            url = await queue.get()
+            try:
+                response = await fetch(client, url)
+                if response.status_code != 200:
+                    counts["failed"] += 1
+                    continue
+                counts["pages"] += 1
+                counts["bytes"] += len(response.content)
+                cleaned_html, _ = scraper._clean_html(response.text)
+                # Discover links on the raw page, like DOM mode does, so navigation isn't lost to cleaning
+                anchors = agent._page_anchors({"html": response.text, "url": url})
+                links = agent._filter_program_links(anchors, url)
+                counts["links"] += len(links)
+                for link in links:
+                    if link not in seen and len(seen) < max_pages:
+                        seen.add(link)
+                        queue.put_nowait(link)
+            except httpx.HTTPError:
+                counts["failed"] += 1
+            finally:
+                queue.task_done()
+
+    start = time.perf_counter()
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        workers = [asyncio.create_task(worker(client)) for _ in range(concurrency)]
+        await queue.join()
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    return {
+        **counts,
+        "seconds": round(elapsed, 3),
+        "pages_per_sec": round(counts["pages"] / elapsed, 2) if elapsed else 0.0,
+        "fetch_p50": percentile(latencies, 0.5),
+        "fetch_p95": percentile(latencies, 0.95),
+    }
+
+
+async def crawl_agent(server: FixtureSiteServer, max_pages: int) -> dict:
+    """Run ZiauddinAgent end to end against the fixture site."""
+    from agents.ziauddin_agent import ZiauddinAgent
+    from database.sqlite_storage import SQLiteStorage
+
+    # The agent writes pages, blobs and state under memory/; keep them out of the real ones
+    workdir = tempfile.mkdtemp(prefix="bench-crawl-")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    storage = SQLiteStorage("memory/storage.db")
+    try:
+        agent = ZiauddinAgent(
+            storage,
+            max_internal_links=max_pages,
+            delay_min=0.0,
+            delay_max=0.0,
+            start_urls=[server.url("/"), server.url("/programs/")],
+            base_domain=server.base_url,
+        )
+        start = time.perf_counter()
+        pages = await agent.extract_programs(force_scrape=True)
+        elapsed = time.perf_counter() - start
+    finally:
+        storage.close()
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "pages": len(pages),
+        "seconds": round(elapsed, 3),
+        "pages_per_sec": round(len(pages) / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark crawling a local fixture site")
+    parser.add_argument("--mode", choices=["http", "agent"], default="http")
+    parser.add_argument("--pages", type=int, default=1000, help="Stop discovering links after this many pages")
+    parser.add_argument("--programs", type=int, default=5000, help="Program pages in the synthetic site")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--challenge-rate", type=float, default=0.0)
+    parser.add_argument("--challenge-delay", type=float, default=0.2)
+    parser.add_argument("--replay", help="Also serve recorded pages from a page store or scraped_pages.json")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace-memory", action="store_true", help="Report Python heap peak (slows the crawl down)")
+    args = parser.parse_args()
+
+    server = FixtureSiteServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        challenge_rate=args.challenge_rate,
+        challenge_delay=args.challenge_delay,
+        site=SyntheticSite(programs=args.programs, seed=args.seed),
+        seed=args.seed,
+    )
+    if args.replay:
+        server.load_pages(args.replay)
+
+    if args.trace_memory:
+        tracemalloc.start()
+    with server:
+        if args.mode == "agent":
+            result = asyncio.run(crawl_agent(server, args.pages))
+        else:
+            result = asyncio.run(crawl_http(server, args.pages, args.concurrency, args.challenge_delay))
+    result.update({
+        "mode": args.mode,
+        "concurrency": args.concurrency,
+        "server": server.stats,
+        "peak_rss_mb": peak_rss_mb(),
+    })
+    if args.trace_memory:
+        result["python_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+        tracemalloc.stop()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# benchmarks/bench_extraction.py - Offline load benchmark for the LLM extraction stage
+#
+#   python -m benchmarks.bench_extraction --pages 200 --concurrency 8 --latency 0.2 --rate-limit-every 7
+#
+# Starts tools.mock_llm_server in-process, points core.extractor at it and
+# reports pages/sec, p50/p99 page latency and how many requests were retried.
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+from tenacity import wait_none
+
+import core.extractor as extractor
+from tools import page_store
+from tools.mock_llm_server import MockLLMServer
+
+DEFAULT_PAGES = "memory/ziauddin_agent/scraped_pages.json"
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def load_pages(path: str, count: int) -> list:
+    # Accepts a page store directory or a scraped_pages.json file
+    pages = [p for p in page_store.load_pages(path) if p.get("text")]
+    if not pages:
+        raise ValueError(f"No pages with text in {path}")
+    # Repeat the fixtures with distinct URLs so replay keys and logs stay unique
+    return [
+        {**pages[i % len(pages)], "url": f"{pages[i % len(pages)]['url']}#bench-{i}"}
+        for i in range(count)
+    ]
+
+
+async def run_stage(pages: list, concurrency: int, stream: bool, fast_retries: bool) -> dict:
+    extract = extractor.extract_admission_info
+    retry_wait = None
+    if fast_retries:
+        # Both paths, so backoff sleeps don't count as latency in either
+        retry_wait = wait_none()
+        extract = extract.retry_with(wait=retry_wait)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    programs = 0
+    failures = 0
+
+    async def process(page):
+        nonlocal programs, failures
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                if stream:
+                    stream_programs = extractor.stream_admission_info(page["text"], page["url"], retry_wait=retry_wait)
+                    found = [p async for p in stream_programs]
+                else:
+                    found = await extract(page["text"], page["url"])
+                programs += len(found)
+            except Exception:
+                failures += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(process(page) for page in pages))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "pages": len(pages),
+        "elapsed_s": round(elapsed, 4),
+        "pages_per_sec": round(len(pages) / elapsed, 2) if elapsed else 0.0,
+        "p50_latency_s": round(percentile(latencies, 50), 4),
+        "p99_latency_s": round(percentile(latencies, 99), 4),
+        "mean_latency_s": round(statistics.fmean(latencies), 4) if latencies else 0.0,
+        "programs": programs,
+        "failed_pages": failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark extract_admission_info against a local mock LLM")
+    parser.add_argument("--pages-file", default=DEFAULT_PAGES)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--chunk-delay", type=float, default=0.0)
+    parser.add_argument("--rate-limit-every", type=int, default=0)
+    parser.add_argument("--rate-limit-probability", type=float, default=0.0)
+    parser.add_argument("--replay-dir", default=None)
+    parser.add_argument("--stream", action="store_true", help="Benchmark stream_admission_info instead")
+    parser.add_argument("--fast-retries", action="store_true", help="Skip tenacity backoff waits")
+    parser.add_argument("--output", default=None, help="Write the JSON result to this file")
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages_file, args.pages)
+    server = MockLLMServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        chunk_delay=args.chunk_delay,
+        rate_limit_every=args.rate_limit_every,
+        rate_limit_probability=args.rate_limit_probability,
+        replay_dir=args.replay_dir,
+        seed=0,
+    )
+    with server:
+        extractor.GROQ_API_URL = server.url
+        extractor.GROQ_API_KEY = extractor.GROQ_API_KEY or "mock-key"
+        result = asyncio.run(run_stage(pages, args.concurrency, args.stream, args.fast_retries))
+
+    result.update({
+        "stage": "stream" if args.stream else "extract",
+        "concurrency": args.concurrency,
+        "requests": server.stats["requests"],
+        "rate_limited": server.stats["rate_limited"],
+        # Every request beyond the first for a given prompt is a retry
+        "retries": server.stats["requests"] - server.stats["unique_prompts"],
+    })
+    print(json.dumps(result, indent=2))
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+# benchmarks/run.py - Offline benchmark suite for the scraping and extraction hot paths
+#
+#   python -m benchmarks.run --scale 4 --output benchmarks/results.json
+#   python -m benchmarks.run --baseline benchmarks/results.json --threshold 0.25
+#
+# Every case runs on the checked-in fixtures (debug_page.html and the saved
+# Ziauddin pages), so nothing touches the network or the database. --scale
+# multiplies the synthetic variants: repeated page bodies, generated program
+# tables and link lists, and larger page/line corpora. Results are written as
+# JSON; with --baseline each case is compared against a previous results file
+# and the run exits non-zero if any case got slower than the threshold.
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_classify import build_corpus
+from tools import page_store
+from tools.fixture_site_server import CAMPUSES, FIELDS, LEVELS
+
+DEFAULT_HTML = "debug_page.html"
+DEFAULT_PAGES = "memory/ziauddin_agent/scraped_pages.json"
+BASE_URL = "https://zu.edu.pk/programs/"
+
+
+def synthetic_html(rows: int, links: int, seed: int = 0) -> str:
+    """A program listing page with ``rows`` table rows and ``links`` anchors, plus the usual chrome."""
+    rng = random.Random(seed)
+    table = "".join(
+        f"<tr><td>{rng.choice(LEVELS)} {rng.choice(FIELDS)}</td><td>{rng.choice(CAMPUSES)}</td>"
+        f"<td>{rng.choice(['Open', 'Closed'])}</td><td>{rng.randint(1, 28)}-Aug-2025</td></tr>"
+        for _ in range(rows)
+    )
+    paths = ["programs", "admissions", "faculty", "news", "events", "degree", "contact"]
+    anchors = "".join(
+        f'<li><a href="/{rng.choice(paths)}/{i}">{rng.choice(FIELDS)} {rng.choice(paths)}</a></li>'
+        for i in range(links)
+    ) + "".join(f'<li><a href="https://example.com/{i}">External {i}</a></li>' for i in range(links // 10))
+    return (
+        "<html><head><script>var x = 1;</script><style>body{}</style></head><body>"
+        "<header><nav><ul>" + anchors + "</ul></nav></header>"
+        "<main><h1>Programs Offered</h1><table><tr><th>Program</th><th>Campus</th><th>Status</th><th>Deadline</th></tr>"
+        + table + "</table></main><footer>Contact us</footer></body></html>"
+    )
+
+
+def scaled_html(html: str, scale: int) -> str:
+    """Repeat the fixture's body ``scale`` times inside one document."""
+    if scale <= 1:
+        return html
+    head, sep, body = html.partition("<body")
+    if not sep:
+        return html * scale
+    body = sep + body
+    return head + body * scale
+
+
+def scaled_pages(pages: list, scale: int) -> list:
+    """``scale`` copies of the saved pages under distinct URLs."""
+    return [
+        {**page, "url": f"{page.get('url', '')}#copy-{copy}"} if copy else page
+        for copy in range(max(scale, 1))
+        for page in pages
+    ]
+
+
+def timed(fn, repeat: int) -> float:
+    """Best wall time of ``repeat`` calls, with the code's own prints silenced."""
+    best = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def json_persistence_cases(pages: list):
+    """Cases comparing the scraped_pages.json round trip with the segmented page store."""
+    workdir = tempfile.mkdtemp(prefix="bench-pages-")
+    json_path = os.path.join(workdir, "scraped_pages.json")
+    store_dir = os.path.join(workdir, "pages")
+
+    def json_dump():
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(pages, f, ensure_ascii=False, indent=2)
+
+    def json_load():
+        with open(json_path, "r", encoding="utf-8") as f:
+            json.load(f)
+
+    def store_write():
+        with page_store.PageStore(store_dir) as store:
+            store.clear()
+            for page in pages:
+                store.append(page)
+
+    def store_read():
+        for _ in page_store.load_pages(store_dir):
+            pass
+
+    json_dump()
+    store_write()
+    size = {"pages": len(pages)}
+    return [
+        ("json_dump", json_dump, size),
+        ("json_load", json_load, size),
+        ("page_store_write", store_write, size),
+        ("page_store_read", store_read, size),
+    ], workdir
+
+
+def build_cases(html_file: str, pages_file: str, scale: int):
+    """Return (name, fn, size) cases and the temporary directories they use."""
+    from agents.ziauddin_agent import ZiauddinAgent
+    from core.extractor import _select_content
+    from tools.classify_programs import classify_programs
+    from tools.web_scraper import WebScraper
+
+    with open(html_file, "r", encoding="utf-8") as f:
+        fixture = f.read()
+    pages = list(page_store.load_pages(pages_file)) if os.path.exists(pages_file) else []
+    big_fixture = scaled_html(fixture, scale)
+    synthetic = synthetic_html(rows=200 * scale, links=300 * scale)
+    lines = build_corpus(pages_file, 20000 * scale)
+    # Link extraction only needs the agent's filtering logic, not its scraper or database
+    agent = ZiauddinAgent.__new__(ZiauddinAgent)
+
+    cases = [
+        ("clean_html.fixture", lambda: WebScraper._clean_html(big_fixture), {"bytes": len(big_fixture)}),
+        ("clean_html.synthetic", lambda: WebScraper._clean_html(synthetic), {"bytes": len(synthetic)}),
+        ("select_content.fixture", lambda: _select_content(big_fixture, BASE_URL), {"bytes": len(big_fixture)}),
+        ("select_content.synthetic", lambda: _select_content(synthetic, BASE_URL), {"bytes": len(synthetic)}),
+        ("program_links.fixture", lambda: agent._extract_program_links(big_fixture, BASE_URL), {"bytes": len(big_fixture)}),
+        ("program_links.synthetic", lambda: agent._extract_program_links(synthetic, BASE_URL), {"bytes": len(synthetic)}),
+        ("classify_programs", lambda: classify_programs(lines), {"lines": len(lines)}),
+    ]
+    workdirs = []
+    if pages:
+        persistence, workdir = json_persistence_cases(scaled_pages(pages, scale))
+        cases.extend(persistence)
+        workdirs.append(workdir)
+    return cases, workdirs
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Return the cases whose time grew by more than ``threshold`` over the baseline.
+
+    Cases are only compared when their input size matches, so a baseline
+    recorded at another --scale does not report false regressions.
+    """
+    regressions = []
+    for name, result in results["cases"].items():
+        previous = baseline.get("cases", {}).get(name)
+        if not previous or previous.get("size") != result["size"]:
+            continue
+        ratio = result["seconds"] / previous["seconds"] if previous["seconds"] else 1.0
+        result["vs_baseline"] = round(ratio, 3)
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    return regressions
+
+
+def run(html_file: str = DEFAULT_HTML, pages_file: str = DEFAULT_PAGES, scale: int = 1,
+        repeat: int = 3, only: list = None) -> dict:
+    cases, workdirs = build_cases(html_file, pages_file, scale)
+    results = {"scale": scale, "repeat": repeat, "python": sys.version.split()[0], "cases": {}}
+    try:
+        for name, fn, size in cases:
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            seconds = timed(fn, repeat)
+            results["cases"][name] = {"seconds": round(seconds, 5), "size": size}
+            print(f"⏱️ {name}: {seconds * 1000:.1f} ms {size}", file=sys.stderr)
+    finally:
+        for workdir in workdirs:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmarks for scraping and extraction")
+    parser.add_argument("--html-file", default=DEFAULT_HTML)
+    parser.add_argument("--pages-file", default=DEFAULT_PAGES)
+    parser.add_argument("--scale", type=int, default=1, help="Multiply the synthetic input sizes")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="*", help="Run only cases whose names start with these prefixes")
+    parser.add_argument("--output", help="Write the results JSON here")
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown before a case counts as a regression")
+    args = parser.parse_args(argv)
+
+    results = run(args.html_file, args.pages_file, args.scale, args.repeat, args.only)
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        results["regressions"] = regressions
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+    if regressions:
+        print(f"❌ Regressions over {args.threshold:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+# cli.py - Run the pipeline stage by stage: crawl, extract, sync, or all three
+#
+#   python cli.py crawl --agents ziauddin_agent --force
+#   python cli.py extract              # re-extract cached pages, no browser
+#   python cli.py sync                 # push the last extraction, no browser or LLM
+#   python cli.py run --force          # what main.py does
+#
+#   python cli.py enqueue --agents ziauddin_agent iqra_agent --shards 4 --force
+#   python cli.py worker --workers 4   # worker processes on this host
+#   python cli.py queue                # task counts by kind and status
+#
+# Every stage reads and writes the artifacts under memory/<agent>/, so any
+# stage can be re-run on its own. Heavy modules are imported inside the
+# stage that needs them: only crawl loads Playwright and the agents, only
+# sync opens the database, and extract needs nothing but httpx and BeautifulSoup.
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+from core.agent_registry import AGENTS, DEFAULT_AGENTS, university_for
+from core.distributed import DEFAULT_QUEUE_PATH, STAGES
+from core.metrics import metrics
+
+
+def pages_path(name: str):
+    """The agent's page store, or the older scraped_pages.json, or None."""
+    store_path = f"memory/{name}/pages"
+    if os.path.isdir(store_path):
+        return store_path
+    json_path = f"memory/{name}/scraped_pages.json"
+    return json_path if os.path.exists(json_path) else None
+
+
+def _save_json(path: str, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def open_storage():
+    """The configured storage backend and a CorrectionsService on it."""
+    from core.corrections import CorrectionsService
+    from database.storage import create_storage
+
+    # STORAGE_BACKEND selects Supabase (default) or SQLite; supabase is only imported for the former
+    storage = create_storage()
+    return storage, CorrectionsService(storage)
+
+
+async def crawl(agent_names: list, force_scrape: bool = False):
+    """Scrape pages into memory/<agent>/pages (and linked PDFs into pdf_programs.json)."""
+    from core.agent_manager import AgentManager
+
+    storage, corrections = open_storage()
+    manager = AgentManager(storage, corrections=corrections, agent_names=agent_names)
+    await manager.run_all(force_scrape=force_scrape)
+
+
+async def extract_agent(name: str) -> list:
+    """Run LLM extraction over an agent's saved pages and write memory/<agent>/agent_output.json."""
+    from core.extractor import stream_admission_info
+    from tools.page_store import load_pages
+
+    university = university_for(name)
+    path = pages_path(name)
+    structured = []
+    if path is None:
+        print(f"⚠️ No scraped pages for {name}, run the crawl first.")
+    else:
+        print(f"🔍 Extracting admission info from {path} for {name}...")
+        try:
+            # Page store directories are streamed one page at a time
+            pages = load_pages(path)
+            for page in pages:
+                page_structured = []
+                try:
+                    # Programs arrive one by one as the LLM completes each object
+                    with metrics.tags(agent=name):
+                        async for program in stream_admission_info(page["text"], page["url"]):
+                            program["university"] = university
+                            program.setdefault("source_url", page["url"])
+                            program.setdefault("source_text", program.get("program_name", ""))
+                            page_structured.append(program)
+                except Exception as e:
+                    # Keep the programs that completed before the stream failed
+                    print(f"⚠️ Error extracting from {page['url']} after {len(page_structured)} programs: {e}")
+                    structured.extend(page_structured)
+                    continue
+                if page_structured:
+                    structured.extend(page_structured)
+                    print(f"ℹ️ Extracted {len(page_structured)} programs from {page['url']}")
+                else:
+                    print(f"⚠️ No data extracted for {page['url']}")
+        except json.JSONDecodeError as e:
+            print(f"⚠️ Invalid JSON in {path}: {e}")
+
+    # Programs found in linked prospectus PDFs during the crawl
+    pdf_programs_path = f"memory/{name}/pdf_programs.json"
+    if os.path.exists(pdf_programs_path):
+        with open(pdf_programs_path, "r", encoding="utf-8") as f:
+            pdf_programs = json.load(f)
+        structured.extend(pdf_programs)
+        print(f"ℹ️ Added {len(pdf_programs)} programs from linked PDFs")
+
+    output_path = f"memory/{name}/agent_output.json"
+    _save_json(output_path, structured)
+    print(f"✅ Saved {len(structured)} entries to {output_path}")
+    return structured
+
+
+async def extract(agent_names: list) -> dict:
+    return {name: await extract_agent(name) for name in agent_names}
+
+
+def sync_agent(name: str, storage, corrections) -> list:
+    """Apply corrections to memory/<agent>/agent_output.json and write the changes to storage."""
+    from database.program_sync import ProgramSync
+
+    university = university_for(name)
+    output_path = f"memory/{name}/agent_output.json"
+    if not os.path.exists(output_path):
+        print(f"⚠️ Missing {output_path}, run extract first.")
+        return []
+    with open(output_path, "r", encoding="utf-8") as f:
+        structured = json.load(f)
+
+    try:
+        known_programs = corrections.get(university)
+        for item in structured:
+            known_programs.apply(item)
+        corrections.report_unmatched(university)
+    except Exception as e:
+        print(f"⚠️ Error applying corrections: {e}")
+
+    if structured:
+        print(f"ℹ️ Saving {len(structured)} programs to storage...")
+        # Same state file the agent's compare_outputs uses, so only changes are written
+        program_sync = ProgramSync(storage, state_path=f"memory/{name}/sync_state.json")
+        with metrics.tags(agent=name):
+            summary = program_sync.sync(university, structured)
+        for outcome in summary["outcomes"]:
+            if outcome["status"] != "upserted":
+                print(f"⚠️ {outcome['status']}: {outcome.get('program_name') or 'Unknown'} ({outcome['error']})")
+    else:
+        print("⚠️ No structured data to save")
+
+    corrected_path = f"memory/{name}/corrected.json"
+    _save_json(corrected_path, structured)
+    print(f"✅ Saved {len(structured)} entries to {corrected_path}")
+    return structured
+
+
+def sync(agent_names: list) -> list:
+    storage, corrections = open_storage()
+    all_structured = []
+    for name in agent_names:
+        all_structured.extend(sync_agent(name, storage, corrections))
+    _save_json("corrected.json", all_structured)
+    print(f"💾 Final combined corrected.json with {len(all_structured)} total entries.")
+    return all_structured
+
+
+def write_run_report():
+    """Save the run's per-stage timings and counters.
+
+    LATENCY_BUDGETS is an optional JSON object of stage -> seconds (p95),
+    e.g. {"fetch": 60, "llm_request": 30}; METRICS_PROMETHEUS_FILE also
+    writes the metrics for a node_exporter textfile collector.
+    """
+    budgets = json.loads(os.getenv("LATENCY_BUDGETS") or "{}")
+    report = metrics.write_report(os.getenv("METRICS_REPORT", "memory/run_report.json"), budgets=budgets)
+    for stage, totals in report["stages"].items():
+        print(f"📊 {stage}: {totals['count']} spans, {totals['total']:.1f}s")
+    for violation in report.get("budget_violations", []):
+        print(f"⚠️ {violation['name']} {violation['tags']} p95 {violation['p95']:.2f}s exceeds budget {violation['budget']}s")
+    prometheus_file = os.getenv("METRICS_PROMETHEUS_FILE")
+    if prometheus_file:
+        metrics.write_prometheus(prometheus_file)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="University admissions scraper pipeline")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for command, help_text in [
+        ("crawl", "Scrape pages with the browser"),
+        ("extract", "Extract programs from saved pages with the LLM"),
+        ("sync", "Apply corrections and write extracted programs to storage"),
+        ("run", "Crawl, extract and sync"),
+    ]:
+        sub = subparsers.add_parser(command, help=help_text)
+        sub.add_argument("--agents", nargs="+", choices=sorted(AGENTS), default=DEFAULT_AGENTS)
+        if command in ("crawl", "run"):
+            sub.add_argument("--force", action="store_true", help="Re-scrape URLs visited in earlier runs")
+
+    enqueue_parser = subparsers.add_parser("enqueue", help="Queue crawl, extract and sync tasks for workers")
+    enqueue_parser.add_argument("--agents", nargs="+", choices=sorted(AGENTS), default=DEFAULT_AGENTS)
+    enqueue_parser.add_argument("--shards", type=int, default=1, help="Split each agent's start URLs into N crawls")
+    enqueue_parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    enqueue_parser.add_argument("--run-id", help="Re-enqueueing the same run id adds no duplicate tasks")
+    enqueue_parser.add_argument("--force", action="store_true", help="Re-scrape URLs visited in earlier runs")
+    worker_parser = subparsers.add_parser("worker", help="Lease and run queued tasks")
+    worker_parser.add_argument("--workers", type=int, default=1, help="Worker processes to start")
+    worker_parser.add_argument("--kinds", nargs="+", choices=STAGES, help="Only run these task kinds")
+    worker_parser.add_argument("--exit-when-idle", action="store_true", help="Stop once no tasks are left")
+    queue_parser = subparsers.add_parser("queue", help="Show queued task counts")
+    for sub in (enqueue_parser, worker_parser, queue_parser):
+        sub.add_argument("--queue", default=os.getenv("WORK_QUEUE", DEFAULT_QUEUE_PATH), help="Queue database path")
+    return parser
+
+
+async def run_command(args):
+    if args.command in ("crawl", "run"):
+        await crawl(args.agents, force_scrape=args.force)
+    if args.command in ("extract", "run"):
+        await extract(args.agents)
+    if args.command in ("sync", "run"):
+        # The storage clients are synchronous; keep them off the event loop
+        await asyncio.to_thread(sync, args.agents)
+
+
+def queue_command(args) -> int:
+    from core.distributed import enqueue_run, run_workers
+    from core.work_queue import WorkQueue
+
+    if args.command == "worker":
+        exit_codes = run_workers(args.workers, args.queue, kinds=args.kinds, exit_when_idle=args.exit_when_idle)
+        return 0 if all(code == 0 for code in exit_codes) else 1
+    queue = WorkQueue(args.queue)
+    try:
+        if args.command == "enqueue":
+            plan = enqueue_run(queue, args.agents, shards=args.shards, force_scrape=args.force,
+                               stages=args.stages, run_id=args.run_id)
+            print(f"📋 Run {plan['run_id']}: {json.dumps(plan['tasks'])}")
+        print(json.dumps(queue.stats(), indent=2))
+    finally:
+        queue.close()
+    return 0
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    from dotenv import load_dotenv
+    load_dotenv()
+    if args.command in ("enqueue", "worker", "queue"):
+        return queue_command(args)
+    asyncio.run(run_command(args))
+    write_run_report()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,31 +1,54 @@
 # core/agent_manager.py - Fixed version
-import asyncio
+import inspect
 import logging
-from agents.ziauddin_agent import ZiauddinAgent
-from database.supabase_client import SupabaseClient
-import os
+from core.agent_registry import DEFAULT_AGENTS, create_agent
+from core.corrections import CorrectionsService
+from core.metrics import metrics
+from database.storage import StorageBackend, create_storage
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+async def run_agent(agent, force_scrape: bool = False):
+    """Run one agent's crawl; errors propagate so queue workers can retry."""
+    # Everything the agent records (fetches, DB writes, ...) is tagged with its name
+    with metrics.tags(agent=agent.name), metrics.span("crawl"):
+        if "force_scrape" in inspect.signature(agent.extract_programs).parameters:
+            pages = await agent.extract_programs(force_scrape=force_scrape)
+        else:
+            pages = await agent.extract_programs()
+    if hasattr(agent, "collect_garbage"):
+        try:
+            agent.collect_garbage()
+        except Exception as e:
+            logger.warning(f"⚠️ Blob cleanup failed for {agent.name}: {e}")
+    return pages
+
+
 class AgentManager:
-    def __init__(self):
-        supabase_url = os.getenv("SUPABASE_URL")
-        supabase_key = os.getenv("SUPABASE_KEY")
-        
-        if not supabase_url or not supabase_key:
-            raise ValueError("SUPABASE_URL and SUPABASE_KEY environment variables must be set")
-            
-        self.supabase_client = SupabaseClient(supabase_url, supabase_key)
+    def __init__(
+        self,
+        storage: StorageBackend = None,
+        corrections: CorrectionsService = None,
+        agent_names: list = None,
+        **agent_options
+    ):
+        # STORAGE_BACKEND selects Supabase (needs SUPABASE_URL/SUPABASE_KEY) or local SQLite
+        self.supabase_client = storage or create_storage()
+        self.corrections = corrections or CorrectionsService(self.supabase_client)
+        # Agent modules (and Playwright) are only imported for the agents that run
         self.agents = [
-            ZiauddinAgent(self.supabase_client),
+            create_agent(name, self.supabase_client, corrections=self.corrections, **agent_options)
+            for name in agent_names or DEFAULT_AGENTS
         ]
 
     async def run_all(self, force_scrape: bool = False):
         for agent in self.agents:
             logger.info(f"🚀 Running {agent.name}...")
             try:
-                scraped_pages = await agent.extract_programs(force_scrape=force_scrape)
-                logger.info(f"✅ {agent.name} completed successfully. Scraped {len(scraped_pages)} pages.")
+                scraped_pages = await run_agent(agent, force_scrape)
+                logger.info(f"✅ {agent.name} completed successfully. Scraped {len(scraped_pages or [])} pages.")
             except Exception as e:
                 logger.error(f"⚠️ Error running {agent.name}: {e}")
+                continue
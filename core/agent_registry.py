@@ -0,0 +1,42 @@
+# core/agent_registry.py - Known agents, imported only when one is actually run
+import importlib
+import inspect
+
+# Agent modules pull in Playwright, so they are looked up by name here and
+# imported on demand; extraction and sync only need the university name.
+AGENTS = {
+    "ziauddin_agent": {"module": "agents.ziauddin_agent", "class": "ZiauddinAgent", "university": "Ziauddin University"},
+    "iqra_agent": {"module": "agents.iqra_agent", "class": "IqraAgent", "university": "Iqra University"},
+    "nust_agent": {"module": "agents.nust_agent", "class": "NustAgent", "university": "NUST"},
+}
+DEFAULT_AGENTS = ["ziauddin_agent"]
+
+# A URL shard of an agent crawls into memory/<agent>.shard<N>/ so shards never share files
+SHARD_SEPARATOR = ".shard"
+
+
+def shard_name(name: str, index: int) -> str:
+    return f"{name}{SHARD_SEPARATOR}{index}"
+
+
+def base_name(name: str) -> str:
+    return name.split(SHARD_SEPARATOR, 1)[0]
+
+
+def university_for(name: str) -> str:
+    entry = AGENTS.get(base_name(name))
+    return entry["university"] if entry else "Unknown University"
+
+
+def load_agent_class(name: str):
+    if name not in AGENTS:
+        raise ValueError(f"Unknown agent: {name} (known: {', '.join(AGENTS)})")
+    entry = AGENTS[name]
+    return getattr(importlib.import_module(entry["module"]), entry["class"])
+
+
+def create_agent(name: str, storage, **options):
+    """Build an agent, passing only the options its constructor accepts."""
+    cls = load_agent_class(name)
+    accepted = inspect.signature(cls.__init__).parameters
+    return cls(storage, **{k: v for k, v in options.items() if k in accepted and v is not None})
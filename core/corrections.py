@@ -0,0 +1,175 @@
+# core/corrections.py - Cached corrections lookup with normalized program-name matching
+import logging
+import re
+import threading
+import time
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+CORRECTED_FIELDS = ("category", "deadlines", "admission_open")
+
+# Degree abbreviations as they appear on university sites, expanded to one spelling
+DEGREE_ABBREVIATIONS = {
+    "bs": "bachelor of science",
+    "bsc": "bachelor of science",
+    "ba": "bachelor of arts",
+    "bba": "bachelor of business administration",
+    "be": "bachelor of engineering",
+    "beng": "bachelor of engineering",
+    "bsn": "bachelor of science nursing",
+    "bds": "bachelor of dental surgery",
+    "mbbs": "bachelor of medicine bachelor of surgery",
+    "ms": "master of science",
+    "msc": "master of science",
+    "ma": "master of arts",
+    "mba": "master of business administration",
+    "mphil": "master of philosophy",
+    "mph": "master of public health",
+    "phd": "doctor of philosophy",
+    "pharmd": "doctor of pharmacy",
+    "dpt": "doctor of physical therapy",
+}
+
+# Words that vary between listings of the same program
+FILLER_WORDS = {"in", "of", "and", "the", "hons", "honours", "honors", "program", "programme", "degree"}
+
+_non_word = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_program_name(name: str) -> str:
+    """Reduce a program name to a matching key.
+
+    Case, accents, punctuation and spacing are ignored, degree abbreviations
+    are expanded ("B.S." and "BS" both become "bachelor science") and filler
+    words such as "in", "of" and "(Hons)" are dropped.
+    """
+    text = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode("ascii").lower()
+    # Dots are dropped rather than split on so "B.S." and "Ph.D." stay one token
+    text = text.replace("&", " and ").replace(".", "")
+    words = []
+    for token in _non_word.sub(" ", text).split():
+        words.extend(DEGREE_ABBREVIATIONS.get(token, token).split())
+    return " ".join(word for word in words if word not in FILLER_WORDS)
+
+
+def _token_key(key: str) -> str:
+    # Word order independent fallback: "Computer Science BS" matches "BS Computer Science"
+    return " ".join(sorted(set(key.split())))
+
+
+class CorrectionIndex:
+    """Corrections for one university, indexed for O(1) lookup by normalized name.
+
+    Behaves like the ``{program_name: correction}`` dict returned by
+    ``get_corrected_programs``, except that lookups ignore formatting
+    differences. Lookups that find a correction are remembered so the
+    corrections that never matched anything can be reported.
+    """
+
+    def __init__(self, corrections: dict = None):
+        self._by_key = {}
+        self._by_tokens = {}
+        self._matched = set()
+        for name, correction in (corrections or {}).items():
+            self[name] = correction
+
+    def __setitem__(self, program_name: str, correction: dict):
+        key = normalize_program_name(program_name)
+        self._by_key[key] = (program_name, correction)
+        token_key = _token_key(key)
+        existing = self._by_tokens.get(token_key, key)
+        # Two corrections sharing a token set are ambiguous; only exact keys match them
+        self._by_tokens[token_key] = key if existing == key else None
+
+    def _find(self, program_name: str):
+        key = normalize_program_name(program_name)
+        if key not in self._by_key:
+            key = self._by_tokens.get(_token_key(key))
+            if key is None:
+                return None
+        self._matched.add(key)
+        return self._by_key[key]
+
+    def get(self, program_name: str, default=None):
+        entry = self._find(program_name)
+        return entry[1] if entry else default
+
+    def __getitem__(self, program_name: str) -> dict:
+        entry = self._find(program_name)
+        if entry is None:
+            raise KeyError(program_name)
+        return entry[1]
+
+    def __contains__(self, program_name: str) -> bool:
+        return self._find(program_name) is not None
+
+    def __len__(self):
+        return len(self._by_key)
+
+    def __iter__(self):
+        return (name for name, _ in self._by_key.values())
+
+    def apply(self, program: dict) -> list:
+        """Overwrite corrected fields in place; returns ``(field, old, new)`` for each change."""
+        correction = self.get(program.get("program_name", ""))
+        if not correction:
+            return []
+        changes = []
+        for field in CORRECTED_FIELDS:
+            if field in correction and program.get(field) != correction[field]:
+                changes.append((field, program.get(field), correction[field]))
+                program[field] = correction[field]
+        return changes
+
+    def unmatched(self) -> list:
+        """Names of corrections that no lookup has matched yet."""
+        return sorted(name for key, (name, _) in self._by_key.items() if key not in self._matched)
+
+
+class CorrectionsService:
+    """Load each university's corrections once and share them across a run.
+
+    Agents, main.py and the sync tools ask the service instead of calling
+    ``get_corrected_programs`` themselves. Indexes are cached for ``ttl``
+    seconds; if a reload fails the stale index is kept rather than running
+    without corrections.
+    """
+
+    def __init__(self, storage, ttl: float = 900.0):
+        self.storage = storage
+        self.ttl = ttl
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def get(self, university: str) -> CorrectionIndex:
+        with self._lock:
+            cached = self._cache.get(university)
+            if cached and time.monotonic() - cached[0] < self.ttl:
+                return cached[1]
+            try:
+                index = CorrectionIndex(self.storage.get_corrected_programs(university))
+            except Exception as e:
+                if not cached:
+                    raise
+                logger.warning(f"⚠️ Could not reload corrections for {university}, using cached copy: {e}")
+                return cached[1]
+            self._cache[university] = (time.monotonic(), index)
+            logger.info(f"📚 Loaded {len(index)} corrections for {university}")
+            return index
+
+    def invalidate(self, university: str = None):
+        with self._lock:
+            if university is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(university, None)
+
+    def report_unmatched(self, university: str) -> list:
+        """Log and return the corrections that matched no extracted program."""
+        with self._lock:
+            cached = self._cache.get(university)
+        unmatched = cached[1].unmatched() if cached else []
+        if unmatched:
+            logger.info(f"ℹ️ {len(unmatched)} corrections for {university} matched no program: {', '.join(unmatched[:10])}")
+        return unmatched
@@ -0,0 +1,215 @@
+# core/distributed.py - Coordinator and workers that run the pipeline from the work queue
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import time
+
+from core.agent_registry import create_agent, load_agent_class, shard_name
+from core.metrics import metrics
+from core.work_queue import WorkQueue, worker_id
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("crawl", "extract", "sync")
+DEFAULT_QUEUE_PATH = "memory/work_queue.db"
+
+
+def enqueue_run(queue: WorkQueue, agent_names: list, shards: int = 1, force_scrape: bool = False,
+                stages=STAGES, run_id: str = None) -> dict:
+    """Coordinator: queue crawl -> extract -> sync for each university.
+
+    With ``shards`` > 1 an agent's start URLs are split round-robin into
+    that many crawl+extract chains, each working in memory/<agent>.shard<N>/;
+    the university's single sync task waits for all of them and merges their
+    output. Tasks are keyed by ``run_id``, so enqueueing the same run again
+    adds nothing. Returns {"run_id", "tasks": {agent: [task ids]}}.
+    """
+    run_id = run_id or time.strftime("%Y%m%dT%H%M%S")
+    plan = {}
+    for name in agent_names:
+        targets = [(name, None)]
+        if shards > 1:
+            # Only sharding needs the agent's start URLs, and with them its module
+            urls = list(load_agent_class(name).default_start_urls)
+            count = max(1, min(shards, len(urls)))
+            targets = [(shard_name(name, i), urls[i::count]) for i in range(count)]
+
+        task_ids, last_ids = [], []
+        for target, urls in targets:
+            previous = None
+            if "crawl" in stages:
+                payload = {"agent": name, "target": target, "start_urls": urls, "force_scrape": force_scrape}
+                previous = queue.enqueue("crawl", payload, key=f"{run_id}:crawl:{target}")
+                task_ids.append(previous)
+            if "extract" in stages:
+                previous = queue.enqueue(
+                    "extract", {"agent": name, "target": target}, key=f"{run_id}:extract:{target}", depends_on=previous
+                )
+                task_ids.append(previous)
+            if previous:
+                last_ids.append(previous)
+        if "sync" in stages:
+            task_ids.append(queue.enqueue(
+                "sync", {"agent": name, "targets": [target for target, _ in targets]},
+                key=f"{run_id}:sync:{name}", depends_on=last_ids,
+            ))
+        plan[name] = task_ids
+    logger.info(f"📋 Enqueued run {run_id}: {sum(len(ids) for ids in plan.values())} tasks for {len(plan)} agents")
+    return {"run_id": run_id, "tasks": plan}
+
+
+def merge_shard_outputs(name: str, targets: list) -> int:
+    """Combine memory/<shard>/agent_output.json files into memory/<agent>/agent_output.json."""
+    merged = []
+    for target in targets:
+        path = f"memory/{target}/agent_output.json"
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        with open(path, "r", encoding="utf-8") as f:
+            merged.extend(json.load(f))
+    os.makedirs(f"memory/{name}", exist_ok=True)
+    with open(f"memory/{name}/agent_output.json", "w", encoding="utf-8") as f:
+        json.dump(merged, f, indent=2, ensure_ascii=False)
+    return len(merged)
+
+
+class Worker:
+    """Lease tasks from the queue and run them, one at a time.
+
+    While a task runs its lease is renewed every ``heartbeat_interval``
+    seconds; if a renewal fails (the lease expired and another worker took
+    the task) the task is cancelled. Exceptions fail the attempt, which the
+    queue retries with backoff. Storage is opened once per worker, on the
+    first task that needs it.
+    """
+
+    def __init__(self, queue_path: str = DEFAULT_QUEUE_PATH, kinds: list = None, heartbeat_interval: float = 30.0,
+                 poll_interval: float = 2.0, lease_seconds: float = 300.0, handlers: dict = None):
+        self.queue = WorkQueue(queue_path, lease_seconds=lease_seconds)
+        self.kinds = kinds
+        self.heartbeat_interval = heartbeat_interval
+        self.poll_interval = poll_interval
+        self.handlers = handlers or {"crawl": self.crawl, "extract": self.extract, "sync": self.sync}
+        self.id = worker_id()
+        self._storage = None
+        self.processed = 0
+        self.failed = 0
+
+    def storage(self):
+        if self._storage is None:
+            from cli import open_storage
+            self._storage = open_storage()
+        return self._storage
+
+    async def crawl(self, payload: dict) -> dict:
+        from core.agent_manager import run_agent
+
+        storage, corrections = self.storage()
+        agent = create_agent(payload["agent"], storage, corrections=corrections, start_urls=payload.get("start_urls"))
+        if payload["target"] != agent.name:
+            # Shards keep their pages and state in their own memory/ directory; the
+            # buffer was built under the base name and replayed the base agent's spill
+            agent.name = payload["target"]
+            if getattr(agent, "visited_buffer", None) is not None:
+                agent.visited_buffer.use_spill_path(f"memory/{agent.name}/pending_visited_urls.json")
+        pages = await run_agent(agent, payload.get("force_scrape", False))
+        return {"pages": len(pages or [])}
+
+    async def extract(self, payload: dict) -> dict:
+        from cli import extract_agent
+
+        programs = await extract_agent(payload["target"])
+        return {"programs": len(programs)}
+
+    async def sync(self, payload: dict) -> dict:
+        from cli import sync_agent
+
+        name, targets = payload["agent"], payload["targets"]
+        if targets != [name]:
+            merge_shard_outputs(name, targets)
+        storage, corrections = self.storage()
+        # The storage clients are synchronous; keep them off the event loop
+        programs = await asyncio.to_thread(sync_agent, name, storage, corrections)
+        return {"programs": len(programs)}
+
+    async def _heartbeat(self, task: dict, work: asyncio.Task) -> bool:
+        """Renew the lease until the work finishes; returns False if it was lost."""
+        while not work.done():
+            await asyncio.sleep(self.heartbeat_interval)
+            if not self.queue.heartbeat(task["id"], self.id):
+                logger.warning(f"⚠️ Lost the lease on task {task['id']}; stopping it")
+                work.cancel()
+                return False
+        return True
+
+    async def run_task(self, task: dict):
+        handler = self.handlers.get(task["kind"])
+        if handler is None:
+            self.queue.fail(task["id"], self.id, f"No handler for {task['kind']}", retry=False)
+            return
+        logger.info(f"🛠️ {self.id} running {task['kind']} task {task['id']} (attempt {task['attempts']}): {task['payload']}")
+        work = asyncio.create_task(handler(task["payload"]))
+        heartbeat = asyncio.create_task(self._heartbeat(task, work))
+        try:
+            with metrics.span("task", kind=task["kind"]):
+                result = await work
+        except asyncio.CancelledError:
+            lease_lost = heartbeat.done() and not heartbeat.cancelled() and heartbeat.result() is False
+            if not lease_lost:
+                raise
+            # Another worker owns the task now; nothing to report
+            self.failed += 1
+            return
+        except Exception as e:
+            status = self.queue.fail(task["id"], self.id, f"{type(e).__name__}: {e}")
+            self.failed += 1
+            logger.error(f"⚠️ Task {task['id']} failed ({status}): {e}")
+            return
+        finally:
+            heartbeat.cancel()
+        self.queue.complete(task["id"], self.id, result)
+        self.processed += 1
+        logger.info(f"✅ Task {task['id']} done: {result}")
+
+    async def run(self, max_tasks: int = None, exit_when_idle: bool = False) -> int:
+        """Process tasks until ``max_tasks`` are done or, with ``exit_when_idle``, none are left."""
+        while max_tasks is None or self.processed + self.failed < max_tasks:
+            task = self.queue.lease(self.id, self.kinds)
+            if task is None:
+                if exit_when_idle and self.queue.pending() == 0:
+                    break
+                await asyncio.sleep(self.poll_interval)
+                continue
+            await self.run_task(task)
+        self.queue.close()
+        return self.processed
+
+
+def _worker_process(queue_path: str, kinds: list, exit_when_idle: bool, options: dict):
+    from dotenv import load_dotenv
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    asyncio.run(Worker(queue_path, kinds=kinds, **options).run(exit_when_idle=exit_when_idle))
+
+
+def run_workers(count: int, queue_path: str = DEFAULT_QUEUE_PATH, kinds: list = None,
+                exit_when_idle: bool = False, **options) -> list:
+    """Start ``count`` worker processes and wait for them; returns their exit codes.
+
+    Each process has its own connection and lease id. The queue is SQLite
+    in WAL mode, which needs every worker on the same host as the queue
+    file: do not put it on a network filesystem.
+    """
+    # spawn: workers must not inherit the parent's SQLite connections or event loop
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=_worker_process, args=(queue_path, kinds, exit_when_idle, options), name=f"worker-{i}")
+        for i in range(count)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    return [process.exitcode for process in processes]
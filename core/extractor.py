@@ -1,27 +1,117 @@
 # core/extractor.py - Improved program extraction
 import os
 import json
+import hashlib
 import httpx
 import re
+import time
 from bs4 import BeautifulSoup
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from tenacity import AsyncRetrying, retry, retry_if_exception, stop_after_attempt, wait_exponential, retry_if_exception_type
+from core.json_stream import JSONArrayStreamParser, parse_json_array
+from core.metrics import host_of, metrics
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 GROQ_MODEL = os.getenv("MODEL", "llama3-8b-8192")
+# Point at tools/mock_llm_server.py (or any OpenAI-compatible endpoint) for offline runs
+GROQ_API_URL = os.getenv("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions")
 
-@retry(
-    stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=1, min=4, max=10),
-    retry=retry_if_exception_type((httpx.RequestError, httpx.HTTPStatusError))
+# Degree words and abbreviations, at least one of which every program line
+# contains. Used as a cheap prefilter so regex classification only sees
+# plausible lines. Words match as prefixes ("Bachelors", "Pharmacy"); short
+# abbreviations must stand alone, or "bs" would match "jobs" and "ma" "email".
+DEGREE_WORDS = ("bachelor", "master", "doctor", "diploma", "certificate", "certified", "mphil", "pharm", "post rn")
+DEGREE_ABBREVIATIONS = (
+    "bs", "bsc", "bsn", "ms", "msc", "ba", "ma", "bba", "mba", "phd", "ph.d", "mbbs", "bds",
+    "llb", "ll.b", "llm", "b.ed", "m.ed", "b.com", "m.com", "dpt",
 )
-async def extract_admission_info(html: str, url: str) -> list:
-    if not GROQ_API_KEY:
-        raise ValueError("GROQ_API_KEY not set")
-    
-    if not html or not html.strip():
-        print(f"⚠️ Empty or whitespace-only HTML input for {url}")
-        return []
+DEGREE_TOKENS = re.compile(
+    r"\b(?:" + "|".join(re.escape(word) for word in DEGREE_WORDS) + r")"
+    r"|\b(?:" + "|".join(re.escape(abbr) for abbr in DEGREE_ABBREVIATIONS) + r")\b",
+    re.I,
+)
+
+_NORMALIZE_JUNK = re.compile(r"[^a-z0-9]+")
+
+
+def _iter_segments(text: str, separators=(" | ", "\n")):
+    """Yield the pieces of ``text`` between separators without building a list."""
+    length = len(text)
+    # Next occurrence of each separator, refreshed only once it has been passed
+    upcoming = {sep: text.find(sep) for sep in separators}
+    pos = 0
+    while pos < length:
+        end, sep_len = length, 0
+        for sep, idx in upcoming.items():
+            if idx != -1 and idx < pos:
+                idx = upcoming[sep] = text.find(sep, pos)
+            if idx != -1 and idx < end:
+                end, sep_len = idx, len(sep)
+        yield text[pos:end]
+        if not sep_len:
+            break
+        pos = end + sep_len
+
+
+def extract_possible_program_lines(text: str, min_length: int = 6, max_length: int = 200):
+    """Lazily yield segments of scraped page text that may name a program.
+
+    The text is split on the scraper's " | " separators (and newlines); a
+    segment survives only if its length is within bounds and it contains a
+    degree token, found with one precompiled regex search.
+    """
+    if not text:
+        return
+    for segment in _iter_segments(text):
+        segment = segment.strip()
+        if len(segment) < min_length or len(segment) > max_length:
+            continue
+        if DEGREE_TOKENS.search(segment):
+            yield segment
+
 
+def normalized_line_hash(line: str) -> bytes:
+    """Hash a line by its case/whitespace/punctuation-insensitive form."""
+    normalized = _NORMALIZE_JUNK.sub(" ", line.lower()).strip()
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest()
+
+
+def iter_candidate_lines(pages, seen: set = None):
+    """Stream deduplicated candidate program lines across many pages.
+
+    ``pages`` may be any iterable of page dicts (e.g. a generator over the
+    page store), so only one page is held at a time. Duplicates are dropped
+    by an 8-byte normalized hash; pass ``seen`` to share it across calls.
+    """
+    seen = set() if seen is None else seen
+    for page in pages:
+        for line in extract_possible_program_lines(page.get("text", "")):
+            key = normalized_line_hash(line)
+            if key in seen:
+                continue
+            seen.add(key)
+            yield line
+
+
+def _record_usage(usage: dict):
+    """Count prompt/completion tokens from an OpenAI-compatible ``usage`` block."""
+    for kind in ("prompt", "completion"):
+        tokens = usage.get(f"{kind}_tokens")
+        if tokens:
+            metrics.incr("llm_tokens", tokens, kind=kind, model=GROQ_MODEL)
+
+
+def _count_llm_retry(retry_state):
+    metrics.incr("llm_retries", model=GROQ_MODEL)
+
+
+def _groq_headers() -> dict:
+    return {
+        "Authorization": f"Bearer {GROQ_API_KEY}",
+        "Content-Type": "application/json"
+    }
+
+def _select_content(html: str, url: str) -> str:
+    """Pick the program-bearing part of the page and flatten it to text."""
     # Parse HTML with BeautifulSoup
     soup = BeautifulSoup(html, "html.parser")
     
@@ -65,19 +155,16 @@ async def extract_admission_info(html: str, url: str) -> list:
                     content_text = "\n".join([elem.get_text(separator=" | ").strip() for elem in parent_elements if elem.get_text(strip=True)])
                 else:
                     print(f"⚠️ No program content found in HTML for {url}")
-                    return []
+                    return ""
 
         print(f"ℹ️ Extracted fallback content for {url} (length: {len(content_text)}): {content_text[:200]}...")
 
     if not content_text:
         print(f"⚠️ No content extracted for {url}")
-        return []
-
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json"
-    }
+    return content_text
 
+def _build_payload(content_text: str, url: str) -> dict:
+    """Build the chat-completion payload for a page's selected content."""
     system_prompt = """You are an expert admission information extractor. Your task is to extract university program information from webpage content and return it as valid JSON."""
 
     user_prompt = f"""
@@ -116,23 +203,50 @@ If no programs are found, return: []
         {"role": "user", "content": user_prompt}
     ]
 
-    payload = {
+    return {
         "model": GROQ_MODEL,
         "messages": messages,
         "temperature": 0.1,
         "max_tokens": 2000,
     }
 
+# Backoff between LLM attempts; benchmarks and tests pass wait_none() instead
+LLM_RETRY_WAIT = wait_exponential(multiplier=1, min=4, max=10)
+
+
+@retry(
+    stop=stop_after_attempt(3),
+    wait=LLM_RETRY_WAIT,
+    retry=retry_if_exception_type((httpx.RequestError, httpx.HTTPStatusError)),
+    before_sleep=_count_llm_retry
+)
+async def extract_admission_info(html: str, url: str) -> list:
+    if not GROQ_API_KEY:
+        raise ValueError("GROQ_API_KEY not set")
+    
+    if not html or not html.strip():
+        print(f"⚠️ Empty or whitespace-only HTML input for {url}")
+        return []
+
+    with metrics.span("select_content", host=host_of(url)):
+        content_text = _select_content(html, url)
+    if not content_text:
+        return []
+
+    payload = _build_payload(content_text, url)
+
     try:
         async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.post(
-                "https://api.groq.com/openai/v1/chat/completions",
-                headers=headers,
-                json=payload
-            )
-            response.raise_for_status()
+            with metrics.span("llm_request", model=GROQ_MODEL, host=host_of(url)):
+                response = await client.post(
+                    GROQ_API_URL,
+                    headers=_groq_headers(),
+                    json=payload
+                )
+                response.raise_for_status()
         
         content = response.json()
+        _record_usage(content.get("usage") or {})
         if "choices" not in content or not content["choices"]:
             print(f"⚠️ No choices in Groq response for {url}")
             return []
@@ -149,14 +263,10 @@ If no programs are found, return: []
         elif refined_text.startswith("```"):
             refined_text = refined_text.replace("```", "").strip()
         
-        json_match = re.search(r'\[.*\]', refined_text, re.DOTALL)
-        if json_match:
-            refined_text = json_match.group(0)
-        
-        extracted_data = json.loads(refined_text)
-        if not isinstance(extracted_data, list):
-            print(f"⚠️ Response is not a list for {url}: {type(extracted_data)}")
-            return []
+        # Salvage every complete object, even if the array was cut off at max_tokens
+        extracted_data = parse_json_array(refined_text)
+        if not extracted_data and refined_text.strip() not in ("[]", ""):
+            raise json.JSONDecodeError("No complete program objects in response", refined_text, 0)
         
         print(f"✅ Successfully extracted {len(extracted_data)} programs from {url}")
         return extracted_data
@@ -173,4 +283,92 @@ If no programs are found, return: []
         raise
     except Exception as e:
         print(f"⚠️ Unexpected error extracting from {url}: {e}")
-        return []
\ No newline at end of file
+        return []
+
+async def _iter_completion_deltas(response: httpx.Response):
+    """Yield content deltas from an OpenAI-compatible SSE completion stream."""
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            break
+        try:
+            chunk = json.loads(data)
+        except json.JSONDecodeError:
+            continue
+        # Usage arrives on the final chunk: top-level (OpenAI) or under x_groq (Groq)
+        usage = chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage")
+        if usage:
+            _record_usage(usage)
+        choices = chunk.get("choices") or []
+        if choices:
+            delta = choices[0].get("delta", {}).get("content")
+            if delta:
+                yield delta
+
+
+async def stream_admission_info(html: str, url: str, retry_wait=None):
+    """Stream programs from a page as soon as the LLM finishes each object.
+
+    Async generator counterpart of ``extract_admission_info``: the completion
+    is requested with ``stream: true`` and fed through an incremental JSON
+    array parser, so downstream consumers receive programs while the model is
+    still generating and complete objects survive a truncated tail. Requests
+    are retried like ``extract_admission_info`` until the first program has
+    been yielded; after that, errors propagate to the caller. ``retry_wait``
+    replaces the backoff between attempts (``LLM_RETRY_WAIT``).
+    """
+    if not GROQ_API_KEY:
+        raise ValueError("GROQ_API_KEY not set")
+
+    if not html or not html.strip():
+        print(f"⚠️ Empty or whitespace-only HTML input for {url}")
+        return
+
+    with metrics.span("select_content", host=host_of(url)):
+        content_text = _select_content(html, url)
+    if not content_text:
+        return
+
+    payload = _build_payload(content_text, url)
+    payload["stream"] = True
+
+    emitted = 0
+    retrying = AsyncRetrying(
+        stop=stop_after_attempt(3),
+        wait=retry_wait or LLM_RETRY_WAIT,
+        retry=retry_if_exception(
+            lambda e: emitted == 0 and isinstance(e, (httpx.RequestError, httpx.HTTPStatusError))
+        ),
+        reraise=True,
+        before_sleep=_count_llm_retry,
+    )
+
+    host = host_of(url)
+    async for attempt in retrying:
+        with attempt:
+            parser = JSONArrayStreamParser()
+            started = time.perf_counter()
+            # One span per attempt, so failed and retried streams are timed and counted too
+            with metrics.span("llm_request", model=GROQ_MODEL, host=host):
+                async with httpx.AsyncClient(timeout=120.0) as client:
+                    async with client.stream(
+                        "POST",
+                        GROQ_API_URL,
+                        headers=_groq_headers(),
+                        json=payload
+                    ) as response:
+                        response.raise_for_status()
+                        async for delta in _iter_completion_deltas(response):
+                            for program in parser.feed(delta):
+                                emitted += 1
+                                if emitted == 1:
+                                    metrics.observe("llm_first_program", time.perf_counter() - started, model=GROQ_MODEL, host=host)
+                                yield program
+                parser.close()
+    metrics.incr("llm_programs", emitted, host=host)
+
+    if parser.errors:
+        print(f"⚠️ Streamed response for {url} was truncated or malformed; kept {emitted} complete programs")
+    print(f"✅ Successfully streamed {emitted} programs from {url}")
@@ -2,11 +2,12 @@
 import httpx
 import os
 from tools.classify_programs import classify_programs
-from core.extractor import extract_possible_program_lines
+from core.extractor import iter_candidate_lines
 import asyncio
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 GROQ_MODEL = os.getenv("MODEL")
+GROQ_API_URL = os.getenv("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions")
 
 headers = {
     "Authorization": f"Bearer {GROQ_API_KEY}",
@@ -17,15 +18,11 @@ async def refine_scraped_pages(scraped_pages):
     if not GROQ_API_KEY:
         raise ValueError("🚫 GROQ_API_KEY not found in environment variables.")
 
-    # ✅ 1. Extract lines that might be program names
-    all_lines = []
-    for page in scraped_pages:
-        text = page.get("text", "")
-        lines = extract_possible_program_lines(text)
-        all_lines.extend(lines)
+    # ✅ 1. Stream deduplicated lines that might be program names
+    candidate_lines = iter_candidate_lines(scraped_pages)
 
     # ✅ 2. Filter lines to identify valid programs
-    filtered_programs = classify_programs(all_lines)
+    filtered_programs = classify_programs(candidate_lines)
 
     if not filtered_programs:
         print("⚠️ No valid programs found after classification.")
@@ -48,7 +45,7 @@ async def refine_scraped_pages(scraped_pages):
     async with httpx.AsyncClient(timeout=100.0) as client:
         try:
             response = await client.post(
-                "https://api.groq.com/openai/v1/chat/completions",
+                GROQ_API_URL,
                 headers=headers,
                 json={
                     "model": GROQ_MODEL,
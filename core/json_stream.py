@@ -0,0 +1,127 @@
+# core/json_stream.py - Incremental parsing of JSON arrays streamed by the LLM
+import json
+import re
+
+# Characters that change the scanner state outside and inside strings
+_STRUCTURAL = re.compile(r'[\[\]{}"]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+
+class JSONArrayStreamParser:
+    """Parse a JSON array of objects that arrives in arbitrary chunks.
+
+    Each top-level object is emitted as soon as its closing brace is seen, so
+    consumers get programs while the completion is still streaming. Text
+    before the array (code fences, chatter) is ignored, a truncated trailing
+    object is dropped and objects that fail to decode are counted in
+    ``errors`` instead of invalidating the whole response.
+    """
+
+    def __init__(self):
+        self._parts = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._in_array = False
+        self._done = False
+        self._objects = 0
+        self.errors = 0
+
+    def feed(self, chunk: str) -> list:
+        """Consume a chunk and return the objects completed by it."""
+        completed = []
+        if self._done or not chunk:
+            return completed
+
+        pos = 0
+        start = 0 if self._depth else None
+        length = len(chunk)
+        while pos < length:
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                    pos += 1
+                    continue
+                match = _STRING_SPECIAL.search(chunk, pos)
+                if not match:
+                    pos = length
+                    break
+                pos = match.end()
+                if match.group() == "\\":
+                    self._escape = True
+                else:
+                    self._in_string = False
+                continue
+
+            match = _STRUCTURAL.search(chunk, pos)
+            if not match:
+                pos = length
+                break
+            char = match.group()
+            pos = match.end()
+
+            if char == '"':
+                if self._depth:
+                    self._in_string = True
+            elif char in "{[":
+                if char == "{" and self._depth == 0:
+                    start = match.start()
+                    self._parts = []
+                    self._depth = 1
+                elif self._depth:
+                    self._depth += 1
+                else:
+                    self._in_array = True
+            else:
+                if self._depth == 0:
+                    # "]" closing an array that held objects: nothing useful
+                    # follows. Brackets in leading prose are skipped.
+                    if char == "]" and self._in_array:
+                        if self._objects:
+                            self._done = True
+                            break
+                        self._in_array = False
+                    continue
+                self._depth -= 1
+                if self._depth == 0:
+                    self._parts.append(chunk[start:pos])
+                    self._objects += 1
+                    obj = self._decode("".join(self._parts))
+                    if obj is not None:
+                        completed.append(obj)
+                    self._parts = []
+                    start = None
+
+        if self._depth and start is not None:
+            self._parts.append(chunk[start:])
+        return completed
+
+    def close(self) -> list:
+        """Finish parsing; a truncated trailing object is discarded."""
+        if self._depth:
+            self.errors += 1
+        self._parts = []
+        self._depth = 0
+        self._done = True
+        return []
+
+    @property
+    def truncated(self) -> bool:
+        """True if the stream ended in the middle of an object."""
+        return bool(self._depth)
+
+    def _decode(self, text: str):
+        try:
+            obj = json.loads(text)
+        except json.JSONDecodeError:
+            self.errors += 1
+            return None
+        return obj if isinstance(obj, dict) else None
+
+
+def parse_json_array(text: str) -> list:
+    """Parse every complete object out of a (possibly truncated) JSON array."""
+    parser = JSONArrayStreamParser()
+    objects = parser.feed(text)
+    parser.close()
+    return objects
@@ -0,0 +1,233 @@
+# core/metrics.py - Per-stage spans, counters and run reports
+import contextvars
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Tags such as agent= set by ``Metrics.tags`` for everything recorded in this context.
+# asyncio tasks and asyncio.to_thread copy the context, so they inherit them.
+_TAGS = contextvars.ContextVar("metric_tags", default={})
+
+# Durations kept per series for percentiles; count/sum/min/max are always exact
+MAX_SAMPLES = 2048
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def host_of(url: str) -> str:
+    return urlparse(url or "").hostname or ""
+
+
+def _percentile(ordered: list, q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class _Series:
+    __slots__ = ("count", "total", "min", "max", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.samples = []
+
+    def add(self, seconds: float, rng: random.Random):
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+        # Reservoir sampling keeps a uniform sample of every duration seen
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(seconds)
+        else:
+            slot = rng.randrange(self.count)
+            if slot < MAX_SAMPLES:
+                self.samples[slot] = seconds
+
+    def summary(self) -> dict:
+        ordered = sorted(self.samples)
+        result = {
+            "count": self.count,
+            "total": round(self.total, 6),
+            "mean": round(self.total / self.count, 6) if self.count else 0.0,
+            "min": round(self.min or 0.0, 6),
+            "max": round(self.max or 0.0, 6),
+        }
+        for q in QUANTILES:
+            result[f"p{int(q * 100)}"] = round(_percentile(ordered, q), 6)
+        return result
+
+
+class Metrics:
+    """Thread-safe registry of timed spans and counters, keyed by name and tags.
+
+    Spans (fetch, cloudflare_wait, clean_html, link_discovery, llm_request,
+    db_write, ...) record wall-clock durations; counters record events and
+    quantities such as retries, tokens and rows written. Both carry the
+    tags active in the current context plus any given at the call site,
+    typically ``agent`` and ``host``. ``report`` summarizes a run as JSON
+    and ``prometheus`` renders the same data in the text exposition format.
+    """
+
+    def __init__(self, prefix: str = "scraper"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._rng = random.Random(0)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._spans = {}
+            self._counters = {}
+            self.started_at = time.time()
+
+    @staticmethod
+    def _key(name: str, tags: dict) -> tuple:
+        merged = {**_TAGS.get(), **{k: v for k, v in tags.items() if v is not None}}
+        return name, tuple(sorted((k, str(v)) for k, v in merged.items()))
+
+    @contextmanager
+    def tags(self, **tags):
+        """Apply ``tags`` to everything recorded inside the block."""
+        token = _TAGS.set({**_TAGS.get(), **tags})
+        try:
+            yield
+        finally:
+            _TAGS.reset(token)
+
+    @contextmanager
+    def span(self, name: str, **tags):
+        """Time the block; failures are also counted as ``<name>_errors``.
+
+        A generator closed by its consumer inside the block is not a failure.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except GeneratorExit:
+            raise
+        except BaseException:
+            self.incr(f"{name}_errors", **tags)
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, **tags)
+
+    def observe(self, name: str, seconds: float, **tags):
+        key = self._key(name, tags)
+        with self._lock:
+            series = self._spans.get(key)
+            if series is None:
+                series = self._spans[key] = _Series()
+            series.add(seconds, self._rng)
+
+    def incr(self, name: str, value: float = 1, **tags):
+        key = self._key(name, tags)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def counter(self, name: str, **tags) -> float:
+        """Sum of a counter over every series whose tags include ``tags``."""
+        wanted = {(k, str(v)) for k, v in tags.items()}
+        with self._lock:
+            return sum(v for (n, t), v in self._counters.items() if n == name and wanted <= set(t))
+
+    def report(self) -> dict:
+        with self._lock:
+            spans = [{"name": n, "tags": dict(t), **s.summary()} for (n, t), s in self._spans.items()]
+            counters = [{"name": n, "tags": dict(t), "value": v} for (n, t), v in self._counters.items()]
+        spans.sort(key=lambda s: (s["name"], sorted(s["tags"].items())))
+        counters.sort(key=lambda c: (c["name"], sorted(c["tags"].items())))
+
+        # Per-stage totals across all tags, to see where a run's time went
+        stages = {}
+        for s in spans:
+            stage = stages.setdefault(s["name"], {"count": 0, "total": 0.0})
+            stage["count"] += s["count"]
+            stage["total"] = round(stage["total"] + s["total"], 6)
+        return {
+            "started_at": datetime.utcfromtimestamp(self.started_at).isoformat(),
+            "duration": round(time.time() - self.started_at, 3),
+            "stages": dict(sorted(stages.items(), key=lambda item: -item[1]["total"])),
+            "spans": spans,
+            "counters": counters,
+        }
+
+    def check_budgets(self, budgets: dict, percentile: str = "p95") -> list:
+        """Return the spans whose ``percentile`` exceeds the budget (seconds) for their stage."""
+        violations = []
+        for s in self.report()["spans"]:
+            budget = budgets.get(s["name"])
+            if budget is not None and s[percentile] > budget:
+                violations.append({"name": s["name"], "tags": s["tags"], percentile: s[percentile], "budget": budget})
+        return violations
+
+    def write_report(self, path: str, budgets: dict = None) -> dict:
+        report = self.report()
+        if budgets:
+            report["budget_violations"] = self.check_budgets(budgets)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        logger.info(f"📊 Wrote run report to {path}")
+        return report
+
+    def _metric_name(self, name: str) -> str:
+        return re.sub(r"[^a-zA-Z0-9_]", "_", f"{self.prefix}_{name}")
+
+    @staticmethod
+    def _labels(tags: dict) -> str:
+        if not tags:
+            return ""
+        pairs = []
+        for key, value in sorted(tags.items()):
+            value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            pairs.append(f'{re.sub(r"[^a-zA-Z0-9_]", "_", key)}="{value}"')
+        return "{" + ",".join(pairs) + "}"
+
+    def prometheus(self) -> str:
+        """Render spans as summaries and counters as counters (text exposition format)."""
+        report = self.report()
+        lines = []
+        seen = set()
+        for s in report["spans"]:
+            metric = self._metric_name(f"{s['name']}_seconds")
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} summary")
+            for q in QUANTILES:
+                labels = self._labels({**s["tags"], "quantile": str(q)})
+                lines.append(f"{metric}{labels} {s[f'p{int(q * 100)}']}")
+            lines.append(f"{metric}_sum{self._labels(s['tags'])} {s['total']}")
+            lines.append(f"{metric}_count{self._labels(s['tags'])} {s['count']}")
+        for c in report["counters"]:
+            metric = self._metric_name(f"{c['name']}_total")
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{self._labels(c['tags'])} {c['value']}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """Write the textfile a node_exporter textfile collector can scrape."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus())
+        os.replace(tmp_path, path)
+
+
+# Process-wide registry used by the scraper, extractor and storage layers
+metrics = Metrics()
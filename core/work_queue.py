@@ -0,0 +1,244 @@
+# core/work_queue.py - SQLite-backed task queue with leases, heartbeats and retries
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    dedupe_key TEXT UNIQUE,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_ready ON tasks (status, available_at);
+CREATE TABLE IF NOT EXISTS task_deps (
+    task_id INTEGER NOT NULL REFERENCES tasks (id),
+    depends_on INTEGER NOT NULL REFERENCES tasks (id),
+    PRIMARY KEY (task_id, depends_on)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS task_deps_depends_on ON task_deps (depends_on);
+"""
+
+# queued -> leased -> done, or back to queued until max_attempts, then failed
+STATUSES = ("queued", "leased", "done", "failed")
+
+
+def worker_id() -> str:
+    """Unique per process and host, so leases show who holds them."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class WorkQueue:
+    """Durable task queue shared by a coordinator and any number of worker processes.
+
+    ``lease`` hands a ready task to exactly one worker for ``lease_seconds``;
+    workers ``heartbeat`` to keep it and ``complete`` or ``fail`` it when done.
+    A lease that expires (the worker died or hung) makes the task available
+    again, and failed attempts are retried with exponential backoff up to
+    ``max_attempts``. A task with ``depends_on`` is only leased once all of
+    those tasks are done, and fails if any of them fails. Each process
+    opens its own connection; the database runs in WAL mode and leases are
+    taken in an IMMEDIATE transaction, so concurrent workers never receive
+    the same task.
+
+    Single host only: WAL's shared-memory index and SQLite's locks do not
+    work over NFS or SMB, so workers on several machines sharing one queue
+    file could be handed the same lease or corrupt the database.
+    """
+
+    def __init__(self, path: str = "memory/work_queue.db", lease_seconds: float = 300.0,
+                 max_attempts: int = 3, retry_delay: float = 30.0):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        # IMMEDIATE takes the write lock up front, so two workers can't pick the same row
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    @staticmethod
+    def _task(row) -> dict:
+        if row is None:
+            return None
+        task = dict(row)
+        task["payload"] = json.loads(task["payload"])
+        task["result"] = json.loads(task["result"]) if task["result"] else None
+        return task
+
+    def enqueue(self, kind: str, payload: dict, key: str = None, depends_on=None,
+                max_attempts: int = None, delay: float = 0.0) -> int:
+        """Add a task and return its id; with ``key``, re-enqueueing returns the existing task.
+
+        ``depends_on`` is a task id or a list of them.
+        """
+        now = time.time()
+        if isinstance(depends_on, int):
+            depends_on = [depends_on]
+        with self._lock, self._transaction() as conn:
+            if key is not None:
+                row = conn.execute("SELECT id FROM tasks WHERE dedupe_key = ?", (key,)).fetchone()
+                if row:
+                    return row["id"]
+            cursor = conn.execute(
+                "INSERT INTO tasks (kind, payload, dedupe_key, max_attempts, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (kind, json.dumps(payload), key, max_attempts or self.max_attempts, now + delay, now, now),
+            )
+            conn.executemany(
+                "INSERT INTO task_deps (task_id, depends_on) VALUES (?, ?)",
+                [(cursor.lastrowid, dependency) for dependency in depends_on or []],
+            )
+            return cursor.lastrowid
+
+    def lease(self, owner: str, kinds: list = None) -> dict:
+        """Lease the oldest ready task (optionally of the given kinds), or return None."""
+        now = time.time()
+        kind_filter = ""
+        params = [now]
+        if kinds:
+            kind_filter = f"AND t.kind IN ({', '.join('?' for _ in kinds)})"
+            params.extend(kinds)
+        with self._lock, self._transaction() as conn:
+            self._reclaim_expired(conn, now)
+            row = conn.execute(
+                f"SELECT t.id FROM tasks t "
+                f"WHERE t.status = 'queued' AND t.available_at <= ? {kind_filter} "
+                f"AND NOT EXISTS (SELECT 1 FROM task_deps dep JOIN tasks d ON d.id = dep.depends_on "
+                f"WHERE dep.task_id = t.id AND d.status != 'done') "
+                f"ORDER BY t.available_at, t.id LIMIT 1",
+                params,
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE tasks SET status = 'leased', attempts = attempts + 1, lease_owner = ?, lease_expires = ?, "
+                "updated_at = ? WHERE id = ?",
+                (owner, now + self.lease_seconds, now, row["id"]),
+            )
+            return self._task(conn.execute("SELECT * FROM tasks WHERE id = ?", (row["id"],)).fetchone())
+
+    def _reclaim_expired(self, conn, now: float):
+        """Requeue tasks whose worker stopped heartbeating, or fail them if out of attempts."""
+        expired = conn.execute(
+            "SELECT id, attempts, max_attempts FROM tasks WHERE status = 'leased' AND lease_expires < ?", (now,)
+        ).fetchall()
+        for row in expired:
+            if row["attempts"] >= row["max_attempts"]:
+                self._mark_failed(conn, row["id"], "Lease expired on the last attempt", now)
+            else:
+                conn.execute(
+                    "UPDATE tasks SET status = 'queued', lease_owner = NULL, lease_expires = NULL, "
+                    "error = 'Lease expired', available_at = ?, updated_at = ? WHERE id = ?",
+                    (now, now, row["id"]),
+                )
+
+    def _mark_failed(self, conn, task_id: int, error: str, now: float):
+        conn.execute(
+            "UPDATE tasks SET status = 'failed', lease_owner = NULL, lease_expires = NULL, error = ?, updated_at = ? "
+            "WHERE id = ?",
+            (error, now, task_id),
+        )
+        # Tasks waiting on this one can never run
+        for row in conn.execute(
+            "SELECT t.id FROM task_deps dep JOIN tasks t ON t.id = dep.task_id "
+            "WHERE dep.depends_on = ? AND t.status = 'queued'", (task_id,)
+        ).fetchall():
+            self._mark_failed(conn, row["id"], f"Dependency {task_id} failed", now)
+
+    def heartbeat(self, task_id: int, owner: str) -> bool:
+        """Extend the lease; False means the lease was lost and the work should stop."""
+        now = time.time()
+        with self._lock, self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET lease_expires = ?, updated_at = ? WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (now + self.lease_seconds, now, task_id, owner),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, task_id: int, owner: str, result=None) -> bool:
+        now = time.time()
+        with self._lock, self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = 'done', result = ?, error = NULL, lease_owner = NULL, lease_expires = NULL, "
+                "updated_at = ? WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (json.dumps(result) if result is not None else None, now, task_id, owner),
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, task_id: int, owner: str, error: str, retry: bool = True) -> str:
+        """Record a failed attempt; returns the task's new status ("queued" or "failed")."""
+        now = time.time()
+        with self._lock, self._transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM tasks WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (task_id, owner),
+            ).fetchone()
+            if row is None:
+                return None
+            if not retry or row["attempts"] >= row["max_attempts"]:
+                self._mark_failed(conn, task_id, error, now)
+                return "failed"
+            backoff = self.retry_delay * 2 ** (row["attempts"] - 1)
+            conn.execute(
+                "UPDATE tasks SET status = 'queued', lease_owner = NULL, lease_expires = NULL, error = ?, "
+                "available_at = ?, updated_at = ? WHERE id = ?",
+                (error, now + backoff, now, task_id),
+            )
+            return "queued"
+
+    def get(self, task_id: int) -> dict:
+        with self._lock:
+            return self._task(self.conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone())
+
+    def tasks(self, status: str = None) -> list:
+        sql = "SELECT * FROM tasks" + (" WHERE status = ?" if status else "") + " ORDER BY id"
+        with self._lock:
+            return [self._task(row) for row in self.conn.execute(sql, (status,) if status else ())]
+
+    def stats(self) -> dict:
+        """Task counts as {kind: {status: count}}."""
+        counts = {}
+        with self._lock:
+            for row in self.conn.execute("SELECT kind, status, COUNT(*) AS n FROM tasks GROUP BY kind, status"):
+                counts.setdefault(row["kind"], {status: 0 for status in STATUSES})[row["status"]] = row["n"]
+        return counts
+
+    def pending(self) -> int:
+        """Tasks that are queued or leased, i.e. work not yet finished."""
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM tasks WHERE status IN ('queued', 'leased')").fetchone()[0]
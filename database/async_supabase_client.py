@@ -0,0 +1,74 @@
+# database/async_supabase_client.py - Non-blocking access to SupabaseClient from asyncio code
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from database.storage import StorageBackend
+
+
+class AsyncSupabaseClient:
+    """Awaitable twin of SupabaseClient for the crawl and extraction loops.
+
+    Every call runs the wrapped synchronous backend (the supabase-py client
+    by default, or any StorageBackend such as SQLiteStorage) on a dedicated
+    thread pool, so the event loop keeps driving the browser and LLM
+    requests while a query is in flight. The wrapped client's connection
+    pool is shared by all workers; ``max_workers`` bounds how many queries
+    run at once.
+    """
+
+    def __init__(self, client: StorageBackend = None, url: str = None, key: str = None, max_workers: int = 4):
+        if client is None:
+            from database.supabase_client import SupabaseClient
+            client = SupabaseClient(url, key)
+        self.sync_client = client
+        self.max_workers = max_workers
+        self._executor = None
+
+    async def _call(self, method, *args, **kwargs):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="supabase")
+        loop = asyncio.get_running_loop()
+        # Carry the caller's context (metric tags) into the worker thread
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, partial(context.run, method, *args, **kwargs))
+
+    async def get_visited_urls(self, university: str) -> set:
+        return await self._call(self.sync_client.get_visited_urls, university)
+
+    async def save_visited_url(self, university: str, url: str):
+        return await self._call(self.sync_client.save_visited_url, university, url)
+
+    async def upsert_visited_urls(self, records: list):
+        return await self._call(self.sync_client.upsert_visited_urls, records)
+
+    async def get_corrected_programs(self, university: str) -> dict:
+        return await self._call(self.sync_client.get_corrected_programs, university)
+
+    async def get_extracted_programs(self, university: str) -> list:
+        return await self._call(self.sync_client.get_extracted_programs, university)
+
+    async def upsert_extracted_program(self, program: dict):
+        return await self._call(self.sync_client.upsert_extracted_program, program)
+
+    async def upsert_extracted_programs(self, programs: list, chunk_size: int = 500) -> list:
+        return await self._call(self.sync_client.upsert_extracted_programs, programs, chunk_size)
+
+    async def delete_extracted_programs(self, university: str, program_names: list, chunk_size: int = 200):
+        return await self._call(self.sync_client.delete_extracted_programs, university, program_names, chunk_size)
+
+    async def touch_extracted_programs(self, university: str, program_names: list, seen_at: str, chunk_size: int = 200):
+        return await self._call(self.sync_client.touch_extracted_programs, university, program_names, seen_at, chunk_size)
+
+    async def close(self):
+        """Wait for in-flight queries and release the worker threads."""
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
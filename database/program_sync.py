@@ -0,0 +1,174 @@
+# database/program_sync.py - Write only the extracted programs that actually changed
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+
+from core.metrics import metrics
+from database.storage import StorageBackend, normalize_extracted_program
+
+logger = logging.getLogger(__name__)
+
+# Fields that make up a program's content; extraction_date and last_seen are bookkeeping
+CONTENT_FIELDS = ["category", "deadlines", "admission_open", "source_text", "source_url", "application_deadline", "link"]
+
+
+def program_content_hash(row: dict) -> str:
+    content = {field: row.get(field) for field in CONTENT_FIELDS}
+    return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class ProgramSync:
+    """Diff a fresh extraction against what was last written and sync the delta.
+
+    A content hash per (university, program_name) is kept in a local JSON
+    state file. Each sync upserts only new and changed programs, deletes
+    programs that disappeared and touches ``last_seen`` on unchanged ones in
+    separate batched requests, so the write volume tracks what changed
+    rather than the catalog size.
+
+    Deletes are skipped when they would remove more than
+    ``max_delete_ratio`` of the previously synced catalog, which usually
+    means the crawl failed rather than the programs being withdrawn.
+
+    The state file only knows what this machine wrote. When it has no entry
+    for a university (first run, or the file was lost) the hashes are
+    rebuilt from the rows in storage, so missing rows are re-inserted and
+    unchanged ones are not rewritten. A state file made stale by syncs from
+    another machine or worker is not detected; pass ``reconcile=True`` to
+    always diff against storage instead.
+    """
+
+    def __init__(
+        self,
+        storage: StorageBackend,
+        state_path: str = "memory/sync_state.json",
+        delete_missing: bool = True,
+        touch_last_seen: bool = True,
+        max_delete_ratio: float = 0.5,
+        reconcile: bool = False,
+    ):
+        self.storage = storage
+        self.state_path = state_path
+        self.delete_missing = delete_missing
+        self.touch_last_seen = touch_last_seen
+        self.max_delete_ratio = max_delete_ratio
+        self.reconcile = reconcile
+        self._state = self._load_state()
+
+    def _load_state(self) -> dict:
+        if not os.path.exists(self.state_path):
+            return {}
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Could not read sync state {self.state_path}, doing a full sync: {e}")
+            return {}
+
+    def _save_state(self):
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._state, f, indent=2, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp_path, self.state_path)
+
+    def _reconcile(self, university: str):
+        """Rebuild a university's hashes from the rows currently in storage."""
+        try:
+            rows = self.storage.get_extracted_programs(university)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read stored programs for {university}, doing a full sync: {e}")
+            return
+        self._state[university] = {row["program_name"]: program_content_hash(row) for row in rows}
+        logger.info(f"🔁 Reconciled sync state for {university} with {len(rows)} stored programs")
+
+    def diff(self, university: str, programs: list) -> dict:
+        """Classify programs as inserts, updates, unchanged or invalid, plus deletes."""
+        known = self._state.get(university, {})
+        current = {}
+        invalid = []
+        for program in programs:
+            try:
+                row = normalize_extracted_program(program, extraction_date=None)
+            except KeyError as e:
+                invalid.append({"program_name": program.get("program_name"), "error": f"Missing required field {e}"})
+                continue
+            if row["university"] != university:
+                invalid.append({"program_name": row["program_name"], "error": f"Belongs to {row['university']}"})
+                continue
+            current[row["program_name"]] = (program, program_content_hash(row))
+
+        result = {"inserts": [], "updates": [], "unchanged": [], "deletes": [], "invalid": invalid, "hashes": {}}
+        for name, (program, content_hash) in current.items():
+            result["hashes"][name] = content_hash
+            if name not in known:
+                result["inserts"].append(program)
+            elif known[name] != content_hash:
+                result["updates"].append(program)
+            else:
+                result["unchanged"].append(name)
+        result["deletes"] = sorted(name for name in known if name not in current)
+        return result
+
+    def sync(self, university: str, programs: list) -> dict:
+        """Write the diff to storage and return a summary with per-row outcomes."""
+        if self.reconcile or university not in self._state:
+            self._reconcile(university)
+        diff = self.diff(university, programs)
+        known = dict(self._state.get(university, {}))
+        # The delete guard compares against what was synced before this run, not including its inserts
+        previous = len(known)
+        summary = {
+            "inserted": 0, "updated": 0, "unchanged": len(diff["unchanged"]),
+            "deleted": 0, "invalid": len(diff["invalid"]), "outcomes": [],
+        }
+
+        changed = diff["inserts"] + diff["updates"]
+        if changed:
+            with metrics.span("db_write", op="upsert_programs", university=university):
+                outcomes = self.storage.upsert_extracted_programs(changed)
+            metrics.incr("db_rows", len(changed), op="upsert_programs", university=university)
+            summary["outcomes"] = outcomes
+            inserted_names = {p["program_name"] for p in diff["inserts"]}
+            for outcome in outcomes:
+                if outcome["status"] != "upserted":
+                    continue
+                name = outcome["program_name"]
+                known[name] = diff["hashes"][name]
+                summary["inserted" if name in inserted_names else "updated"] += 1
+
+        deletes = diff["deletes"]
+        if deletes and self.delete_missing:
+            if len(deletes) > self.max_delete_ratio * max(previous, 1):
+                logger.warning(
+                    f"⚠️ Skipping delete of {len(deletes)}/{previous} programs for {university}; "
+                    f"looks like an incomplete crawl"
+                )
+            else:
+                try:
+                    with metrics.span("db_write", op="delete_programs", university=university):
+                        self.storage.delete_extracted_programs(university, deletes)
+                    metrics.incr("db_rows", len(deletes), op="delete_programs", university=university)
+                    for name in deletes:
+                        known.pop(name, None)
+                    summary["deleted"] = len(deletes)
+                except Exception as e:
+                    logger.error(f"⚠️ Error deleting {len(deletes)} programs for {university}: {e}")
+
+        if diff["unchanged"] and self.touch_last_seen:
+            try:
+                with metrics.span("db_write", op="touch_programs", university=university):
+                    self.storage.touch_extracted_programs(university, diff["unchanged"], datetime.utcnow().isoformat())
+                metrics.incr("db_rows", len(diff["unchanged"]), op="touch_programs", university=university)
+            except Exception as e:
+                logger.warning(f"⚠️ Error touching last_seen for {university}: {e}")
+
+        self._state[university] = known
+        self._save_state()
+        logger.info(
+            f"🔄 Synced {university}: {summary['inserted']} inserted, {summary['updated']} updated, "
+            f"{summary['deleted']} deleted, {summary['unchanged']} unchanged"
+        )
+        return summary
@@ -0,0 +1,203 @@
+# database/sqlite_storage.py - Local SQLite implementation of the storage backend
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from database.storage import StorageBackend, normalize_extracted_program, plan_program_upserts
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS visited_urls (
+    university TEXT NOT NULL,
+    url TEXT NOT NULL,
+    visited_at TEXT NOT NULL,
+    PRIMARY KEY (university, url)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS corrected_programs (
+    university TEXT NOT NULL,
+    program_name TEXT NOT NULL,
+    category TEXT,
+    deadlines TEXT,
+    admission_open INTEGER,
+    PRIMARY KEY (university, program_name)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS extracted_programs (
+    university TEXT NOT NULL,
+    program_name TEXT NOT NULL,
+    category TEXT,
+    deadlines TEXT,
+    admission_open INTEGER,
+    source_text TEXT,
+    source_url TEXT,
+    extraction_date TEXT,
+    application_deadline TEXT,
+    link TEXT,
+    last_seen TEXT,
+    PRIMARY KEY (university, program_name)
+) WITHOUT ROWID;
+"""
+
+EXTRACTED_COLUMNS = [
+    "university", "program_name", "category", "deadlines", "admission_open", "source_text",
+    "source_url", "extraction_date", "application_deadline", "link",
+]
+
+
+class SQLiteStorage(StorageBackend):
+    """Storage backend on a local SQLite file for offline runs and backfills.
+
+    The database runs in WAL mode so readers never block the writer, and the
+    (university, url) and (university, program_name) primary keys double as
+    the lookup indexes. Bulk methods write each batch in one transaction.
+    One connection is shared across threads behind a lock, which makes the
+    backend safe to wrap in AsyncSupabaseClient.
+    """
+
+    def __init__(self, path: str = "memory/storage.db"):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(extracted_programs)")}
+        if "last_seen" not in columns:
+            self.conn.execute("ALTER TABLE extracted_programs ADD COLUMN last_seen TEXT")
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def _iter_rows(self, sql: str, university: str, key: str, page_size: int):
+        # Keyset pages keep the lock short so writers are not held up by a long read
+        last_key = ""
+        while True:
+            with self._lock:
+                rows = self.conn.execute(sql, (university, last_key, page_size)).fetchall()
+            if not rows:
+                return
+            yield from rows
+            last_key = rows[-1][key]
+
+    def iter_visited_urls(self, university: str, page_size: int = 1000):
+        rows = self._iter_rows(
+            "SELECT url FROM visited_urls WHERE university = ? AND url > ? ORDER BY url LIMIT ?",
+            university, "url", page_size
+        )
+        for row in rows:
+            yield row["url"]
+
+    def get_visited_urls(self, university: str) -> set:
+        return set(self.iter_visited_urls(university))
+
+    def save_visited_url(self, university: str, url: str):
+        self.upsert_visited_urls([{"university": university, "url": url, "visited_at": datetime.utcnow().isoformat()}])
+
+    def upsert_visited_urls(self, records: list):
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO visited_urls (university, url, visited_at) VALUES (:university, :url, :visited_at) "
+                "ON CONFLICT (university, url) DO UPDATE SET visited_at = excluded.visited_at",
+                records,
+            )
+        return records
+
+    def iter_corrected_programs(self, university: str, page_size: int = 1000):
+        rows = self._iter_rows(
+            "SELECT program_name, category, deadlines, admission_open FROM corrected_programs "
+            "WHERE university = ? AND program_name > ? ORDER BY program_name LIMIT ?",
+            university, "program_name", page_size
+        )
+        for row in rows:
+            yield row["program_name"], {
+                "category": row["category"],
+                "deadlines": json.loads(row["deadlines"]) if row["deadlines"] else [],
+                "admission_open": bool(row["admission_open"])
+            }
+
+    def get_corrected_programs(self, university: str) -> dict:
+        return dict(self.iter_corrected_programs(university))
+
+    def upsert_corrected_programs(self, university: str, corrections: dict):
+        """Store corrections keyed by program name, as returned by get_corrected_programs."""
+        rows = [
+            (university, name, c.get("category"), json.dumps(c.get("deadlines", [])), int(bool(c.get("admission_open"))))
+            for name, c in corrections.items()
+        ]
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO corrected_programs (university, program_name, category, deadlines, admission_open) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT (university, program_name) DO UPDATE SET "
+                "category = excluded.category, deadlines = excluded.deadlines, admission_open = excluded.admission_open",
+                rows,
+            )
+
+    def get_extracted_programs(self, university: str) -> list:
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT {', '.join(EXTRACTED_COLUMNS)} FROM extracted_programs WHERE university = ? ORDER BY program_name",
+                (university,),
+            ).fetchall()
+        programs = []
+        for row in rows:
+            program = dict(row)
+            program["deadlines"] = json.loads(program["deadlines"]) if program["deadlines"] else []
+            program["admission_open"] = bool(program["admission_open"])
+            programs.append(program)
+        return programs
+
+    def upsert_extracted_program(self, program: dict):
+        try:
+            row = normalize_extracted_program(program, datetime.utcnow().isoformat())
+        except KeyError as e:
+            print(f"⚠️ Missing required field {e} in program data")
+            return None
+        self._write_programs([row])
+        return [row]
+
+    def upsert_extracted_programs(self, programs: list, chunk_size: int = 500) -> list:
+        """Bulk upsert with the same per-row outcomes as SupabaseClient."""
+        outcomes, pending = plan_program_upserts(programs, datetime.utcnow().isoformat())
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            try:
+                self._write_programs([row for _, row in chunk])
+            except sqlite3.Error as e:
+                print(f"⚠️ SQLite error upserting {len(chunk)} programs: {e}")
+                for index, _ in chunk:
+                    outcomes[index].update(status="error", error=str(e))
+        return outcomes
+
+    def delete_extracted_programs(self, university: str, program_names: list, chunk_size: int = 200):
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "DELETE FROM extracted_programs WHERE university = ? AND program_name = ?",
+                [(university, name) for name in program_names],
+            )
+
+    def touch_extracted_programs(self, university: str, program_names: list, seen_at: str, chunk_size: int = 200):
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "UPDATE extracted_programs SET last_seen = ? WHERE university = ? AND program_name = ?",
+                [(seen_at, university, name) for name in program_names],
+            )
+
+    def _write_programs(self, rows: list):
+        placeholders = ", ".join(f":{c}" for c in EXTRACTED_COLUMNS)
+        updates = ", ".join(f"{c} = excluded.{c}" for c in EXTRACTED_COLUMNS[2:])
+        params = [
+            {**row, "deadlines": json.dumps(row["deadlines"]), "admission_open": int(bool(row["admission_open"]))}
+            for row in rows
+        ]
+        with self._lock, self.conn:
+            self.conn.executemany(
+                f"INSERT INTO extracted_programs ({', '.join(EXTRACTED_COLUMNS)}) VALUES ({placeholders}) "
+                f"ON CONFLICT (university, program_name) DO UPDATE SET {updates}",
+                params,
+            )
@@ -0,0 +1,126 @@
+# database/storage.py - Storage interface shared by the Supabase and SQLite backends
+import os
+from abc import ABC, abstractmethod
+
+EXTRACTED_PROGRAM_REQUIRED_FIELDS = ["university", "program_name", "category", "admission_open", "source_text", "source_url"]
+
+
+def normalize_extracted_program(program: dict, extraction_date: str) -> dict:
+    """Build the extracted_programs row for a program; raises KeyError if incomplete."""
+    for field in EXTRACTED_PROGRAM_REQUIRED_FIELDS:
+        if field not in program:
+            raise KeyError(field)
+    return {
+        "university": program["university"],
+        "program_name": program["program_name"],
+        "category": program["category"],
+        "deadlines": program.get("deadlines", []),
+        "admission_open": program["admission_open"],
+        "source_text": program["source_text"],
+        "source_url": program["source_url"],
+        "extraction_date": extraction_date,
+        "application_deadline": program.get("application_deadline"),
+        "link": program.get("link", program["source_url"])
+    }
+
+
+def plan_program_upserts(programs: list, extraction_date: str):
+    """Validate, normalize and dedupe a batch of programs in one pass.
+
+    Returns ``(outcomes, pending)``: one outcome dict per input program and
+    the ``(index, row)`` pairs to write. The last program for each
+    (university, program_name) wins; earlier ones are marked "duplicate".
+    """
+    outcomes = []
+    rows_by_key = {}
+    for index, program in enumerate(programs):
+        outcome = {
+            "university": program.get("university"),
+            "program_name": program.get("program_name"),
+            "status": "upserted",
+            "error": None,
+        }
+        outcomes.append(outcome)
+        try:
+            row = normalize_extracted_program(program, extraction_date)
+        except KeyError as e:
+            outcome.update(status="invalid", error=f"Missing required field {e}")
+            continue
+        key = (row["university"], row["program_name"])
+        if key in rows_by_key:
+            previous = outcomes[rows_by_key[key][0]]
+            previous.update(status="duplicate", error=f"Superseded by row {index} in the same batch")
+        rows_by_key[key] = (index, row)
+    return outcomes, list(rows_by_key.values())
+
+
+class StorageBackend(ABC):
+    """What the agents, main.py and the sync tools need from a database.
+
+    SupabaseClient and SQLiteStorage implement this; agents accept either.
+    A backend missing one of the abstract methods fails when it is created,
+    not halfway through a sync.
+    """
+
+    @abstractmethod
+    def get_visited_urls(self, university: str) -> set:
+        """Every URL already crawled for the university."""
+
+    def iter_visited_urls(self, university: str, page_size: int = 1000):
+        """Stream visited URLs in pages; backends without paging read them all at once."""
+        yield from self.get_visited_urls(university)
+
+    @abstractmethod
+    def save_visited_url(self, university: str, url: str):
+        """Record one crawled URL."""
+
+    @abstractmethod
+    def upsert_visited_urls(self, records: list):
+        """Insert or refresh {"university", "url", "visited_at"} records."""
+
+    @abstractmethod
+    def get_corrected_programs(self, university: str) -> dict:
+        """Manual corrections for the university, keyed by program name."""
+
+    def iter_corrected_programs(self, university: str, page_size: int = 1000):
+        """Stream (program_name, correction) pairs in pages."""
+        yield from self.get_corrected_programs(university).items()
+
+    @abstractmethod
+    def get_extracted_programs(self, university: str) -> list:
+        """The university's stored extracted_programs rows."""
+
+    @abstractmethod
+    def upsert_extracted_program(self, program: dict):
+        """Insert or update one program, keyed by (university, program_name)."""
+
+    @abstractmethod
+    def upsert_extracted_programs(self, programs: list, chunk_size: int = 500) -> list:
+        """Bulk upsert in chunks; returns one outcome dict per input program, in order."""
+
+    @abstractmethod
+    def delete_extracted_programs(self, university: str, program_names: list, chunk_size: int = 200):
+        """Delete the named programs of the university."""
+
+    @abstractmethod
+    def touch_extracted_programs(self, university: str, program_names: list, seen_at: str, chunk_size: int = 200):
+        """Set last_seen to ``seen_at`` on the named programs without rewriting them."""
+
+
+def create_storage(backend: str = None, **kwargs) -> StorageBackend:
+    """Create the configured backend: STORAGE_BACKEND=supabase (default) or sqlite."""
+    backend = (backend or os.getenv("STORAGE_BACKEND", "supabase")).lower()
+    if backend == "supabase":
+        from database.supabase_client import SupabaseClient
+        return SupabaseClient(kwargs.get("url"), kwargs.get("key"))
+    if backend == "sqlite":
+        from database.sqlite_storage import SQLiteStorage
+        return SQLiteStorage(kwargs.get("path") or os.getenv("SQLITE_PATH", "memory/storage.db"))
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+def sync_extracted_programs(source: StorageBackend, target: StorageBackend, university: str) -> list:
+    """Copy a university's extracted programs from one backend to another in bulk."""
+    programs = source.get_extracted_programs(university)
+    print(f"🔄 Syncing {len(programs)} programs for {university}...")
+    return target.upsert_extracted_programs(programs)
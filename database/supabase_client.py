@@ -2,9 +2,21 @@
 from supabase import create_client, Client
 from datetime import datetime
 from postgrest.exceptions import APIError
+import httpx
+from database.storage import (
+    EXTRACTED_PROGRAM_REQUIRED_FIELDS,
+    StorageBackend,
+    normalize_extracted_program,
+    plan_program_upserts,
+)
 import os
 
-class SupabaseClient:
+EXTRACTED_PROGRAM_CONFLICT_KEY = "university,program_name"
+VISITED_URL_CONFLICT_KEY = "university,url"
+# PostgREST caps responses (max-rows, usually 1000); reads page through with keyset filters
+DEFAULT_PAGE_SIZE = 1000
+
+class SupabaseClient(StorageBackend):
     def __init__(self, url: str = None, key: str = None):
         self.url = url or os.getenv("SUPABASE_URL")
         self.key = key or os.getenv("SUPABASE_KEY")
@@ -14,13 +26,39 @@ class SupabaseClient:
             
         self.client: Client = create_client(self.url, self.key)
 
+    def _iter_rows(self, table: str, columns: str, university: str, key: str, page_size: int):
+        """Yield a university's rows ordered by ``key``, one page per request.
+
+        Each page asks for rows after the last key seen rather than using an
+        offset, so pages stay cheap deep into the table. Iteration only stops
+        on an empty page, which keeps it correct even when the server caps
+        responses below ``page_size``.
+        """
+        last_key = None
+        while True:
+            query = self.client.table(table).select(columns).eq("university", university)
+            if last_key is not None:
+                query = query.gt(key, last_key)
+            rows = query.order(key).limit(page_size).execute().data or []
+            if not rows:
+                return
+            yield from rows
+            last_key = rows[-1][key]
+
+    def iter_visited_urls(self, university: str, page_size: int = DEFAULT_PAGE_SIZE):
+        """Stream visited URLs page by page; APIError is raised."""
+        for row in self._iter_rows("visited_urls", "url", university, "url", page_size):
+            yield row["url"]
+
     def get_visited_urls(self, university: str) -> set:
+        visited = set()
         try:
-            response = self.client.table("visited_urls").select("url").eq("university", university).execute()
-            return {row["url"] for row in response.data} if response.data else set()
+            for url in self.iter_visited_urls(university):
+                visited.add(url)
         except APIError as e:
-            print(f"⚠️ Supabase error getting visited URLs: {e}")
-            return set()
+            # Keep the pages read so far; a partial set only means some re-crawling
+            print(f"⚠️ Supabase error getting visited URLs after {len(visited)} rows: {e}")
+        return visited
 
     def save_visited_url(self, university: str, url: str):
         try:
@@ -34,46 +72,63 @@ class SupabaseClient:
         except APIError as e:
             print(f"⚠️ Supabase error saving visited URL: {e}")
 
-    def get_corrected_programs(self, university: str) -> dict:
-        try:
-            response = self.client.table("corrected_programs").select(
-                "program_name, category, deadlines, admission_open"
-            ).eq("university", university).execute()
-            
-            return {row["program_name"]: {
+    def upsert_visited_urls(self, records: list):
+        """Upsert many {"university", "url", "visited_at"} rows in one request.
+
+        Conflicts on (university, url) update visited_at instead of adding a
+        duplicate row, which needs a unique constraint on those columns.
+        Errors are raised so callers such as VisitedUrlBuffer can retry.
+        """
+        if not records:
+            return []
+        response = self.client.table("visited_urls").upsert(
+            records,
+            on_conflict=VISITED_URL_CONFLICT_KEY
+        ).execute()
+        return response.data
+
+    def iter_corrected_programs(self, university: str, page_size: int = DEFAULT_PAGE_SIZE):
+        """Stream (program_name, correction) pairs page by page; APIError is raised."""
+        rows = self._iter_rows(
+            "corrected_programs", "program_name, category, deadlines, admission_open",
+            university, "program_name", page_size
+        )
+        for row in rows:
+            yield row["program_name"], {
                 "category": row["category"],
                 "deadlines": row["deadlines"],
                 "admission_open": row["admission_open"]
-            } for row in response.data} if response.data else {}
+            }
+
+    def get_corrected_programs(self, university: str) -> dict:
+        corrections = {}
+        try:
+            for program_name, correction in self.iter_corrected_programs(university):
+                corrections[program_name] = correction
+        except APIError as e:
+            print(f"⚠️ Supabase error getting corrected programs after {len(corrections)} rows: {e}")
+        return corrections
+
+    def get_extracted_programs(self, university: str) -> list:
+        try:
+            return list(self._iter_rows("extracted_programs", "*", university, "program_name", DEFAULT_PAGE_SIZE))
         except APIError as e:
-            print(f"⚠️ Supabase error getting corrected programs: {e}")
-            return {}
+            print(f"⚠️ Supabase error getting extracted programs: {e}")
+            return []
 
     def upsert_extracted_program(self, program: dict):
         try:
             # Ensure required fields are present
-            required_fields = ["university", "program_name", "category", "admission_open", "source_text", "source_url"]
-            for field in required_fields:
+            for field in EXTRACTED_PROGRAM_REQUIRED_FIELDS:
                 if field not in program:
                     print(f"⚠️ Missing required field '{field}' in program data")
                     return
             
-            data = {
-                "university": program["university"],
-                "program_name": program["program_name"],
-                "category": program["category"],
-                "deadlines": program.get("deadlines", []),
-                "admission_open": program["admission_open"],
-                "source_text": program["source_text"],
-                "source_url": program["source_url"],
-                "extraction_date": datetime.utcnow().isoformat(),
-                "application_deadline": program.get("application_deadline"),
-                "link": program.get("link", program["source_url"])
-            }
+            data = normalize_extracted_program(program, datetime.utcnow().isoformat())
             
             response = self.client.table("extracted_programs").upsert(
                 data, 
-                on_conflict=["university", "program_name"]
+                on_conflict=EXTRACTED_PROGRAM_CONFLICT_KEY
             ).execute()
             
             print(f"✅ Upserted program '{program['program_name']}' for {program['university']}")
@@ -84,3 +139,47 @@ class SupabaseClient:
         except KeyError as e:
             print(f"⚠️ Missing key in program data: {e}")
             print(f"Program data: {program}")
+
+    def upsert_extracted_programs(self, programs: list, chunk_size: int = 500) -> list:
+        """Upsert many programs with one multi-row request per chunk.
+
+        Rows are validated and normalized in a single pass. Postgres rejects a
+        statement that hits the same conflict key twice, so within the batch
+        the last program for each (university, program_name) wins and earlier
+        ones are reported as "duplicate". Returns one outcome per input
+        program, in order: {"university", "program_name", "status", "error"}
+        with status "upserted", "invalid", "duplicate" or "error".
+        """
+        outcomes, pending = plan_program_upserts(programs, datetime.utcnow().isoformat())
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            try:
+                self.client.table("extracted_programs").upsert(
+                    [row for _, row in chunk],
+                    on_conflict=EXTRACTED_PROGRAM_CONFLICT_KEY
+                ).execute()
+            except (APIError, httpx.HTTPError) as e:
+                # A timeout or dropped connection fails this chunk only; earlier chunks are committed
+                print(f"⚠️ Supabase error upserting {len(chunk)} programs: {e}")
+                for index, _ in chunk:
+                    outcomes[index].update(status="error", error=str(e))
+
+        upserted = sum(1 for o in outcomes if o["status"] == "upserted")
+        print(f"✅ Upserted {upserted}/{len(outcomes)} programs in {-(-len(pending) // chunk_size)} request(s)")
+        return outcomes
+
+    def delete_extracted_programs(self, university: str, program_names: list, chunk_size: int = 200):
+        """Delete programs by name, one request per chunk; errors are raised."""
+        for start in range(0, len(program_names), chunk_size):
+            chunk = program_names[start:start + chunk_size]
+            self.client.table("extracted_programs").delete().eq(
+                "university", university
+            ).in_("program_name", chunk).execute()
+
+    def touch_extracted_programs(self, university: str, program_names: list, seen_at: str, chunk_size: int = 200):
+        """Set last_seen on unchanged programs without rewriting them; errors are raised."""
+        for start in range(0, len(program_names), chunk_size):
+            chunk = program_names[start:start + chunk_size]
+            self.client.table("extracted_programs").update({"last_seen": seen_at}).eq(
+                "university", university
+            ).in_("program_name", chunk).execute()
@@ -0,0 +1,178 @@
+# database/visited_url_buffer.py - Write-behind batching of visited-URL records
+import asyncio
+import inspect
+import json
+import logging
+import os
+from datetime import datetime
+
+from core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class VisitedUrlBuffer:
+    """Collect visited URLs during a crawl and upsert them in the background.
+
+    ``add`` only records the URL in memory, so the crawl loop never waits on
+    the database. A background task flushes when ``max_batch`` records are
+    pending or every ``flush_interval`` seconds. Failed flushes keep their
+    records and back off exponentially; ``close`` makes a final attempt and,
+    if the database is still unreachable, spills the pending records to
+    ``spill_path`` so the next run can replay them. A replayed spill file is
+    only removed once a flush has written its records.
+    """
+
+    def __init__(
+        self,
+        client,
+        max_batch: int = 50,
+        flush_interval: float = 5.0,
+        max_backoff: float = 60.0,
+        spill_path: str = None,
+    ):
+        self.client = client
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        self.spill_path = spill_path
+        self._pending = {}
+        self._failures = 0
+        self._wakeup = None
+        self._task = None
+        self._lock = None
+        self._closed = False
+        self.flushed = 0
+        self._spill_loaded = False
+        self._load_spill()
+
+    def use_spill_path(self, spill_path: str):
+        """Spill to and replay from ``spill_path`` instead; call before the first ``add``.
+
+        Records replayed from the previous file are dropped and that file is
+        left alone for the buffer it belongs to.
+        """
+        self._pending.clear()
+        self._spill_loaded = False
+        self.spill_path = spill_path
+        self._load_spill()
+
+    def add(self, university: str, url: str):
+        """Queue a visited URL; re-visits only refresh the timestamp."""
+        self._pending[(university, url)] = datetime.utcnow().isoformat()
+        self._ensure_started()
+        if len(self._pending) >= self.max_batch and self._wakeup and not self._failures:
+            self._wakeup.set()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def _ensure_started(self):
+        if self._task or self._closed:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task = loop.create_task(self._run())
+
+    async def _run(self):
+        while not self._closed:
+            # Back off after failures, otherwise wake on size or time
+            timeout = self.flush_interval
+            if self._failures:
+                timeout = min(self.max_backoff, self.flush_interval * 2 ** self._failures)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._pending:
+                await self.flush()
+
+    async def flush(self) -> bool:
+        """Upsert everything pending; returns False if a batch failed."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while self._pending:
+                keys = list(self._pending)[:self.max_batch]
+                batch = {key: self._pending[key] for key in keys}
+                records = [
+                    {"university": university, "url": url, "visited_at": visited_at}
+                    for (university, url), visited_at in batch.items()
+                ]
+                try:
+                    with metrics.span("db_write", op="visited_urls"):
+                        await self._write(records)
+                except Exception as e:
+                    self._failures += 1
+                    metrics.incr("visited_flush_failures")
+                    logger.warning(f"⚠️ Failed to flush {len(records)} visited URLs (attempt {self._failures}): {e}")
+                    return False
+
+                # Drop what was written unless it was re-added meanwhile
+                for key, visited_at in batch.items():
+                    if self._pending.get(key) == visited_at:
+                        del self._pending[key]
+                self._failures = 0
+                self.flushed += len(records)
+                metrics.incr("db_rows", len(records), op="visited_urls")
+                logger.info(f"✅ Flushed {len(records)} visited URLs")
+            if self._spill_loaded:
+                self._remove_spill()
+            return True
+
+    async def _write(self, records: list):
+        # AsyncSupabaseClient is awaited directly; a sync client runs in a thread
+        if inspect.iscoroutinefunction(self.client.upsert_visited_urls):
+            await self.client.upsert_visited_urls(records)
+        else:
+            await asyncio.to_thread(self.client.upsert_visited_urls, records)
+
+    async def close(self):
+        """Stop the background task, flush and spill anything left over."""
+        self._closed = True
+        if self._task:
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        if self._pending and not await self.flush():
+            self._spill()
+
+    def _spill(self):
+        if not self.spill_path:
+            logger.error(f"❌ Dropping {len(self._pending)} unsaved visited URLs")
+            metrics.incr("visited_urls_dropped", len(self._pending))
+            return
+        os.makedirs(os.path.dirname(self.spill_path) or ".", exist_ok=True)
+        with open(self.spill_path, "w", encoding="utf-8") as f:
+            json.dump(
+                [{"university": u, "url": url, "visited_at": at} for (u, url), at in self._pending.items()],
+                f, indent=2, ensure_ascii=False
+            )
+        logger.warning(f"💾 Spilled {len(self._pending)} unsaved visited URLs to {self.spill_path}")
+
+    def _load_spill(self):
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return
+        try:
+            with open(self.spill_path, encoding="utf-8") as f:
+                for record in json.load(f):
+                    self._pending[(record["university"], record["url"])] = record["visited_at"]
+            self._spill_loaded = True
+            logger.info(f"📂 Reloaded {len(self._pending)} unsaved visited URLs from {self.spill_path}")
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"⚠️ Could not reload {self.spill_path}: {e}")
+
+    def _remove_spill(self):
+        try:
+            os.remove(self.spill_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"⚠️ Could not remove {self.spill_path}: {e}")
+            return
+        self._spill_loaded = False
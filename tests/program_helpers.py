@@ -0,0 +1,16 @@
+# tests/program_helpers.py - Extracted-program dicts shared by the storage and sync tests
+
+
+def make_program(name, **overrides):
+    """A program with every field the storage backends require; ``overrides`` replace or add fields."""
+    data = {
+        "university": "Ziauddin University",
+        "program_name": name,
+        "category": "undergraduate",
+        "admission_open": True,
+        "deadlines": ["2025-09-10"],
+        "source_text": name,
+        "source_url": "https://zu.edu.pk/",
+    }
+    data.update(overrides)
+    return data
@@ -0,0 +1,37 @@
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock
+from database.async_supabase_client import AsyncSupabaseClient
+
+
+@pytest.mark.asyncio
+async def test_queries_run_off_the_event_loop():
+    sync_client = MagicMock()
+
+    def slow_get_visited_urls(university):
+        time.sleep(0.2)
+        return {f"https://{threading.current_thread().name}/"}
+
+    sync_client.get_visited_urls.side_effect = slow_get_visited_urls
+    sync_client.get_corrected_programs.return_value = {"BS Nursing": {"category": "undergraduate"}}
+
+    async with AsyncSupabaseClient(sync_client, max_workers=2) as db:
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        visited, corrected = await asyncio.gather(
+            db.get_visited_urls("NUST"), db.get_corrected_programs("NUST")
+        )
+        task.cancel()
+
+    assert next(iter(visited)).startswith("https://supabase")
+    assert corrected == {"BS Nursing": {"category": "undergraduate"}}
+    assert ticks > 5
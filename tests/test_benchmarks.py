@@ -0,0 +1,37 @@
+import json
+
+from benchmarks import run as bench
+
+
+def test_synthetic_html_scales():
+    small = bench.synthetic_html(rows=10, links=10)
+    large = bench.synthetic_html(rows=100, links=100)
+    assert small.count("<tr>") == 11
+    assert len(large) > len(small) * 5
+
+
+def test_run_writes_results_for_every_case(tmp_path):
+    html = tmp_path / "page.html"
+    html.write_text(bench.synthetic_html(rows=5, links=5), encoding="utf-8")
+    pages = tmp_path / "pages.json"
+    pages.write_text(json.dumps([{"url": "https://zu.edu.pk/a", "html": "<p>x</p>", "text": "BS Nursing | MBBS"}]))
+
+    results = bench.run(str(html), str(pages), scale=1, repeat=1)
+
+    assert {"clean_html.fixture", "program_links.synthetic", "classify_programs", "page_store_read"} <= set(results["cases"])
+    assert all(case["seconds"] >= 0 for case in results["cases"].values())
+
+
+def test_compare_flags_only_matching_slow_cases():
+    baseline = {"cases": {
+        "a": {"seconds": 1.0, "size": {"bytes": 10}},
+        "b": {"seconds": 1.0, "size": {"bytes": 10}},
+        "c": {"seconds": 1.0, "size": {"bytes": 99}},
+    }}
+    results = {"cases": {
+        "a": {"seconds": 1.1, "size": {"bytes": 10}},
+        "b": {"seconds": 2.0, "size": {"bytes": 10}},
+        "c": {"seconds": 5.0, "size": {"bytes": 10}},
+    }}
+    assert bench.compare(results, baseline, threshold=0.25) == ["b"]
+    assert results["cases"]["b"]["vs_baseline"] == 2.0
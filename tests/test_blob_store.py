@@ -0,0 +1,105 @@
+import os
+import threading
+import time
+
+import pytest
+
+from core.agent_manager import run_agent
+from tools.blob_store import BlobStore, content_hash
+from tools.page_store import PageStore, load_pages
+from tools.university_scraper_agent import UniversityScraperAgent
+
+
+def test_put_dedupes_and_gc(tmp_path):
+    blobs = BlobStore(str(tmp_path / "blobs"))
+    first = blobs.put("<p>Bachelor of Science</p>\n")
+    second = blobs.put("<p>Bachelor   of Science</p>")
+
+    assert first == second == content_hash("<p>Bachelor of Science</p>")
+    assert blobs.refcount(first) == 2
+    assert blobs.stats()["blobs"] == 1
+
+    blobs.release(first)
+    assert blobs.gc()["removed"] == 0
+    blobs.release(first)
+    assert blobs.gc()["removed"] == 1
+    assert first not in blobs
+
+
+def test_gc_does_not_delete_a_blob_another_store_puts_meanwhile(tmp_path, monkeypatch):
+    blobs = BlobStore(str(tmp_path / "blobs"))
+    other = BlobStore(str(tmp_path / "blobs"))
+    digest = blobs.put("<p>MBBS</p>")
+    blobs.release(digest)
+
+    remove = os.remove
+    writers = []
+
+    def remove_while_another_worker_puts(path):
+        writer = threading.Thread(target=other.put, args=("<p>MBBS</p>",))
+        writer.start()
+        writers.append(writer)
+        time.sleep(0.2)
+        remove(path)
+
+    monkeypatch.setattr(os, "remove", remove_while_another_worker_puts)
+    assert blobs.gc()["removed"] == 1
+    writers[0].join()
+
+    assert other.refcount(digest) == 1
+    assert other.get(digest) == "<p>MBBS</p>"
+    blobs.close()
+    other.close()
+
+
+def test_page_store_keeps_hashes_and_releases_on_clear(tmp_path):
+    blob_dir = str(tmp_path / "blobs")
+    page = {"url": "https://zu.edu.pk/", "title": "ZU", "html": "<p>Programs</p>", "text": "Programs"}
+
+    store = PageStore(str(tmp_path / "run1"), blob_dir=blob_dir)
+    store.append(page)
+    store.append({**page, "url": "https://zu.edu.pk/copy"})
+    raw = store.get("https://zu.edu.pk/", resolve=False)
+    assert "html" not in raw and raw["html_hash"] == content_hash("<p>Programs</p>")
+    assert store.get("https://zu.edu.pk/copy") == {**page, "url": "https://zu.edu.pk/copy"}
+    assert store.blobs.stats()["blobs"] == 2
+
+    # A second run with the same content only adds references
+    rerun = PageStore(str(tmp_path / "run2"), blob_dir=blob_dir)
+    rerun.append(page)
+    assert rerun.blobs.stats()["blobs"] == 2
+    assert rerun.get(page["url"], resolve=False)["html_hash"] == raw["html_hash"]
+
+    store.clear()
+    assert store.gc()["removed"] == 0
+    rerun.clear()
+    assert rerun.gc()["removed"] == 2
+
+    # Readers find the blob directory from the store's meta file
+    store.append(page)
+    store.close()
+    assert list(load_pages(str(tmp_path / "run1"))) == [page]
+
+
+class FakeAgent(UniversityScraperAgent):
+    def __init__(self, text):
+        super().__init__(None)
+        self.name = "fake_agent"
+        self.text = text
+
+    async def extract_programs(self):
+        self.page_store.clear()
+        self._store_page({"url": "https://zu.edu.pk/", "text": self.text, "html": f"<p>{self.text}</p>"})
+        self.page_store.close()
+        return self.scraped_pages
+
+
+@pytest.mark.asyncio
+async def test_crawl_frees_blobs_the_previous_crawl_left(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    await run_agent(FakeAgent("BS Nursing"))
+    await run_agent(FakeAgent("BS Nursing | MBBS"))
+
+    blobs = BlobStore("memory/blobs")
+    assert blobs.stats()["blobs"] == 2
+    blobs.close()
@@ -0,0 +1,41 @@
+from tools.classify_programs import ProgramClassifier, classify_programs, is_probably_faculty
+
+
+def test_classifies_all_levels_with_confidence():
+    programs = classify_programs([
+        "Bachelor of Science in Nursing",
+        "Executive MS (Clinical Psychology)",
+        "PhD in Public Health Sciences",
+        "MBBS Program at Clifton Campus",
+    ])
+    categories = {p["program_name"]: (p["category"], p["confidence"]) for p in programs}
+    assert categories["Bachelor of Science in Nursing"] == ("undergraduate", 0.9)
+    assert categories["Executive MS (Clinical Psychology)"] == ("masters", 0.9)
+    assert categories["PhD in Public Health Sciences"] == ("phd", 0.6)
+    assert categories["MBBS Program at Clifton Campus"][0] == "undergraduate"
+
+
+def test_undergraduate_takes_priority_anywhere_in_line():
+    [program] = classify_programs(["Master of Science bridging to Bachelor of Science"])
+    assert program["category"] == "undergraduate"
+    assert program["confidence"] == 0.7
+
+
+def test_filters_faculty_news_and_duplicates():
+    programs = classify_programs([
+        "Dr. Ahmed Khan PhD Public Health",
+        "LecturerSara MS Nursing",
+        "Clifton campus hosts BS sports day",
+        "BS Nursing",
+        "Bachelor of Science in Law",
+        "bachelor of science in law",
+    ])
+    assert [p["program_name"] for p in programs] == ["Bachelor of Science in Law"]
+    assert is_probably_faculty("LecturerSara Ali Khan")
+
+
+def test_classify_stream_is_lazy():
+    classifier = ProgramClassifier()
+    stream = classifier.classify_stream(iter(["Bachelor of Science in Law"] * 3))
+    assert next(stream)["program_name"] == "Bachelor of Science in Law"
+    assert list(stream) == []
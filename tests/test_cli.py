@@ -0,0 +1,84 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+import cli
+from core.corrections import CorrectionsService
+from database.sqlite_storage import SQLiteStorage
+
+
+def write_pages(tmp_path):
+    agent_dir = tmp_path / "memory" / "ziauddin_agent"
+    agent_dir.mkdir(parents=True)
+    (agent_dir / "scraped_pages.json").write_text(json.dumps([
+        {"url": "https://zu.edu.pk/programs", "text": "BS Nursing | MBBS"},
+    ]))
+    (agent_dir / "pdf_programs.json").write_text(json.dumps([
+        {"program_name": "Doctor of Physical Therapy", "university": "Ziauddin University", "category": "undergraduate",
+         "admission_open": False, "deadlines": [], "source_text": "DPT", "source_url": "https://zu.edu.pk/p.pdf"},
+    ]))
+    return agent_dir
+
+
+@pytest.mark.asyncio
+async def test_extract_sets_provenance_and_merges_pdf_programs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    agent_dir = write_pages(tmp_path)
+
+    async def fake_stream(text, url):
+        for name in text.split(" | "):
+            yield {"program_name": name, "category": "undergraduate", "admission_open": True}
+
+    monkeypatch.setattr("core.extractor.stream_admission_info", fake_stream)
+    programs = await cli.extract_agent("ziauddin_agent")
+
+    assert [p["program_name"] for p in programs] == ["BS Nursing", "MBBS", "Doctor of Physical Therapy"]
+    assert programs[0]["source_url"] == "https://zu.edu.pk/programs"
+    assert programs[0]["university"] == "Ziauddin University"
+    assert json.loads((agent_dir / "agent_output.json").read_text()) == programs
+
+
+@pytest.mark.asyncio
+async def test_extract_keeps_programs_streamed_before_an_error(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_pages(tmp_path)
+
+    async def failing_stream(text, url):
+        yield {"program_name": "BS Nursing", "category": "undergraduate", "admission_open": True}
+        raise RuntimeError("connection dropped")
+
+    monkeypatch.setattr("core.extractor.stream_admission_info", failing_stream)
+    programs = await cli.extract_agent("ziauddin_agent")
+
+    assert [p["program_name"] for p in programs] == ["BS Nursing", "Doctor of Physical Therapy"]
+
+
+def test_sync_applies_corrections_and_writes_only_changes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    agent_dir = write_pages(tmp_path)
+    program = {"program_name": "BS Nursing", "university": "Ziauddin University", "category": "undergraduate",
+               "admission_open": True, "source_text": "BS Nursing", "source_url": "https://zu.edu.pk/programs"}
+    (agent_dir / "agent_output.json").write_text(json.dumps([program]))
+    storage = SQLiteStorage(str(tmp_path / "storage.db"))
+    storage.upsert_corrected_programs("Ziauddin University", {
+        "BS Nursing": {"category": "nursing", "deadlines": [], "admission_open": False},
+    })
+
+    corrected = cli.sync_agent("ziauddin_agent", storage, CorrectionsService(storage))
+
+    assert corrected[0]["category"] == "nursing"
+    [row] = storage.get_extracted_programs("Ziauddin University")
+    assert row["category"] == "nursing" and row["admission_open"] is False
+    assert json.loads((agent_dir / "corrected.json").read_text()) == corrected
+    assert "BS Nursing" in json.loads((agent_dir / "sync_state.json").read_text())["Ziauddin University"]
+
+
+def test_extract_and_sync_stages_do_not_import_the_browser():
+    code = (
+        "import sys, cli, core.extractor, database.program_sync, core.corrections, tools.page_store; "
+        "print(any(m.startswith(('playwright', 'supabase', 'agents')) for m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,40 @@
+from unittest.mock import MagicMock
+
+from core.corrections import CorrectionIndex, CorrectionsService, normalize_program_name
+
+
+def test_normalize_program_name():
+    expected = "bachelor science computer science"
+    assert normalize_program_name("BS Computer Science") == expected
+    assert normalize_program_name("B.S. (Hons) Computer-Science") == expected
+    assert normalize_program_name("Bachelor of Science in Computer Science") == expected
+    assert normalize_program_name("Ph.D. Physics") == normalize_program_name("Doctor of Philosophy in Physics")
+
+
+def test_index_applies_and_reports_unmatched():
+    index = CorrectionIndex({
+        "BS Computer Science": {"category": "undergraduate", "admission_open": True, "deadlines": ["2025-08-01"]},
+        "MBA Executive": {"category": "masters", "admission_open": False},
+    })
+    program = {"program_name": "Bachelor of Science (Hons) in Computer Science", "category": "other", "admission_open": False}
+    changes = index.apply(program)
+
+    assert {field for field, _, _ in changes} == {"category", "admission_open", "deadlines"}
+    assert program["admission_open"] is True
+    assert "Executive MBA" in index
+    assert index.unmatched() == []
+    assert CorrectionIndex({"MS Physics": {}}).unmatched() == ["MS Physics"]
+
+
+def test_service_caches_per_university():
+    storage = MagicMock()
+    storage.get_corrected_programs.return_value = {"BS Nursing": {"category": "undergraduate"}}
+    service = CorrectionsService(storage, ttl=60)
+
+    assert service.get("Ziauddin University") is service.get("Ziauddin University")
+    assert storage.get_corrected_programs.call_count == 1
+
+    # A failed reload keeps the stale index
+    service.ttl = 0
+    storage.get_corrected_programs.side_effect = RuntimeError("offline")
+    assert service.get("Ziauddin University").get("BSN") == {"category": "undergraduate"}
@@ -1,31 +1,105 @@
+import json
 import pytest
-import httpx
-from unittest.mock import AsyncMock, MagicMock
-from core.extractor import extract_admission_info
+from tenacity import wait_none
+import core.extractor as extractor
+from core.extractor import extract_admission_info, iter_candidate_lines, stream_admission_info
+from tools.mock_llm_server import MockLLMServer, prompt_hash
+
+PROGRAMS = [{
+    "program_name": "BS Computer Science",
+    "category": "undergraduate",
+    "admission_open": True,
+    "application_deadline": "2025-12-31",
+    "link": "https://example.com",
+    "source_text": "BS Computer Science - Admissions Open",
+    "source_url": "https://example.com"
+}]
+
+
+@pytest.fixture
+def llm_server(monkeypatch):
+    server = MockLLMServer(responder=lambda payload: json.dumps(PROGRAMS))
+    with server:
+        monkeypatch.setattr(extractor, "GROQ_API_KEY", "test-key")
+        monkeypatch.setattr(extractor, "GROQ_API_URL", server.url)
+        yield server
 
-@pytest.mark.asyncio
-async def test_extract_admission_info():
-    # Mock Groq API response
-    mock_response = {
-        "choices": [{
-            "message": {
-                "content": json.dumps([{
-                    "program_name": "BS Computer Science",
-                    "category": "undergraduate",
-                    "admission_open": True,
-                    "application_deadline": "2025-12-31",
-                    "link": "https://example.com",
-                    "source_text": "BS Computer Science - Admissions Open",
-                    "source_url": "https://example.com"
-                }])
-            }
-        }]
-    }
-    client = AsyncMock()
-    client.post = AsyncMock(return_value=MagicMock(json=lambda: mock_response, raise_for_status=lambda: None))
-    httpx.AsyncClient = MagicMock(return_value=client)
 
+@pytest.mark.asyncio
+async def test_extract_admission_info(llm_server):
     result = await extract_admission_info("<html>BS Computer Science</html>", "https://example.com")
     assert len(result) == 1
     assert result[0]["program_name"] == "BS Computer Science"
-    assert result[0]["category"] == "undergraduate"
\ No newline at end of file
+    assert result[0]["category"] == "undergraduate"
+
+
+@pytest.mark.asyncio
+async def test_extract_admission_info_retries_rate_limits(llm_server):
+    llm_server.rate_limit_every = 2  # every 2nd request gets a 429
+    extract = extract_admission_info.retry_with(wait=wait_none())
+
+    assert await extract("<html>BS Computer Science</html>", "https://example.com") == PROGRAMS
+    assert await extract("<html>BS Computer Science</html>", "https://example.com") == PROGRAMS
+    assert llm_server.stats["rate_limited"] == 1
+    assert llm_server.stats["requests"] == 3
+
+
+@pytest.mark.asyncio
+async def test_stream_admission_info(llm_server):
+    llm_server.chunk_size = 5
+    result = [p async for p in stream_admission_info("<html>BS Computer Science</html>", "https://example.com")]
+    assert result == PROGRAMS
+    assert llm_server.stats["streamed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_replays_recorded_response(llm_server, tmp_path):
+    replayed = [dict(PROGRAMS[0], program_name="BS Replayed")]
+    llm_server.replay_dir = str(tmp_path)
+    payload = extractor._build_payload("BS Computer Science", "https://example.com")
+    with open(tmp_path / f"{prompt_hash(payload)}.json", "w", encoding="utf-8") as f:
+        json.dump({"content": json.dumps(replayed)}, f)
+
+    result = await extract_admission_info("<html>BS Computer Science</html>", "https://example.com")
+    assert result == replayed
+    assert llm_server.stats["replayed"] == 1
+
+
+def test_iter_candidate_lines_prefilters_and_dedupes_across_pages():
+    pages = [
+        {"text": "Home | BACHELOR OF LAWS (LL.B.) | Contact Us | MS IN NURSING (MSN)"},
+        {"text": "Bachelor of Laws (LL.B.)\nNews | Apply Now | MBBS"},
+    ]
+    lines = list(iter_candidate_lines(pages))
+    assert lines == ["BACHELOR OF LAWS (LL.B.)", "MS IN NURSING (MSN)"]
+
+
+def test_prefilter_matches_degree_abbreviations_as_whole_words():
+    text = "Our programs | Information desk | Jobs and careers | Email the registrar | BSc Medical Technology | Pharm-D"
+    assert list(iter_candidate_lines([{"text": text}])) == ["BSc Medical Technology", "Pharm-D"]
+
+
+@pytest.mark.asyncio
+async def test_refine_scraped_pages(monkeypatch):
+    import core.groq_refiner as groq_refiner
+    with MockLLMServer() as server:
+        monkeypatch.setattr(groq_refiner, "GROQ_API_KEY", "test-key")
+        monkeypatch.setattr(groq_refiner, "GROQ_API_URL", server.url)
+        result = await groq_refiner.refine_scraped_pages([
+            {"text": "Home | Bachelor of Science in Nursing | Master of Science in Nursing"},
+        ])
+    assert [p["program_name"] for p in result] == [
+        "Bachelor of Science in Nursing", "Master of Science in Nursing"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_stream_records_a_span_for_every_attempt(llm_server):
+    llm_server.rate_limit_every = 2
+    errors = extractor.metrics.counter("llm_request_errors", host="example.com")
+
+    for _ in range(2):
+        stream = stream_admission_info("<html>BS Computer Science</html>", "https://example.com", retry_wait=wait_none())
+        assert [p async for p in stream] == PROGRAMS
+    assert llm_server.stats["rate_limited"] == 1
+    assert extractor.metrics.counter("llm_request_errors", host="example.com") == errors + 1
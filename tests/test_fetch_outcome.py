@@ -0,0 +1,111 @@
+import pytest
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from tenacity import wait_none
+
+from tools.fetch_outcome import (
+    BLOCKED, CHALLENGE, CIRCUIT_OPEN, DNS, HTTP_STATUS, SOFT_404, TIMEOUT, FetchError, HostCircuitBreaker,
+    classify_exception, classify_page, classify_status,
+)
+from tools.web_scraper import WebScraper
+
+
+def test_page_classification_only_looks_at_title_and_heading():
+    assert classify_page("Just a moment...", "") == CHALLENGE
+    assert classify_page("Attention Required! | Cloudflare", "Sorry, you have been blocked") == BLOCKED
+    assert classify_page("Page Not Found - Ziauddin University", "Home | Programs") == SOFT_404
+    body = "Undergraduate Programs | " * 20 + "Visitors are blocked from the lab. Results not found? Server error pages"
+    assert classify_page("Programs - Ziauddin University", body) is None
+    assert classify_status(503) == HTTP_STATUS and classify_status(403) == BLOCKED and classify_status(200) is None
+
+
+def test_errors_are_classified_and_only_transient_ones_retry():
+    dns = classify_exception("https://zu.edu.pk/", Exception("net::ERR_NAME_NOT_RESOLVED at https://zu.edu.pk/"))
+    timeout = classify_exception("https://zu.edu.pk/", PlaywrightTimeoutError("Timeout 60000ms exceeded."))
+    assert (dns.outcome, dns.retryable, dns.host_failure) == (DNS, False, True)
+    assert (timeout.outcome, timeout.retryable) == (TIMEOUT, True)
+    assert FetchError("u", HTTP_STATUS, status=503).retryable
+    assert not FetchError("u", HTTP_STATUS, status=404).retryable
+    assert not FetchError("u", HTTP_STATUS, status=404).host_failure
+    assert not FetchError("u", SOFT_404).host_failure
+
+
+def test_circuit_opens_after_failures_and_half_opens_after_the_timeout():
+    now = [0.0]
+    breaker = HostCircuitBreaker(failure_threshold=2, reset_timeout=60, clock=lambda: now[0])
+    assert not breaker.record_failure("zu.edu.pk")
+    assert breaker.record_failure("zu.edu.pk")
+    assert not breaker.allow("zu.edu.pk") and breaker.allow("iqra.edu.pk")
+
+    now[0] = 61
+    assert breaker.allow("zu.edu.pk")
+    # Only one trial fetch at a time; its failure reopens the circuit
+    assert not breaker.allow("zu.edu.pk")
+    assert breaker.record_failure("zu.edu.pk")
+    assert breaker.is_open("zu.edu.pk")
+
+    now[0] = 122
+    assert breaker.allow("zu.edu.pk")
+    breaker.record_success("zu.edu.pk")
+    assert breaker.state("zu.edu.pk") == "closed"
+
+
+@pytest.mark.asyncio
+async def test_fetch_retries_transient_failures_and_stops_at_an_open_circuit():
+    scraper = WebScraper(breaker=HostCircuitBreaker(failure_threshold=2))
+    attempts = []
+
+    async def load(url, mode):
+        attempts.append(url)
+        raise FetchError(url, TIMEOUT)
+
+    scraper._load_page = load
+    fetch = WebScraper.fetch_page.retry_with(wait=wait_none())
+    with pytest.raises(FetchError) as error:
+        await fetch(scraper, "https://zu.edu.pk/a")
+    # The second timeout opened the circuit, so the third attempt never ran
+    assert error.value.outcome == TIMEOUT and len(attempts) == 2
+
+    assert await scraper.get_page_data("https://zu.edu.pk/b") is None
+    assert len(attempts) == 2
+    with pytest.raises(FetchError) as error:
+        await fetch(scraper, "https://zu.edu.pk/c")
+    assert error.value.outcome == CIRCUIT_OPEN
+
+
+@pytest.mark.asyncio
+async def test_blocked_pages_are_not_retried():
+    scraper = WebScraper()
+    attempts = []
+
+    async def load(url, mode):
+        attempts.append(url)
+        raise FetchError(url, BLOCKED, status=403)
+
+    scraper._load_page = load
+    assert await scraper.get_page_data("https://zu.edu.pk/") is None
+    assert attempts == ["https://zu.edu.pk/"]
+
+
+@pytest.mark.asyncio
+async def test_a_soft_404_trial_fetch_closes_the_circuit():
+    now = [0.0]
+    scraper = WebScraper(breaker=HostCircuitBreaker(failure_threshold=1, reset_timeout=60, clock=lambda: now[0]))
+    scraper.breaker.record_failure("zu.edu.pk")
+    now[0] = 61
+
+    async def load(url, mode):
+        raise FetchError(url, SOFT_404)
+
+    scraper._load_page = load
+    assert await scraper.get_page_data("https://zu.edu.pk/old-page") is None
+    assert scraper.breaker.state("zu.edu.pk") == "closed"
+
+
+def test_a_trial_without_a_verdict_lets_the_next_one_through():
+    now = [0.0]
+    breaker = HostCircuitBreaker(failure_threshold=1, reset_timeout=60, clock=lambda: now[0])
+    breaker.record_failure("zu.edu.pk")
+    now[0] = 61
+    assert breaker.allow("zu.edu.pk") and not breaker.allow("zu.edu.pk")
+    breaker.end_trial("zu.edu.pk")
+    assert breaker.allow("zu.edu.pk")
@@ -0,0 +1,70 @@
+import base64
+import json
+
+import httpx
+
+from agents.ziauddin_agent import ZiauddinAgent
+from tools.fixture_site_server import CHALLENGE_COOKIE, FixtureSiteServer, SyntheticSite
+from tools.web_scraper import WebScraper
+
+
+def test_synthetic_site_pages_link_to_programs():
+    site = SyntheticSite(programs=120, per_page=50)
+    with FixtureSiteServer(site=site) as server:
+        home = httpx.get(server.url("/"))
+        listing = httpx.get(server.url("/programs/?page=3"))
+        program = httpx.get(server.url("/programs/7/"))
+        missing = httpx.get(server.url("/programs/500/"))
+
+    assert home.status_code == 200 and "/programs/?page=3" in home.text
+    assert listing.text.count('href="/programs/1') == 20 and "Next programs" not in listing.text
+    assert site.program_name(7) in program.text
+    assert missing.status_code == 404
+    assert server.stats["pages"] == 3 and server.stats["not_found"] == 1
+
+
+def test_agent_link_filter_follows_fixture_site():
+    with FixtureSiteServer(site=SyntheticSite(programs=10, per_page=5)) as server:
+        html = httpx.get(server.url("/programs/")).text
+        agent = ZiauddinAgent.__new__(ZiauddinAgent)
+        agent.base_domain = server.base_url
+        links = agent._extract_program_links(html, server.url("/programs/"))
+    assert server.url("/programs/3/") in links
+    assert server.url("/programs/?page=2") in links
+
+
+def test_challenge_until_cookie_and_errors():
+    site = SyntheticSite(programs=5)
+    with FixtureSiteServer(site=site, challenge_rate=1.0) as server:
+        challenged = httpx.get(server.url("/"))
+        cleared = httpx.get(server.url("/"), cookies={CHALLENGE_COOKIE: "1"})
+    assert challenged.status_code == 503
+    assert WebScraper()._is_cloudflare_challenge(challenged.text)
+    assert cleared.status_code == 200 and server.stats["challenges"] == 1
+
+    with FixtureSiteServer(site=site, error_rate=1.0) as server:
+        assert httpx.get(server.url("/")).status_code == 503
+    assert server.stats["errors"] == 1
+
+
+def test_replays_recorded_pages_and_har(tmp_path):
+    pages = tmp_path / "scraped_pages.json"
+    pages.write_text(json.dumps([
+        {"url": "https://admission.zu.edu.pk/program-detail?id=187", "html": "<p>MBBS</p>", "text": "MBBS"},
+        {"url": "https://zu.edu.pk/dom", "html": None, "text": "BS Nursing | Apply now", "links": []},
+    ]))
+    har = tmp_path / "site.har"
+    har.write_text(json.dumps({"log": {"entries": [
+        {"request": {"url": "https://zu.edu.pk/a.png"},
+         "response": {"status": 200, "content": {"mimeType": "image/png", "encoding": "base64",
+                                                 "text": base64.b64encode(b"\x89PNG").decode()}}},
+    ]}}))
+
+    server = FixtureSiteServer()
+    assert server.load_pages(str(pages)) == 2
+    assert server.load_har(str(har)) == 1
+    with server:
+        assert httpx.get(server.url("/program-detail?id=187")).text == "<p>MBBS</p>"
+        assert "<p>BS Nursing</p>" in httpx.get(server.url("/dom")).text
+        image = httpx.get(server.url("/a.png"))
+    assert image.content == b"\x89PNG" and image.headers["content-type"] == "image/png"
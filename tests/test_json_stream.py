@@ -0,0 +1,31 @@
+import json
+from core.json_stream import JSONArrayStreamParser, parse_json_array
+
+PROGRAMS = [
+    {"program_name": "BS Computer Science", "category": "undergraduate", "source_text": "BS {CS} | \"Apply\" [Now]"},
+    {"program_name": "MS Nursing", "category": "masters", "deadlines": ["2025-10-10"]},
+]
+
+
+def test_emits_objects_as_they_complete():
+    text = "```json\n" + json.dumps(PROGRAMS, indent=2) + "\n```"
+    parser = JSONArrayStreamParser()
+    emitted = []
+    for i in range(0, len(text), 3):
+        emitted.extend(parser.feed(text[i:i + 3]))
+    parser.close()
+    assert emitted == PROGRAMS
+    assert parser.errors == 0
+
+
+def test_salvages_complete_objects_from_truncated_output():
+    text = json.dumps(PROGRAMS)
+    truncated = text[:text.index("MS Nursing") + 5]
+    assert parse_json_array(truncated) == PROGRAMS[:1]
+
+
+def test_skips_malformed_object_and_keeps_the_rest():
+    text = '[{"program_name": "BS Law", "category": undergraduate}, ' + json.dumps(PROGRAMS[1]) + "]"
+    parser = JSONArrayStreamParser()
+    assert parser.feed(text) == [PROGRAMS[1]]
+    assert parser.errors == 1
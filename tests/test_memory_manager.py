@@ -0,0 +1,51 @@
+import json
+import time
+from functools import partial
+
+import tools.memory_manager as memory_manager
+from tests.program_helpers import make_program
+
+program = partial(
+    make_program, admission_open=False, deadlines=["2025-08-01", "2025-09-01"], extraction_date="2025-01-01"
+)
+
+
+def test_iter_changes_keyed_by_program():
+    old = [program("BS Nursing"), program("BS Law"), program("MBBS")]
+    new = [
+        program("MBBS", deadlines=["2025-09-01", "2025-08-01"], extraction_date="2025-02-01"),
+        program("BS Nursing", admission_open=True),
+        program("BS Midwifery"),
+    ]
+    changes = {tuple(c["key"]): c for c in memory_manager.iter_changes(old, new)}
+
+    assert {key[1]: c["change"] for key, c in changes.items()} == {
+        "BS Nursing": "changed", "BS Midwifery": "added", "BS Law": "removed",
+    }
+    assert changes[("Ziauddin University", "BS Nursing")]["fields"] == {"admission_open": {"old": False, "new": True}}
+    assert memory_manager.corrections_from_changes(changes.values()) == {"BS Nursing": {"admission_open": True}}
+
+
+def test_diff_of_large_catalog_is_fast():
+    old = [program(f"BS Program {i}") for i in range(10000)]
+    new = [program(f"BS Program {i}", admission_open=(i % 100 == 0)) for i in range(10000)]
+    start = time.perf_counter()
+    changes = list(memory_manager.iter_changes(old, new))
+    assert len(changes) == 100
+    assert time.perf_counter() - start < 1.0
+
+
+def test_compare_outputs_and_update_memory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    memory_manager.save_memory("test_agent", [program("BS Nursing"), program("BS Law")])
+    memory_manager.update_memory("test_agent", [program("BS Nursing", category="masters")], kind="corrected")
+    memory_manager.update_memory(
+        "test_agent", [program("BS Law")], kind="corrected", removed=[("Ziauddin University", "BS Nursing")]
+    )
+    assert [p["program_name"] for p in memory_manager.load_memory("test_agent", "corrected")] == ["BS Law"]
+
+    changes = memory_manager.compare_outputs("test_agent")
+    assert [c["change"] for c in changes] == ["removed"]
+    with open(tmp_path / "memory" / "test_agent" / "diffs.jsonl", encoding="utf-8") as f:
+        logged = [json.loads(line) for line in f]
+    assert logged[0]["key"] == ["Ziauddin University", "BS Nursing"]
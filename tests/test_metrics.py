@@ -0,0 +1,66 @@
+import asyncio
+import json
+
+import pytest
+
+from core.metrics import Metrics, host_of
+
+
+def test_span_records_durations_and_errors():
+    m = Metrics()
+    with m.span("fetch", host="zu.edu.pk"):
+        pass
+    with pytest.raises(ValueError):
+        with m.span("fetch", host="zu.edu.pk"):
+            raise ValueError("boom")
+
+    report = m.report()
+    [span] = report["spans"]
+    assert span["name"] == "fetch" and span["tags"] == {"host": "zu.edu.pk"} and span["count"] == 2
+    assert m.counter("fetch_errors", host="zu.edu.pk") == 1
+    assert report["stages"]["fetch"]["count"] == 2
+
+
+def test_context_tags_apply_and_nest():
+    m = Metrics()
+    with m.tags(agent="ziauddin_agent"):
+        m.incr("llm_tokens", 10, kind="prompt")
+        with m.tags(host="zu.edu.pk"):
+            m.incr("llm_tokens", 5, kind="completion")
+    m.incr("llm_tokens", 1, kind="prompt")
+
+    assert m.counter("llm_tokens", agent="ziauddin_agent") == 15
+    assert m.counter("llm_tokens", kind="prompt") == 11
+    assert m.counter("llm_tokens", host="zu.edu.pk") == 5
+
+
+@pytest.mark.asyncio
+async def test_tags_follow_work_into_threads():
+    m = Metrics()
+    with m.tags(agent="iqra_agent"):
+        await asyncio.to_thread(m.incr, "db_rows", 3, op="visited_urls")
+    assert m.counter("db_rows", agent="iqra_agent", op="visited_urls") == 3
+
+
+def test_budgets_report_and_prometheus(tmp_path):
+    m = Metrics()
+    for seconds in (0.1, 0.2, 5.0):
+        m.observe("llm_request", seconds, host='a"b')
+    m.observe("clean_html", 0.01)
+    m.incr("fetch_retries", host="zu.edu.pk")
+
+    violations = m.check_budgets({"llm_request": 1.0, "clean_html": 1.0})
+    assert [v["name"] for v in violations] == ["llm_request"]
+
+    report = m.write_report(str(tmp_path / "report.json"), budgets={"llm_request": 1.0})
+    assert json.loads((tmp_path / "report.json").read_text())["budget_violations"] == report["budget_violations"]
+
+    text = m.prometheus()
+    assert "# TYPE scraper_llm_request_seconds summary" in text
+    assert 'scraper_llm_request_seconds_count{host="a\\"b"} 3' in text
+    assert 'scraper_fetch_retries_total{host="zu.edu.pk"} 1' in text
+
+
+def test_host_of():
+    assert host_of("https://zu.edu.pk/programs/") == "zu.edu.pk"
+    assert host_of(None) == ""
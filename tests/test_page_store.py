@@ -0,0 +1,88 @@
+import json
+import os
+
+from tools.page_store import PageRecord, PageStore, load_pages
+
+
+def page(i, size=2000):
+    return {"url": f"https://zu.edu.pk/p/{i}", "title": f"Page {i}", "text": "Bachelor of Science | " * (size // 22)}
+
+
+def test_append_get_and_stream(tmp_path):
+    store = PageStore(str(tmp_path / "pages"), segment_size=300, compression="gzip")
+    for i in range(20):
+        store.append(page(i))
+    store.append({**page(3), "title": "Updated"})
+
+    assert len(store) == 20
+    assert store.get("https://zu.edu.pk/p/3")["title"] == "Updated"
+    assert store.get("https://zu.edu.pk/missing") is None
+    assert len([name for name in os.listdir(tmp_path / "pages") if name.endswith(".seg")]) > 1
+    store.close()
+
+    # Reopening rebuilds the index from record headers
+    reopened = PageStore(str(tmp_path / "pages"), compression="gzip")
+    titles = {p["url"]: p["title"] for p in reopened}
+    assert len(titles) == 20 and titles["https://zu.edu.pk/p/3"] == "Updated"
+    reopened.clear()
+    assert len(reopened) == 0 and list(reopened) == []
+
+
+def test_torn_record_is_truncated(tmp_path):
+    store = PageStore(str(tmp_path / "pages"), compression="gzip")
+    store.append(page(1))
+    store.append(page(2))
+    store.close()
+    segment = tmp_path / "pages" / "pages-00001.seg"
+    with open(segment, "r+b") as f:
+        f.truncate(os.path.getsize(segment) - 10)
+
+    store = PageStore(str(tmp_path / "pages"), compression="gzip")
+    assert store.urls() == ["https://zu.edu.pk/p/1"]
+    store.append(page(3))
+    assert [p["url"] for p in store] == ["https://zu.edu.pk/p/1", "https://zu.edu.pk/p/3"]
+
+
+def test_store_is_smaller_than_json(tmp_path):
+    pages = [page(i, size=20000) for i in range(10)]
+    json_path = tmp_path / "scraped_pages.json"
+    json_path.write_text(json.dumps(pages, indent=2), encoding="utf-8")
+    with PageStore(str(tmp_path / "pages")) as store:
+        for p in pages:
+            store.append(p)
+
+    stored = sum(os.path.getsize(tmp_path / "pages" / name) for name in os.listdir(tmp_path / "pages"))
+    assert stored * 4 < os.path.getsize(json_path)
+    assert list(load_pages(str(json_path))) == list(load_pages(str(tmp_path / "pages")))
+
+
+def test_page_record_keeps_metadata_and_reads_text_from_the_store(tmp_path):
+    store = PageStore(str(tmp_path / "pages"), blob_dir=str(tmp_path / "blobs"))
+    data = {**page(1), "html": "<p>Bachelor of Science</p>", "load_time": 1.5}
+    store.append(data)
+    record = PageRecord.from_page(data, store)
+
+    assert not hasattr(record, "__dict__")
+    assert record.text_length == len(data["text"]) and record["load_time"] == 1.5
+    assert record["text"] == data["text"] and record.get("html") == data["html"]
+    assert record.get("links", []) == []
+    store.close()
+
+
+def test_page_record_text_reads_only_the_text_blob(tmp_path):
+    store = PageStore(str(tmp_path / "pages"), blob_dir=str(tmp_path / "blobs"))
+    data = {**page(1), "html": "<p>Bachelor of Science</p>"}
+    store.append(data)
+    record = PageRecord.from_page(data, store)
+
+    read = []
+    get = store.blobs.get
+    store.blobs.get = lambda digest: read.append(digest) or get(digest)
+    assert record.text == data["text"] and record["text"] == data["text"]
+    assert read == [store.get(data["url"], resolve=False)["text_hash"]] * 2
+    store.close()
+
+    plain = PageStore(str(tmp_path / "plain"))
+    plain.append(data)
+    assert PageRecord.from_page(data, plain).text == data["text"]
+    plain.close()
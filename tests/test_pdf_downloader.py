@@ -0,0 +1,99 @@
+import httpx
+import pytest
+
+from tools.pdf_downloader import PDFDownloader, is_pdf_link
+from tools.university_scraper_agent import UniversityScraperAgent
+
+PDF_BYTES = b"%PDF-1.4\n" + b"x" * 5000
+
+
+def make_handler(requests, body=PDF_BYTES, ranges=True, etag=None, range_offset=0):
+    def handler(request):
+        requests.append(request.headers.get("range"))
+        range_header = request.headers.get("range")
+        headers = {"ETag": etag} if etag else {}
+        if etag and request.headers.get("if-none-match") == etag:
+            return httpx.Response(304, headers=headers)
+        if ranges and range_header:
+            start = int(range_header.split("=")[1].rstrip("-")) + range_offset
+            headers["Content-Range"] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+            return httpx.Response(206, content=body[start:], headers=headers)
+        return httpx.Response(200, content=body, headers=headers)
+    return handler
+
+
+def test_is_pdf_link_and_discovery():
+    assert is_pdf_link("/docs/Prospectus-2025.PDF?v=2")
+    assert not is_pdf_link("/programs/pdf-guide")
+    anchors = [{"href": "/files/prospectus.pdf"}, {"href": "/programs/"}]
+    assert UniversityScraperAgent._pdf_links(anchors, "https://zu.edu.pk/admissions/") == {"https://zu.edu.pk/files/prospectus.pdf"}
+
+
+@pytest.mark.asyncio
+async def test_download_resumes_partial_file(tmp_path):
+    requests = []
+    client = httpx.AsyncClient(transport=httpx.MockTransport(make_handler(requests)))
+    downloader = PDFDownloader(str(tmp_path), client=client, chunk_size=1024)
+    url = "https://zu.edu.pk/files/prospectus.pdf"
+    with open(downloader.path_for(url) + ".part", "wb") as f:
+        f.write(PDF_BYTES[:2000])
+
+    path = await downloader.download(url)
+
+    assert requests == ["bytes=2000-"]
+    with open(path, "rb") as f:
+        assert f.read() == PDF_BYTES
+    # Without validators a cached file is kept after a HEAD shows the same size
+    assert await downloader.download(url) == path and len(requests) == 2
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_cached_pdf_is_revalidated(tmp_path):
+    requests = []
+    url = "https://zu.edu.pk/files/prospectus.pdf"
+    handlers = [make_handler(requests, etag='"v1"')]
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: handlers[-1](request)))
+    downloader = PDFDownloader(str(tmp_path), client=client)
+    path = await downloader.download(url)
+    # Unchanged: the conditional GET answers 304 and the file is reused
+    assert await downloader.download(url) == path and len(requests) == 2
+
+    republished = b"%PDF-1.7\n" + b"y" * 3000
+    handlers.append(make_handler(requests, body=republished, etag='"v2"'))
+    assert await downloader.download(url) == path
+    with open(path, "rb") as f:
+        assert f.read() == republished
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_resume_at_the_wrong_offset_starts_over(tmp_path):
+    requests = []
+    client = httpx.AsyncClient(transport=httpx.MockTransport(make_handler(requests, range_offset=100)))
+    downloader = PDFDownloader(str(tmp_path), client=client)
+    url = "https://zu.edu.pk/files/prospectus.pdf"
+    with open(downloader.path_for(url) + ".part", "wb") as f:
+        f.write(PDF_BYTES[:2000])
+
+    path = await downloader.download(url)
+
+    assert requests == ["bytes=2000-", None]
+    with open(path, "rb") as f:
+        assert f.read() == PDF_BYTES
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_download_rejects_large_and_non_pdf(tmp_path):
+    requests = []
+    client = httpx.AsyncClient(transport=httpx.MockTransport(make_handler(requests)))
+    small = PDFDownloader(str(tmp_path), max_bytes=1000, client=client)
+    assert await small.download("https://zu.edu.pk/big.pdf") is None
+
+    html = httpx.AsyncClient(transport=httpx.MockTransport(make_handler(requests, body=b"<html>Not found</html>")))
+    downloader = PDFDownloader(str(tmp_path), client=html)
+    assert await downloader.download("https://zu.edu.pk/missing.pdf") is None
+    assert list(tmp_path.iterdir()) == []
+    await client.aclose()
+    await html.aclose()
@@ -0,0 +1,132 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import tools.pdf_extractor as pdf_extractor
+from agents.pdf_agent import PDFAgent
+from tools.pdf_cache import PDFPageCache
+from tools.pdf_downloader import PDFDownloader
+from tools.university_scraper_agent import UniversityScraperAgent
+from tests.pdf_helpers import make_pdf
+
+PROSPECTUS = [
+    "Undergraduate Programs\nBachelor of Science in Nursing\nBachelor of Business Administration",
+    "",
+    "Postgraduate Programs\nMaster of Public Health\nPhD in Molecular Medicine",
+]
+
+
+def fake_ocr(path, index, settings):
+    return f"Scanned page {index + 1}\nDoctor of Physical Therapy"
+
+
+def test_text_layer_pages_without_ocr(tmp_path):
+    path = make_pdf(str(tmp_path / "prospectus.pdf"), PROSPECTUS)
+    pages = list(pdf_extractor.iter_pdf_pages(path, ocr=False))
+
+    assert [p["source"] for p in pages] == ["text", "empty", "text"]
+    assert "Bachelor of Science in Nursing" in pages[0]["text"]
+
+
+def test_only_scanned_pages_go_to_ocr_in_order(tmp_path, monkeypatch):
+    path = make_pdf(str(tmp_path / "prospectus.pdf"), PROSPECTUS + ["", ""])
+    monkeypatch.setattr(pdf_extractor, "ocr_available", lambda: True)
+    monkeypatch.setattr(pdf_extractor, "ocr_pdf_page", fake_ocr)
+
+    pages = list(pdf_extractor.iter_pdf_pages(path, max_workers=2, max_in_flight=1))
+    assert [p["index"] for p in pages] == [0, 1, 2, 3, 4]
+    assert [p["source"] for p in pages] == ["text", "ocr", "text", "ocr", "ocr"]
+    assert pages[3]["text"].startswith("Scanned page 4")
+
+
+def test_pdf_agent_streams_into_classifier(tmp_path):
+    path = make_pdf(str(tmp_path / "prospectus.pdf"), PROSPECTUS)
+    programs = PDFAgent(path, ocr=False, cache=False).extract_programs()
+    names = {p["program_name"] for p in programs}
+
+    assert "Bachelor of Science in Nursing" in names
+    assert "Master of Public Health" in names
+
+
+def test_cache_skips_parsing_and_reuses_ocr_by_page(tmp_path, monkeypatch):
+    calls = []
+
+    def counting_ocr(path, index, settings):
+        calls.append(index)
+        return fake_ocr(path, index, settings)
+
+    monkeypatch.setattr(pdf_extractor, "ocr_available", lambda: True)
+    monkeypatch.setattr(pdf_extractor, "ocr_pdf_page", counting_ocr)
+    # Run OCR in-process so the counter sees every call
+    monkeypatch.setattr(pdf_extractor, "ProcessPoolExecutor", lambda max_workers: ThreadPoolExecutor(max_workers))
+    cache = PDFPageCache(str(tmp_path / "cache.db"))
+    path = make_pdf(str(tmp_path / "prospectus.pdf"), PROSPECTUS)
+
+    first = list(pdf_extractor.iter_pdf_pages(path, cache=cache, layout=True))
+    assert calls == [1]
+    assert first[0]["layout"][0]["text"] == "Undergraduate Programs"
+
+    again = list(pdf_extractor.iter_pdf_pages(path, cache=cache, layout=True))
+    assert calls == [1] and again == first
+    assert cache.hits >= 4
+
+    # A republished file with a new text page keeps the scanned page's OCR
+    republished = make_pdf(str(tmp_path / "prospectus-2025.pdf"), PROSPECTUS + ["Bachelor of Dental Surgery " * 3])
+    pages = list(pdf_extractor.iter_pdf_pages(republished, cache=cache))
+    assert calls == [1] and len(pages) == 4
+
+    # Changing OCR settings is a different key
+    list(pdf_extractor.iter_pdf_pages(path, cache=cache, ocr_settings={"psm": 4}))
+    assert calls == [1, 1]
+
+
+def test_cached_text_layer_respects_layout(tmp_path):
+    cache = PDFPageCache(str(tmp_path / "cache.db"))
+    path = make_pdf(str(tmp_path / "prospectus.pdf"), PROSPECTUS)
+
+    plain = list(pdf_extractor.iter_pdf_pages(path, ocr=False, cache=cache))
+    with_layout = list(pdf_extractor.iter_pdf_pages(path, ocr=False, cache=cache, layout=True))
+
+    assert plain[0]["layout"] is None
+    assert with_layout[0]["layout"][0]["text"] == "Undergraduate Programs"
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = PDFPageCache(str(tmp_path / "cache.db"), max_bytes=250)
+    for index in range(3):
+        cache.put("file", index, None, {"source": "text", "text": "x" * 100})
+    cache.get("file", 1)
+    cache.put("file", 3, None, {"source": "text", "text": "x" * 100})
+
+    assert cache.get("file", 1) is not None
+    assert cache.get("file", 0) is None
+    assert cache.stats()["bytes"] <= 250
+
+
+@pytest.mark.asyncio
+async def test_linked_pdfs_share_one_cache_that_is_closed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    paths = {f"https://zu.edu.pk/{i}.pdf": make_pdf(str(tmp_path / f"{i}.pdf"), PROSPECTUS) for i in range(2)}
+    caches = []
+
+    class TrackedCache(PDFPageCache):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.closed = False
+            caches.append(self)
+
+        def close(self):
+            self.closed = True
+            super().close()
+
+    async def download(self, url):
+        return paths[url]
+
+    monkeypatch.setattr("tools.pdf_cache.PDFPageCache", TrackedCache)
+    monkeypatch.setattr(PDFDownloader, "download", download)
+    monkeypatch.setattr(pdf_extractor, "ocr_available", lambda: False)
+    agent = UniversityScraperAgent(None)
+
+    programs = await agent._extract_pdf_programs(set(paths), max_pdfs=10)
+    assert {p["source_url"] for p in programs} == set(paths)
+    assert len(caches) == 1 and caches[0].closed
@@ -0,0 +1,79 @@
+from functools import partial
+
+from database.program_sync import ProgramSync
+from database.sqlite_storage import SQLiteStorage
+from tests.program_helpers import make_program
+
+program = partial(make_program, university="Test University", source_url="https://example.edu/programs")
+
+
+class CountingStorage(SQLiteStorage):
+    def __init__(self, path):
+        super().__init__(path)
+        self.written = []
+
+    def upsert_extracted_programs(self, programs, chunk_size=500):
+        self.written.extend(p["program_name"] for p in programs)
+        return super().upsert_extracted_programs(programs, chunk_size)
+
+
+def test_sync_writes_only_changes(tmp_path):
+    storage = CountingStorage(str(tmp_path / "storage.db"))
+    state_path = str(tmp_path / "sync_state.json")
+    programs = [program(f"BS Program {i}") for i in range(4)]
+
+    summary = ProgramSync(storage, state_path=state_path).sync("Test University", programs)
+    assert summary["inserted"] == 4
+    assert len(storage.written) == 4
+
+    # A fresh instance reloads the hashes; one change and one removal
+    storage.written.clear()
+    changed = [program(f"BS Program {i}") for i in range(3)]
+    changed[0]["admission_open"] = False
+    summary = ProgramSync(storage, state_path=state_path).sync("Test University", changed)
+    assert storage.written == ["BS Program 0"]
+    assert (summary["updated"], summary["deleted"], summary["unchanged"]) == (1, 1, 2)
+
+    rows = {p["program_name"]: p for p in storage.get_extracted_programs("Test University")}
+    assert sorted(rows) == ["BS Program 0", "BS Program 1", "BS Program 2"]
+    assert rows["BS Program 0"]["admission_open"] is False
+    last_seen = storage.conn.execute(
+        "SELECT last_seen FROM extracted_programs WHERE program_name = 'BS Program 1'"
+    ).fetchone()[0]
+    assert last_seen is not None
+    storage.close()
+
+
+def test_sync_skips_mass_delete(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "storage.db"))
+    sync = ProgramSync(storage, state_path=str(tmp_path / "sync_state.json"))
+    sync.sync("Test University", [program(f"MS Program {i}") for i in range(4)])
+
+    summary = sync.sync("Test University", [program("MS Program 0")])
+    assert summary["deleted"] == 0
+    assert len(storage.get_extracted_programs("Test University")) == 4
+    storage.close()
+
+
+def test_delete_guard_ignores_this_runs_inserts(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "storage.db"))
+    sync = ProgramSync(storage, state_path=str(tmp_path / "sync_state.json"))
+    sync.sync("Test University", [program(f"MS Program {i}") for i in range(4)])
+
+    # Every program renamed: 4 inserts must not make 4 deletes look like half the catalog
+    summary = sync.sync("Test University", [program(f"MS Renamed {i}") for i in range(4)])
+    assert (summary["inserted"], summary["deleted"]) == (4, 0)
+    storage.close()
+
+
+def test_lost_state_is_rebuilt_from_storage(tmp_path):
+    storage = CountingStorage(str(tmp_path / "storage.db"))
+    programs = [program(f"BS Program {i}") for i in range(3)]
+    ProgramSync(storage, state_path=str(tmp_path / "sync_state.json")).sync("Test University", programs)
+    storage.conn.execute("DELETE FROM extracted_programs WHERE program_name = 'BS Program 2'")
+    storage.written.clear()
+
+    summary = ProgramSync(storage, state_path=str(tmp_path / "new_state.json")).sync("Test University", programs)
+    assert storage.written == ["BS Program 2"]
+    assert (summary["inserted"], summary["unchanged"]) == (1, 2)
+    storage.close()
@@ -0,0 +1,62 @@
+from functools import partial
+
+import pytest
+
+from database.sqlite_storage import SQLiteStorage
+from database.storage import StorageBackend, create_storage, sync_extracted_programs
+from tests.program_helpers import make_program
+
+program = partial(make_program, university="NUST", source_url="https://nust.edu.pk/")
+
+
+def test_a_backend_must_implement_the_whole_interface():
+    class PartialStorage(StorageBackend):
+        def get_visited_urls(self, university):
+            return set()
+
+    with pytest.raises(TypeError, match="upsert_extracted_programs"):
+        PartialStorage()
+
+
+def test_visited_urls_upsert_without_duplicates(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "storage.db"))
+    storage.save_visited_url("NUST", "https://nust.edu.pk/a")
+    storage.upsert_visited_urls([
+        {"university": "NUST", "url": "https://nust.edu.pk/a", "visited_at": "2025-01-01"},
+        {"university": "NUST", "url": "https://nust.edu.pk/b", "visited_at": "2025-01-01"},
+    ])
+    assert storage.get_visited_urls("NUST") == {"https://nust.edu.pk/a", "https://nust.edu.pk/b"}
+    assert storage.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_bulk_upsert_and_corrections(tmp_path):
+    storage = create_storage("sqlite", path=str(tmp_path / "storage.db"))
+    outcomes = storage.upsert_extracted_programs([
+        program("BS Nursing", admission_open=False),
+        program("BS Nursing"),
+        program("BS Law"),
+        {"university": "NUST"},
+    ])
+    assert [o["status"] for o in outcomes] == ["duplicate", "upserted", "upserted", "invalid"]
+    stored = storage.get_extracted_programs("NUST")
+    assert [p["program_name"] for p in stored] == ["BS Law", "BS Nursing"]
+    assert stored[1]["admission_open"] is True
+    assert stored[1]["deadlines"] == ["2025-09-10"]
+
+    storage.upsert_corrected_programs("NUST", {"BS Law": {"category": "undergraduate", "admission_open": True}})
+    assert storage.get_corrected_programs("NUST")["BS Law"]["admission_open"] is True
+
+    target = SQLiteStorage(":memory:")
+    sync_extracted_programs(storage, target, "NUST")
+    assert len(target.get_extracted_programs("NUST")) == 2
+
+
+def test_iter_visited_urls_in_pages(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "storage.db"))
+    storage.upsert_visited_urls([
+        {"university": "NUST", "url": f"https://nust.edu.pk/{i:03d}", "visited_at": "2025-01-01"} for i in range(250)
+    ])
+    urls = list(storage.iter_visited_urls("NUST", page_size=100))
+    assert urls == sorted(urls) and len(urls) == 250
+    storage.upsert_corrected_programs("NUST", {"BS Physics": {"category": "undergraduate", "deadlines": [], "admission_open": True}})
+    assert dict(storage.iter_corrected_programs("NUST", page_size=1)) == storage.get_corrected_programs("NUST")
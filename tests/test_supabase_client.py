@@ -0,0 +1,97 @@
+from unittest.mock import MagicMock
+
+import httpx
+
+import database.supabase_client as supabase_module
+from database.supabase_client import SupabaseClient
+from tests.program_helpers import make_program as program
+
+
+def make_client(monkeypatch):
+    monkeypatch.setattr(supabase_module, "create_client", lambda url, key: MagicMock())
+    return SupabaseClient("https://example.supabase.co", "key")
+
+
+def test_upsert_extracted_programs_dedupes_and_chunks(monkeypatch):
+    client = make_client(monkeypatch)
+    programs = [
+        program("BS Nursing", admission_open=False),
+        program("BS Law"),
+        {"university": "Ziauddin University", "program_name": "MS Nursing"},
+        program("BS Nursing"),
+        program("BS Midwifery"),
+    ]
+
+    outcomes = client.upsert_extracted_programs(programs, chunk_size=2)
+
+    assert [o["status"] for o in outcomes] == ["duplicate", "upserted", "invalid", "upserted", "upserted"]
+    upsert = client.client.table.return_value.upsert
+    assert upsert.call_count == 2
+    sent = [row for call in upsert.call_args_list for row in call.args[0]]
+    assert [row["program_name"] for row in sent] == ["BS Nursing", "BS Law", "BS Midwifery"]
+    assert sent[0]["admission_open"] is True
+    assert upsert.call_args.kwargs["on_conflict"] == "university,program_name"
+
+
+def test_upsert_transport_error_fails_only_its_chunk(monkeypatch):
+    client = make_client(monkeypatch)
+    execute = client.client.table.return_value.upsert.return_value.execute
+    execute.side_effect = [None, httpx.ReadTimeout("timed out")]
+
+    outcomes = client.upsert_extracted_programs([program("BS Nursing"), program("BS Law"), program("MBBS")], chunk_size=2)
+
+    assert [o["status"] for o in outcomes] == ["upserted", "upserted", "error"]
+    assert "timed out" in outcomes[2]["error"]
+
+
+class FakeQuery:
+    """Just enough of the PostgREST builder to serve keyset pages from a list."""
+
+    def __init__(self, rows, max_rows):
+        self.rows = rows
+        self.max_rows = max_rows
+        self.requests = 0
+
+    def table(self, name):
+        self.filters = []
+        self.limit_value = None
+        return self
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row[column] == value)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda row: row[column] > value)
+        return self
+
+    def order(self, column):
+        self.key = column
+        return self
+
+    def limit(self, value):
+        self.limit_value = value
+        return self
+
+    def execute(self):
+        self.requests += 1
+        rows = sorted((r for r in self.rows if all(f(r) for f in self.filters)), key=lambda r: r[self.key])
+        return MagicMock(data=rows[:min(self.limit_value, self.max_rows)])
+
+
+def test_get_visited_urls_pages_past_server_cap(monkeypatch):
+    client = make_client(monkeypatch)
+    rows = [{"university": "Ziauddin University", "url": f"https://zu.edu.pk/{i:04d}"} for i in range(2500)]
+    rows.append({"university": "NUST", "url": "https://nust.edu.pk/"})
+    # The server returns at most 1000 rows whatever the requested page size
+    client.client = FakeQuery(rows, max_rows=1000)
+
+    visited = client.get_visited_urls("Ziauddin University")
+
+    assert len(visited) == 2500
+    assert "https://nust.edu.pk/" not in visited
+    assert client.client.requests == 4
+    assert len(list(client.iter_visited_urls("Ziauddin University", page_size=2000))) == 2500
@@ -0,0 +1,64 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import MagicMock
+from database.visited_url_buffer import VisitedUrlBuffer
+
+
+@pytest.mark.asyncio
+async def test_flushes_on_size_and_dedupes():
+    client = MagicMock()
+    buffer = VisitedUrlBuffer(client, max_batch=2, flush_interval=60)
+    buffer.add("NUST", "https://nust.edu.pk/a")
+    buffer.add("NUST", "https://nust.edu.pk/a")
+    assert len(buffer) == 1
+    buffer.add("NUST", "https://nust.edu.pk/b")
+    for _ in range(50):
+        if buffer.flushed:
+            break
+        await asyncio.sleep(0.01)
+    assert buffer.flushed == 2
+    [records] = client.upsert_visited_urls.call_args.args
+    assert [r["url"] for r in records] == ["https://nust.edu.pk/a", "https://nust.edu.pk/b"]
+    await buffer.close()
+
+
+@pytest.mark.asyncio
+async def test_keeps_records_on_failure_and_spills_on_close(tmp_path):
+    client = MagicMock()
+    client.upsert_visited_urls.side_effect = ConnectionError("database unreachable")
+    spill_path = tmp_path / "pending_visited_urls.json"
+    buffer = VisitedUrlBuffer(client, flush_interval=60, spill_path=str(spill_path))
+    buffer.add("NUST", "https://nust.edu.pk/a")
+
+    assert await buffer.flush() is False
+    assert len(buffer) == 1
+    await buffer.close()
+    assert json.loads(spill_path.read_text())[0]["url"] == "https://nust.edu.pk/a"
+
+    # The next run picks the spilled records up again and writes them
+    client.upsert_visited_urls.side_effect = None
+    buffer = VisitedUrlBuffer(client, spill_path=str(spill_path))
+    assert len(buffer) == 1
+    await buffer.close()
+    assert buffer.flushed == 1
+    assert not spill_path.exists()
+
+
+@pytest.mark.asyncio
+async def test_spill_file_survives_until_its_records_are_written(tmp_path):
+    spill_path = tmp_path / "pending_visited_urls.json"
+    spill_path.write_text(json.dumps([{"university": "NUST", "url": "https://nust.edu.pk/a", "visited_at": "t"}]))
+    client = MagicMock()
+    client.upsert_visited_urls.side_effect = ConnectionError("database unreachable")
+
+    # A run that dies before flushing must not lose the spilled records
+    VisitedUrlBuffer(client, spill_path=str(spill_path))
+    buffer = VisitedUrlBuffer(client, spill_path=str(spill_path))
+    assert len(buffer) == 1 and spill_path.exists()
+    assert await buffer.flush() is False
+    assert spill_path.exists()
+
+    client.upsert_visited_urls.side_effect = None
+    assert await buffer.flush() is True
+    assert not spill_path.exists()
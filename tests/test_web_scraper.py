@@ -8,3 +8,17 @@ def test_scrape():
     assert "Ziauddin University" in html
     scraper.close()
 
+
+
+def test_page_data_from_dom():
+    result = {
+        "title": "Programs",
+        "blocks": ["Undergraduate Programmes", "BS Nursing | 4 Years"],
+        "tables": [[["BS Nursing", "4 Years"]]],
+        "links": [{"text": "BS Nursing", "href": "https://zu.edu.pk/programs/bs-nursing/"}],
+    }
+    page = WebScraper._page_data_from_dom("https://zu.edu.pk/programs/", result)
+    assert page["text"] == "Undergraduate Programmes | BS Nursing | 4 Years"
+    assert page["html"] is None
+    assert page["tables"] == [[["BS Nursing", "4 Years"]]]
+    assert page["links"][0]["href"] == "https://zu.edu.pk/programs/bs-nursing/"
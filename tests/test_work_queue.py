@@ -0,0 +1,147 @@
+import json
+
+import pytest
+
+from core.distributed import Worker, enqueue_run, merge_shard_outputs
+from core.work_queue import WorkQueue
+from database.sqlite_storage import SQLiteStorage
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.db"), retry_delay=0)
+    yield queue
+    queue.close()
+
+
+def test_a_task_is_leased_to_one_worker_at_a_time(tmp_path, queue):
+    task_id = queue.enqueue("crawl", {"agent": "ziauddin_agent"}, key="run:crawl")
+    assert queue.enqueue("crawl", {"agent": "ziauddin_agent"}, key="run:crawl") == task_id
+
+    other = WorkQueue(str(tmp_path / "queue.db"))
+    try:
+        task = queue.lease("a")
+        assert task["id"] == task_id and task["payload"] == {"agent": "ziauddin_agent"}
+        assert other.lease("b") is None
+        assert not other.complete(task_id, "b")
+        assert queue.complete(task_id, "a", {"pages": 3})
+        assert other.get(task_id)["result"] == {"pages": 3}
+    finally:
+        other.close()
+
+
+def test_dependencies_run_in_order_and_failures_cascade(queue):
+    crawl = queue.enqueue("crawl", {})
+    extract = queue.enqueue("extract", {}, depends_on=crawl)
+    other_crawl = queue.enqueue("crawl", {})
+    sync = queue.enqueue("sync", {}, depends_on=[extract, other_crawl])
+
+    assert queue.lease("w", kinds=["extract", "sync"]) is None
+    assert queue.lease("w")["id"] == crawl
+    queue.complete(crawl, "w")
+    assert queue.lease("w")["id"] == extract
+    queue.complete(extract, "w")
+
+    assert queue.lease("w")["id"] == other_crawl
+    assert queue.fail(other_crawl, "w", "boom", retry=False) == "failed"
+    assert queue.get(sync)["status"] == "failed"
+    assert queue.pending() == 0
+
+
+def test_expired_leases_are_reclaimed_and_retries_are_bounded(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.db"), lease_seconds=-1, max_attempts=2, retry_delay=0)
+    try:
+        task_id = queue.enqueue("crawl", {})
+        assert queue.lease("dead")["attempts"] == 1
+        # The first worker never heartbeats, so the next lease takes the task over
+        task = queue.lease("alive")
+        assert task["id"] == task_id and task["attempts"] == 2
+        assert not queue.heartbeat(task_id, "dead")
+        assert queue.fail(task_id, "alive", "timeout") == "failed"
+        assert queue.stats() == {"crawl": {"queued": 0, "leased": 0, "done": 0, "failed": 1}}
+    finally:
+        queue.close()
+
+
+def test_failed_attempts_back_off(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.db"), retry_delay=60)
+    try:
+        task_id = queue.enqueue("extract", {})
+        queue.lease("w")
+        assert queue.fail(task_id, "w", "rate limited") == "queued"
+        assert queue.lease("w") is None
+        assert queue.get(task_id)["error"] == "rate limited"
+    finally:
+        queue.close()
+
+
+def test_sharded_plan_waits_for_every_shard(queue):
+    plan = enqueue_run(queue, ["ziauddin_agent"], shards=2, run_id="r1")
+    assert enqueue_run(queue, ["ziauddin_agent"], shards=2, run_id="r1") == plan
+
+    tasks = queue.tasks()
+    crawls = [task for task in tasks if task["kind"] == "crawl"]
+    assert [task["payload"]["target"] for task in crawls] == ["ziauddin_agent.shard0", "ziauddin_agent.shard1"]
+    assert sum(len(task["payload"]["start_urls"]) for task in crawls) > 0
+    [sync] = [task for task in tasks if task["kind"] == "sync"]
+    assert sync["payload"]["targets"] == ["ziauddin_agent.shard0", "ziauddin_agent.shard1"]
+
+
+@pytest.mark.asyncio
+async def test_worker_runs_the_plan_and_retries_failures(tmp_path, queue):
+    enqueue_run(queue, ["ziauddin_agent"], run_id="r1")
+    calls = []
+    flaky = {"extract": 1}
+
+    def handler(kind):
+        async def run(payload):
+            calls.append(kind)
+            if flaky.get(kind):
+                flaky[kind] -= 1
+                raise RuntimeError("LLM unavailable")
+            return {"kind": kind}
+        return run
+
+    worker = Worker(str(tmp_path / "queue.db"), poll_interval=0, handlers={k: handler(k) for k in ("crawl", "extract", "sync")})
+    assert await worker.run(exit_when_idle=True) == 3
+
+    assert calls == ["crawl", "extract", "extract", "sync"]
+    assert worker.failed == 1
+    assert {task["status"] for task in queue.tasks()} == {"done"}
+
+
+def test_shard_outputs_are_merged_for_sync(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for i, name in enumerate(["BS Nursing", "MBBS"]):
+        shard_dir = tmp_path / "memory" / f"ziauddin_agent.shard{i}"
+        shard_dir.mkdir(parents=True)
+        (shard_dir / "agent_output.json").write_text(json.dumps([{"program_name": name}]))
+
+    assert merge_shard_outputs("ziauddin_agent", ["ziauddin_agent.shard0", "ziauddin_agent.shard1"]) == 2
+    merged = json.loads((tmp_path / "memory" / "ziauddin_agent" / "agent_output.json").read_text())
+    assert [p["program_name"] for p in merged] == ["BS Nursing", "MBBS"]
+
+
+@pytest.mark.asyncio
+async def test_a_shard_crawl_leaves_the_base_agents_spill_alone(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for target, url in [("ziauddin_agent", "https://zu.edu.pk/base"), ("ziauddin_agent.shard1", "https://zu.edu.pk/shard")]:
+        spill = tmp_path / "memory" / target / "pending_visited_urls.json"
+        spill.parent.mkdir(parents=True)
+        spill.write_text(json.dumps([{"university": "Ziauddin University", "url": url, "visited_at": "t"}]))
+    crawled = []
+
+    async def fake_run_agent(agent, force_scrape=False):
+        crawled.append(agent)
+        return []
+
+    monkeypatch.setattr("core.agent_manager.run_agent", fake_run_agent)
+    worker = Worker(str(tmp_path / "queue.db"))
+    worker._storage = (SQLiteStorage(str(tmp_path / "storage.db")), None)
+    await worker.crawl({"agent": "ziauddin_agent", "target": "ziauddin_agent.shard1", "start_urls": ["https://zu.edu.pk/"]})
+
+    buffer = crawled[0].visited_buffer
+    assert buffer.spill_path == "memory/ziauddin_agent.shard1/pending_visited_urls.json"
+    assert [url for _, url in buffer._pending] == ["https://zu.edu.pk/shard"]
+    assert (tmp_path / "memory" / "ziauddin_agent" / "pending_visited_urls.json").exists()
+    worker.queue.close()
@@ -0,0 +1,105 @@
+# tools/blob_store.py - Content-addressed, reference-counted storage for page HTML and text
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+
+from tools.codec import codec_for, compress, decompress
+
+_whitespace = re.compile(r"\s+")
+
+
+def content_hash(content: str) -> str:
+    """SHA-256 of the content with whitespace runs collapsed, so reformatting alone keeps the hash."""
+    normalized = _whitespace.sub(" ", content).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class BlobStore:
+    """Deduplicated blobs addressed by ``content_hash``.
+
+    Each distinct content is written once, compressed, under
+    ``<directory>/<hash[:2]>/<hash>``; storing it again only bumps a
+    reference count kept in ``refs.db``. Owners such as PageStore release
+    their references when a record is replaced or cleared, and ``gc``
+    deletes the blobs nobody references any more, so old snapshots cost
+    space only for content that actually changed.
+    """
+
+    def __init__(self, directory: str = "memory/blobs", compression: str = None):
+        self.directory = directory
+        self.codec = codec_for(compression)
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(directory, "refs.db"), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS blobs (hash TEXT PRIMARY KEY, size INTEGER NOT NULL, refcount INTEGER NOT NULL) WITHOUT ROWID"
+        )
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def put(self, content: str) -> str:
+        """Store content (or reference an identical blob) and return its hash."""
+        digest = content_hash(content)
+        with self._lock, self.conn:
+            updated = self.conn.execute("UPDATE blobs SET refcount = refcount + 1 WHERE hash = ?", (digest,)).rowcount
+            if not updated:
+                path = self._path(digest)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                data = bytes([self.codec]) + compress(content.encode("utf-8"), self.codec)
+                with open(f"{path}.tmp", "wb") as f:
+                    f.write(data)
+                os.replace(f"{path}.tmp", path)
+                self.conn.execute("INSERT INTO blobs (hash, size, refcount) VALUES (?, ?, 1)", (digest, len(data)))
+        return digest
+
+    def get(self, digest: str) -> str:
+        with open(self._path(digest), "rb") as f:
+            data = f.read()
+        return decompress(data[1:], data[0]).decode("utf-8")
+
+    def release(self, digest: str):
+        """Drop one reference; the blob stays on disk until ``gc``."""
+        with self._lock, self.conn:
+            self.conn.execute("UPDATE blobs SET refcount = MAX(refcount - 1, 0) WHERE hash = ?", (digest,))
+
+    def refcount(self, digest: str) -> int:
+        with self._lock:
+            row = self.conn.execute("SELECT refcount FROM blobs WHERE hash = ?", (digest,)).fetchone()
+        return row[0] if row else 0
+
+    def __contains__(self, digest: str) -> bool:
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone() is not None
+
+    def gc(self) -> dict:
+        """Delete unreferenced blobs; returns how many and how many bytes were freed.
+
+        Runs under a write lock on ``refs.db``, so a ``put`` from another
+        process waits until the rows and their files are gone and then
+        writes the blob again instead of referencing a deleted file.
+        """
+        with self._lock, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            rows = self.conn.execute("SELECT hash, size FROM blobs WHERE refcount <= 0").fetchall()
+            self.conn.execute("DELETE FROM blobs WHERE refcount <= 0")
+            for digest, _ in rows:
+                try:
+                    os.remove(self._path(digest))
+                except FileNotFoundError:
+                    pass
+        return {"removed": len(rows), "bytes": sum(size for _, size in rows)}
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, size, refs = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(refcount), 0) FROM blobs"
+            ).fetchone()
+        return {"blobs": count, "bytes": size, "references": refs}
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -1,70 +1,161 @@
 # tools/classify_programs.py
 import re
 
-faculty_prefixes = re.compile(
-    r"^(Mr|Ms|Mrs|Dr|Prof|Professor|Lecturer|Assistant Professor|Associate Professor|Engr)\b",
+# Titles glued to the following name ("LecturerAhmed") count as a faculty prefix too
+_glued_titles = re.compile(r"(?i)\b(Lecturer|Professor|Assistant Professor|Associate Professor|Engr)(?=[A-Z])")
+
+# Faculty prefixes (plain or glued) and promotional/news phrases in a single scan
+_faculty_or_news = re.compile(
+    r"^(?:Mr|Ms|Mrs|Dr|Prof|Professor|Lecturer|Assistant Professor|Associate Professor|Engr)\b"
+    r"|^(?:Lecturer|Professor|Assistant Professor|Associate Professor|Engr)(?=[A-Z])"
+    r"|\b(?:hosts?|organized|conducted|celebrates?|sports day|event|seminar)\b",
     re.IGNORECASE
 )
 
-# Define common name prefixes to filter out
-def is_probably_faculty(text):
-    text = text.strip()
-
-    # Fix glued title+degree
-    text = re.sub(r"(?i)\b(Lecturer|Professor|Assistant Professor|Associate Professor|Engr)(?=[A-Z])", r"\1 ", text)
+_whitespace = re.compile(r"\s+")
+_punctuation = re.compile(r"[^\w\s\-\&\(\)]")
+
+# Degree patterns per category, in priority order. "strong" forms spell the
+# degree out or qualify it ("Master of ...", "BS (...)"), "weak" forms are bare
+# abbreviations and get a lower confidence.
+DEGREE_PATTERNS = {
+    "undergraduate": {
+        "strong": r"Bachelor of [A-Za-z\s]+|BS\s?\([A-Za-z\s]+\)|Bachelors of [A-Za-z\s]",
+        "weak": r"bachelors|bachelor|bs|bsc|ba|bba|pharm[\- ]?d|mbbs|bds|b\.?ed|b\.?com|BSc",
+    },
+    "masters": {
+        "strong": r"Master of [A-Za-z\s]+|MS\s?\([A-Za-z\s]+\)|MSc\s?\([A-Za-z\s]+\)",
+    },
+    "phd": {
+        "strong": r"Doctor of Philosophy",
+        "weak": r"Ph\.?D\.?",
+    },
+    "medical": {
+        "weak": r"MBBS|BDS|BSN|Pharm[\- ]?D",
+    },
+}
+
+CONFIDENCE = {"strong": 0.9, "weak": 0.6}
+
+
+def _compile_degree_automaton(patterns: dict):
+    """Fold every category pattern into one alternation.
+
+    Each alternative sits in a lookahead so nothing is consumed: a single
+    scan reports, at every position, the highest-priority category matching
+    there, and an earlier lower-priority match can never hide a later
+    higher-priority one.
+    """
+    alternatives = []
+    groups = {}
+    for priority, (category, strengths) in enumerate(patterns.items()):
+        for strength, pattern in strengths.items():
+            name = f"{category}_{strength}"
+            groups[name] = (priority, category, strength)
+            # (?!\w) rather than \b so forms ending in ")" can match before a space
+            alternatives.append(f"(?P<{name}>(?:{pattern})(?!\\w))")
+    # Every degree starts a word with one of these letters; checking that
+    # first lets the scan skip most positions without trying the alternatives.
+    initials = "".join(sorted({p[0].lower() for s in patterns.values() for v in s.values() for p in v.split("|")}))
+    automaton = re.compile(f"\\b(?=[{initials}])(?=" + "|".join(alternatives) + ")", re.IGNORECASE)
+    return automaton, groups
+
+
+class ProgramClassifier:
+    """Classify candidate lines into program categories in one pass per line.
+
+    All degree patterns are compiled once into a single automaton and the
+    faculty/news filters are precompiled, so per-line cost is a couple of
+    regex scans regardless of how many categories are enabled.
+    """
+
+    def __init__(self, patterns: dict = None, min_length: int = 6, max_length: int = 500):
+        self.patterns = patterns or DEGREE_PATTERNS
+        self.min_length = min_length
+        self.max_length = max_length
+        self._automaton, self._groups = _compile_degree_automaton(self.patterns)
+
+    @staticmethod
+    def clean(line: str) -> str:
+        text = _whitespace.sub(" ", line.strip())
+        return _punctuation.sub("", text)
+
+    @staticmethod
+    def is_probably_faculty(text: str) -> bool:
+        text = text.strip()
+
+        # Known faculty prefixes (including a title glued to the name) or news
+        if _faculty_or_news.search(text):
+            return True
+
+        # Too short or suspicious; each glued title splits one more word
+        words = len(text.split())
+        if words <= 3:
+            return words + len(_glued_titles.findall(text)) <= 3
+
+        return False
+
+    def categorize(self, text: str):
+        """Return (category, confidence) for a cleaned line, or (None, 0.0)."""
+        best = None
+        categories = set()
+        for match in self._automaton.finditer(text):
+            priority, category, strength = self._groups[match.lastgroup]
+            categories.add(category)
+            if best is None or (priority, strength != "strong") < (best[0], best[2] != "strong"):
+                best = (priority, category, strength)
+        if best is None:
+            return None, 0.0
+
+        confidence = CONFIDENCE[best[2]]
+        # Degrees from several levels on one line (e.g. a faculty bio) are less certain
+        if len(categories) > 1:
+            confidence -= 0.2
+        if len(text.split()) > 12:
+            confidence -= 0.1
+        return best[1], round(max(confidence, 0.1), 2)
+
+    def classify_line(self, line: str):
+        return self._classify_clean(self.clean(line))
+
+    def _classify_clean(self, text: str):
+        if len(text) < self.min_length or len(text) > self.max_length:
+            return None
+        # Most lines mention no degree at all, so run the degree scan first
+        category, confidence = self.categorize(text)
+        if not category or self.is_probably_faculty(text):
+            return None
+        return {"program_name": text, "category": category, "confidence": confidence}
+
+    def classify_stream(self, lines):
+        """Lazily classify an iterable of lines, skipping duplicates."""
+        seen = set()
+        for line in lines:
+            # Cheap length check before any regex work
+            if len(line) < self.min_length:
+                continue
+            text = self.clean(line)
+            key = text.lower()
+            if key in seen:
+                continue
+            program = self._classify_clean(text)
+            if program is None:
+                continue
+            seen.add(key)
+            yield program
+
+
+_default_classifier = ProgramClassifier()
 
-    # Known faculty prefixes
-    if faculty_prefixes.match(text):
-        return True
 
-    # Contains multiple degrees — likely a faculty bio
-    #if len(re.findall(r'\b(PhD|MPhil|MS|ME|MSc|MA|MBA|BS|BSc|B\.Ed|B\.Com|MBBS|BDS)\b', text, flags=re.IGNORECASE)) >= 2:
-    #    return True
+# Define common name prefixes to filter out
+def is_probably_faculty(text):
+    return ProgramClassifier.is_probably_faculty(text)
 
-    # Promotional/news phrases (not a program)
-    if re.search(r"\b(hosts?|organized|conducted|celebrates?|sports day|event|seminar)\b", text, re.IGNORECASE):
-        return True
 
-    # Too short or suspicious
-    if len(text.split()) <= 3:
-        return True
+def classify_stream(lines):
+    return _default_classifier.classify_stream(lines)
 
-    return False
 
 def classify_programs(programs):
-    cleaned = []
-    seen = set()
-    
-    degree_patterns = {
-        "undergraduate": re.compile(r"\b(Bachelor of [A-Za-z\s]+|BS\s?\([A-Za-z\s]+\)|Bachelors of [A-Za-z\s]|bachelors|bachelor|bs|bsc|ba|bba|pharm[\- ]?d|mbbs|bds|b\.?ed|b\.?com|BSc)\b", re.IGNORECASE),
-        # "masters": re.compile(r"\b(Master of [A-Za-z\s]+|MS\s?\([A-Za-z\s]+\)|MSc\s?\([A-Za-z\s]+\))\b", re.IGNORECASE),
-        # "phd": re.compile(r"\b(Ph\.?D\.?|Doctor of Philosophy)\b", re.IGNORECASE),
-        "medical": re.compile(r"\b(MBBS|BDS|BSN|Pharm[\- ]?D)\b", re.IGNORECASE)
-    }
-
-    for prog in programs:
-        text = prog.strip()
-        text = re.sub(r"\s+", " ", text)
-        text = re.sub(r"[^\w\s\-\&\(\)]", "", text)
-
-        # Skip if it looks like faculty name or too short/long
-        if is_probably_faculty(text):
-            continue
-
-        if len(text) < 6 or len(text) > 500:
-            continue
-
-        if text.lower() in seen:
-            continue
-
-        category = None
-        for level, pattern in degree_patterns.items():
-            if pattern.search(text):
-                category = level
-                break
-
-        if category:
-            cleaned.append({"program_name": text, "category": category})
-            seen.add(text.lower())
-
-    return cleaned
+    return list(_default_classifier.classify_stream(programs))
@@ -0,0 +1,33 @@
+# tools/codec.py - Compression codecs shared by the page store and blob store
+import gzip
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CODEC_GZIP = 1
+CODEC_ZSTD = 2
+
+
+def codec_for(compression: str = None) -> int:
+    """Codec id for "zstd" or "gzip"; None picks zstd when ``zstandard`` is installed."""
+    if compression is None:
+        compression = "zstd" if zstandard is not None else "gzip"
+    if compression == "zstd" and zstandard is None:
+        raise RuntimeError("zstandard is not installed")
+    return CODEC_ZSTD if compression == "zstd" else CODEC_GZIP
+
+
+def compress(data: bytes, codec: int) -> bytes:
+    if codec == CODEC_ZSTD:
+        return zstandard.ZstdCompressor(level=6).compress(data)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def decompress(data: bytes, codec: int) -> bytes:
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed data")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
@@ -0,0 +1,163 @@
+# tools/fetch_outcome.py - Classify failed page fetches and stop fetching from failing hosts
+import re
+import time
+
+# Why a fetch produced no usable page
+TIMEOUT = "timeout"
+DNS = "dns"
+CONNECTION = "connection"
+HTTP_STATUS = "http_status"
+CHALLENGE = "challenge"
+BLOCKED = "blocked"
+SOFT_404 = "soft_404"
+CIRCUIT_OPEN = "circuit_open"
+ERROR = "error"
+
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+BLOCKED_STATUSES = {401, 403, 451}
+
+# Chromium net:: error codes in Playwright's exception messages
+_NET_ERRORS = [
+    ("ERR_NAME_NOT_RESOLVED", DNS),
+    ("ERR_NAME_RESOLUTION_FAILED", DNS),
+    ("ERR_TIMED_OUT", TIMEOUT),
+    ("ERR_CONNECTION_", CONNECTION),
+    ("ERR_ADDRESS_UNREACHABLE", CONNECTION),
+    ("ERR_INTERNET_DISCONNECTED", CONNECTION),
+    ("ERR_NETWORK_CHANGED", CONNECTION),
+    ("ERR_EMPTY_RESPONSE", CONNECTION),
+]
+
+# Matched against the page title and the start of its visible text only:
+# words like "blocked" or "not found" are ordinary in body copy and menus.
+_CHALLENGE = re.compile(
+    r"just a moment|verify you are human|checking your browser|enable javascript and cookies to continue", re.I
+)
+_BLOCKED = re.compile(
+    r"access denied|403 forbidden|you have been blocked|request (?:was )?blocked|attention required", re.I
+)
+_NOT_FOUND_TITLE = re.compile(r"\b404\b|not found|does not exist|no longer available", re.I)
+_NOT_FOUND_TEXT = re.compile(
+    r"page not found|404 not found|error 404|page (?:you requested )?(?:could not|cannot|can't) be found", re.I
+)
+HEAD_CHARS = 300
+
+
+class FetchError(Exception):
+    """A page fetch that produced no usable page, with the reason as ``outcome``."""
+
+    def __init__(self, url: str, outcome: str, detail: str = "", status: int = None):
+        self.url = url
+        self.outcome = outcome
+        self.detail = detail
+        self.status = status
+        reason = f"{outcome} {status}" if status else outcome
+        super().__init__(f"{reason} for {url}" + (f": {detail}" if detail else ""))
+
+    @property
+    def retryable(self) -> bool:
+        """Transient failures worth another attempt; a block, a 404 or a dead host is not."""
+        if self.outcome == HTTP_STATUS:
+            return self.status in RETRYABLE_STATUSES
+        return self.outcome in (TIMEOUT, CONNECTION)
+
+    @property
+    def host_failure(self) -> bool:
+        """Whether this says the host is down or refusing us, rather than that one page is bad."""
+        if self.outcome == HTTP_STATUS:
+            return self.status in RETRYABLE_STATUSES
+        return self.outcome in (TIMEOUT, DNS, CONNECTION, CHALLENGE, BLOCKED)
+
+
+def classify_exception(url: str, error: Exception) -> FetchError:
+    """Turn a navigation or page error into a FetchError."""
+    message = str(error)
+    for code, outcome in _NET_ERRORS:
+        if code in message:
+            return FetchError(url, outcome, code)
+    # Playwright's TimeoutError is not the builtin one, so match it by name too
+    if isinstance(error, TimeoutError) or type(error).__name__ == "TimeoutError":
+        return FetchError(url, TIMEOUT, message.splitlines()[0] if message else "")
+    return FetchError(url, ERROR, f"{type(error).__name__}: {message.splitlines()[0] if message else ''}")
+
+
+def classify_status(status: int) -> str:
+    """HTTP_STATUS or BLOCKED for an error status, None for a usable response."""
+    if status is None or status < 400:
+        return None
+    return BLOCKED if status in BLOCKED_STATUSES else HTTP_STATUS
+
+
+def classify_page(title: str, text: str, marker: str = "") -> str:
+    """CHALLENGE, BLOCKED or SOFT_404 from a loaded page's title and visible text, or None."""
+    title = title or ""
+    head = (text or "")[:HEAD_CHARS]
+    if marker or _CHALLENGE.search(title) or _CHALLENGE.search(head):
+        return CHALLENGE
+    if _BLOCKED.search(title) or _BLOCKED.search(head):
+        return BLOCKED
+    if _NOT_FOUND_TITLE.search(title) or _NOT_FOUND_TEXT.search(head):
+        return SOFT_404
+    return None
+
+
+class HostCircuitBreaker:
+    """Stop fetching from a host after ``failure_threshold`` consecutive host failures.
+
+    An open circuit refuses fetches for ``reset_timeout`` seconds; then one
+    trial fetch is let through, and its result closes the circuit or opens
+    it again. ``record_failure(host, trip=True)`` opens it at once, for
+    failures such as DNS errors that the next attempt will hit too.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 300.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        # host -> {"failures", "opened_at", "probing"}
+        self._hosts = {}
+
+    def state(self, host: str) -> str:
+        entry = self._hosts.get(host)
+        if entry is None or entry["opened_at"] is None:
+            return "closed"
+        if entry["probing"] or self.clock() - entry["opened_at"] < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def is_open(self, host: str) -> bool:
+        return self.state(host) == "open"
+
+    def allow(self, host: str) -> bool:
+        """Whether to fetch from ``host`` now; a half-open circuit allows a single trial fetch."""
+        state = self.state(host)
+        if state == "half_open":
+            self._hosts[host]["probing"] = True
+            return True
+        return state == "closed"
+
+    def record_success(self, host: str):
+        self._hosts.pop(host, None)
+
+    def end_trial(self, host: str):
+        """Release a half-open trial that ended without a verdict (cancelled, or a page-level error).
+
+        The circuit stays open and the next ``allow`` lets another trial through.
+        """
+        entry = self._hosts.get(host)
+        if entry is not None:
+            entry["probing"] = False
+
+    def record_failure(self, host: str, trip: bool = False) -> bool:
+        """Count a host failure; returns True if this opened the circuit."""
+        entry = self._hosts.setdefault(host, {"failures": 0, "opened_at": None, "probing": False})
+        entry["failures"] += 1
+        was_open = entry["opened_at"] is not None and not entry["probing"]
+        if trip or entry["probing"] or entry["failures"] >= self.failure_threshold:
+            entry["opened_at"] = self.clock()
+            entry["probing"] = False
+            return not was_open
+        return False
+
+    def open_hosts(self) -> list:
+        return sorted(host for host in self._hosts if self.is_open(host))
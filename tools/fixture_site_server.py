@@ -0,0 +1,361 @@
+# tools/fixture_site_server.py - Local stand-in for university websites, for crawl load tests
+import argparse
+import base64
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from tools import page_store
+
+LEVELS = ["Bachelor of Science in", "Master of Science in", "Doctor of Philosophy in", "BS", "MPhil", "Diploma in"]
+FIELDS = [
+    "Computer Science", "Nursing", "Clinical Psychology", "Business Administration", "Medical Technology",
+    "Public Health", "Law", "Physical Therapy", "Midwifery", "Pharmacy", "Biotechnology", "Dental Surgery",
+    "Radiology", "Nutrition", "Data Science", "Software Engineering", "Economics", "Mathematics",
+]
+CAMPUSES = ["Clifton", "North Nazimabad", "Hyderabad", "Karachi"]
+NOISE_SECTIONS = ["news", "events", "faculty", "research", "alumni"]
+
+CHALLENGE_COOKIE = "cf_clearance"
+
+# Shaped like Cloudflare's interstitial so WebScraper's detection and wait loop run for real.
+# The script sets the clearance cookie and reloads, like the real challenge does.
+CHALLENGE_PAGE = """<!DOCTYPE html><html><head><title>Just a moment...</title></head>
+<body><div id="cf-challenge-running" class="cf-browser-verification">
+<h1>Verify you are human</h1><p>Enable JavaScript and cookies to continue</p><p>Ray ID: {ray}</p></div>
+<script>setTimeout(function () {{
+  document.cookie = "{cookie}=1; path=/";
+  location.reload();
+}}, {delay_ms});</script></body></html>"""
+
+
+def route_key(url: str) -> str:
+    """Path plus query string; recorded pages are served regardless of their original host."""
+    parts = urlsplit(url)
+    return (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+
+def page_html(page: dict) -> str:
+    """HTML for a recorded page; DOM-mode pages are rebuilt from their blocks, tables and links."""
+    if page.get("html"):
+        return page["html"]
+    blocks = page.get("blocks") or [b for b in (page.get("text") or "").split(" | ") if b]
+    body = "".join(f"<p>{block}</p>" for block in blocks)
+    for table in page.get("tables") or []:
+        body += "<table>" + "".join("<tr>" + "".join(f"<td>{c}</td>" for c in row) + "</tr>" for row in table) + "</table>"
+    body += "".join(f'<a href="{link["href"]}">{link.get("text", "")}</a>' for link in page.get("links") or [])
+    return f"<html><head><title>{page.get('title', '')}</title></head><body>{body}</body></html>"
+
+
+class SyntheticSite:
+    """A deterministic university site with ``programs`` program pages.
+
+    Pages are generated from the path on request, so a site with tens of
+    thousands of pages costs no memory. The home page links to paginated
+    program listings (``per_page`` programs each) and to noise sections;
+    every program page has a details table, a deadline and links to
+    related programs, so link discovery has real work to do.
+    """
+
+    def __init__(self, programs: int = 1000, per_page: int = 50, related: int = 5, seed: int = 0, padding: int = 2000):
+        self.programs = programs
+        self.per_page = per_page
+        self.related = related
+        self.seed = seed
+        self.padding = padding
+
+    def program_name(self, index: int) -> str:
+        rng = random.Random(self.seed * 1_000_003 + index)
+        return f"{rng.choice(LEVELS)} {rng.choice(FIELDS)} {index}"
+
+    def _layout(self, title: str, body: str, rng: random.Random) -> str:
+        nav = "".join(f'<li><a href="/{section}/">{section.title()}</a></li>' for section in NOISE_SECTIONS)
+        # Boilerplate the cleaner has to strip, sized like a real theme's markup
+        filler = "".join(
+            f'<div class="elementor-widget-container"><span>{rng.random():.8f}</span></div>'
+            for _ in range(self.padding // 60)
+        )
+        return (
+            f"<!DOCTYPE html><html><head><title>{title}</title><script>var ga = {rng.random()};</script>"
+            f"<style>.x{{color:red}}</style></head><body><header><nav><ul>"
+            f'<li><a href="/">Home</a></li><li><a href="/programs/">Programs</a></li>{nav}</ul></nav></header>'
+            f"<main>{body}</main>{filler}<footer>© Synthetic University · Contact us</footer></body></html>"
+        )
+
+    def pages(self) -> int:
+        return -(-self.programs // self.per_page)
+
+    def render(self, path: str, query: dict) -> str:
+        """Return the page's HTML, or None for a path the site does not have."""
+        rng = random.Random(f"{self.seed}:{path}:{sorted(query.items())}")
+        if path in ("/", "/index.html"):
+            listing = "".join(f'<li><a href="/programs/?page={p}">Programs page {p}</a></li>' for p in range(1, self.pages() + 1))
+            return self._layout("Synthetic University", f"<h1>Admissions Open</h1><ul class=\"programs-list\">{listing}</ul>", rng)
+
+        if path == "/programs/":
+            page = int((query.get("page") or ["1"])[0])
+            start = (page - 1) * self.per_page
+            if page < 1 or start >= self.programs:
+                return None
+            rows = "".join(
+                f'<tr><td><a href="/programs/{i}/">{self.program_name(i)}</a></td><td>{rng.choice(CAMPUSES)}</td>'
+                f"<td>{rng.choice(['Open', 'Closed'])}</td></tr>"
+                for i in range(start, min(start + self.per_page, self.programs))
+            )
+            pager = f'<a href="/programs/?page={page + 1}">Next programs</a>' if start + self.per_page < self.programs else ""
+            table = f"<table><tr><th>Program</th><th>Campus</th><th>Admission</th></tr>{rows}</table>"
+            return self._layout(f"Programs - page {page}", f"<h1>Programs Offered</h1>{table}{pager}", rng)
+
+        if path.startswith("/programs/"):
+            slug = path[len("/programs/"):].strip("/")
+            if not slug.isdigit() or int(slug) >= self.programs:
+                return None
+            index = int(slug)
+            name = self.program_name(index)
+            related = "".join(
+                f'<li><a href="/programs/{j}/">{self.program_name(j)}</a></li>'
+                for j in (rng.randrange(self.programs) for _ in range(self.related))
+            )
+            body = (
+                f"<h1>{name}</h1><table><tr><th>Program</th><td>{name}</td></tr>"
+                f"<tr><th>Campus</th><td>{rng.choice(CAMPUSES)}</td></tr>"
+                f"<tr><th>Deadline</th><td>{rng.randint(1, 28)}-Aug-2025</td></tr>"
+                f"<tr><th>Duration</th><td>{rng.randint(2, 5)} years</td></tr></table>"
+                f"<p>The {name} programme prepares students for careers in the field.</p>"
+                f"<h2>Related programs</h2><ul>{related}</ul>"
+            )
+            return self._layout(name, body, rng)
+
+        section = path.strip("/")
+        if section in NOISE_SECTIONS:
+            items = "".join(f"<p>{section.title()} item {i}: campus hosts annual sports day</p>" for i in range(10))
+            return self._layout(section.title(), items, rng)
+        return None
+
+
+class FixtureSiteServer:
+    """Threaded HTTP server that replays recorded pages or a synthetic site.
+
+    Recorded routes (``add_page``, ``load_pages``, ``load_har``) take
+    precedence over the synthetic site. Every response can be delayed by
+    ``latency`` plus up to ``jitter`` seconds; ``error_rate`` answers a
+    fraction of requests with 503, and ``challenge_rate`` puts a fraction of
+    paths behind a Cloudflare-style interstitial that clears itself after
+    ``challenge_delay`` seconds by setting a cookie and reloading.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        challenge_rate: float = 0.0,
+        challenge_delay: float = 1.0,
+        site: SyntheticSite = None,
+        seed: int = None,
+    ):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.challenge_rate = challenge_rate
+        self.challenge_delay = challenge_delay
+        self.site = site
+        self.routes = {}
+        self._random = random.Random(seed)
+        self._challenge_seed = seed or 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+        self.stats = {"requests": 0, "pages": 0, "not_found": 0, "errors": 0, "challenges": 0, "bytes": 0}
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def url(self, path: str = "/") -> str:
+        return self.base_url + path
+
+    def add_page(self, path: str, body, status: int = 200, content_type: str = "text/html; charset=utf-8"):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.routes[path] = (status, content_type, body)
+
+    def load_html_file(self, path: str, route: str = "/"):
+        with open(path, "r", encoding="utf-8") as f:
+            self.add_page(route, f.read())
+
+    def load_pages(self, path: str) -> int:
+        """Serve pages saved by a crawl (a page store directory or scraped_pages.json)."""
+        count = 0
+        for page in page_store.load_pages(path):
+            self.add_page(route_key(page["url"]), page_html(page))
+            count += 1
+        return count
+
+    def load_har(self, path: str) -> int:
+        """Serve the responses recorded in a HAR archive (e.g. from browser dev tools)."""
+        with open(path, "r", encoding="utf-8") as f:
+            har = json.load(f)
+        count = 0
+        for entry in har.get("log", {}).get("entries", []):
+            response = entry.get("response", {})
+            content = response.get("content", {})
+            text = content.get("text")
+            if text is None:
+                continue
+            body = base64.b64decode(text) if content.get("encoding") == "base64" else text.encode("utf-8")
+            self.add_page(
+                route_key(entry["request"]["url"]), body,
+                status=response.get("status") or 200,
+                content_type=content.get("mimeType") or "text/html; charset=utf-8",
+            )
+            count += 1
+        return count
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler_class())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count(self, key: str, value: int = 1):
+        with self._lock:
+            self.stats[key] += value
+
+    def _is_challenged(self, route: str) -> bool:
+        # Decided per path, so a path stays behind the challenge until the cookie is set
+        return self.challenge_rate > 0 and random.Random(f"{self._challenge_seed}:{route}").random() < self.challenge_rate
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            return self.error_rate > 0 and self._random.random() < self.error_rate
+
+    def resolve(self, route: str):
+        """Return (status, content_type, body) for a path and query."""
+        if route in self.routes:
+            return self.routes[route]
+        parts = urlsplit(route)
+        html = self.site.render(parts.path or "/", parse_qs(parts.query)) if self.site else None
+        if html is None:
+            return 404, "text/html; charset=utf-8", b"<html><head><title>Page Not Found</title></head><body>Not Found</body></html>"
+        return 200, "text/html; charset=utf-8", html.encode("utf-8")
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, content_type: str, body: bytes, headers: dict = None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(body)
+                server._count("bytes", len(body))
+
+            def do_HEAD(self):
+                self.do_GET()
+
+            def do_GET(self):
+                server._count("requests")
+                delay = server.latency + (server._random.uniform(0, server.jitter) if server.jitter else 0.0)
+                if delay:
+                    time.sleep(delay)
+
+                if server._should_fail():
+                    server._count("errors")
+                    self._send(503, "text/html; charset=utf-8", b"<html><body>Service temporarily unavailable</body></html>")
+                    return
+
+                cookies = self.headers.get("Cookie") or ""
+                if server._is_challenged(self.path) and f"{CHALLENGE_COOKIE}=" not in cookies:
+                    server._count("challenges")
+                    page = CHALLENGE_PAGE.format(
+                        ray=f"{random.getrandbits(64):016x}",
+                        cookie=CHALLENGE_COOKIE,
+                        delay_ms=int(server.challenge_delay * 1000),
+                    )
+                    self._send(503, "text/html; charset=utf-8", page.encode("utf-8"), {"Server": "cloudflare"})
+                    return
+
+                status, content_type, body = server.resolve(self.path)
+                server._count("pages" if status < 400 else "not_found")
+                self._send(status, content_type, body)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded or synthetic university pages locally")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8098)
+    parser.add_argument("--html-file", help="Serve this HTML file (e.g. debug_page.html) at /")
+    parser.add_argument("--pages", help="Page store directory or scraped_pages.json to replay")
+    parser.add_argument("--har", help="HAR archive to replay")
+    parser.add_argument("--programs", type=int, default=1000, help="Program pages in the synthetic site (0 disables it)")
+    parser.add_argument("--per-page", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before each response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--challenge-rate", type=float, default=0.0, help="Fraction of paths behind a Cloudflare-style interstitial")
+    parser.add_argument("--challenge-delay", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = FixtureSiteServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        challenge_rate=args.challenge_rate,
+        challenge_delay=args.challenge_delay,
+        site=SyntheticSite(args.programs, args.per_page, seed=args.seed) if args.programs else None,
+        seed=args.seed,
+    )
+    if args.html_file:
+        server.load_html_file(args.html_file)
+    if args.pages and os.path.exists(args.pages):
+        print(f"📂 Loaded {server.load_pages(args.pages)} recorded pages from {args.pages}")
+    if args.har:
+        print(f"📂 Loaded {server.load_har(args.har)} responses from {args.har}")
+    server.start()
+    print(f"🧪 Fixture site listening on {server.base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,26 +2,120 @@
 
 import json
 import os
-from deepdiff import DeepDiff
+from datetime import datetime
+
+KEY_FIELDS = ("university", "program_name")
+# Bookkeeping fields that change on every run and are not worth diffing
+IGNORED_FIELDS = ("extraction_date", "last_seen")
+CORRECTED_FIELDS = ("category", "deadlines", "admission_open")
+
+
+def _memory_path(agent_name, kind):
+    return f"memory/{agent_name}/{kind}.json"
+
 
 def save_memory(agent_name, data, kind="output"):
     os.makedirs(f"memory/{agent_name}", exist_ok=True)
-    with open(f"memory/{agent_name}/{kind}.json", "w", encoding="utf-8") as f:
+    path = _memory_path(agent_name, kind)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2)
+    os.replace(f"{path}.tmp", path)
 
 def load_memory(agent_name, kind="output"):
-    path = f"memory/{agent_name}/{kind}.json"
+    path = _memory_path(agent_name, kind)
     if os.path.exists(path):
         with open(path, encoding="utf-8") as f:
             return json.load(f)
     return []
 
+
+def program_key(program):
+    return tuple(program.get(field) for field in KEY_FIELDS)
+
+
+def update_memory(agent_name, programs, kind="output", removed=()):
+    """Merge programs into a stored list by (university, program_name).
+
+    Programs replace stored ones with the same key and new keys are
+    appended; ``removed`` keys are dropped. Returns the merged list.
+    """
+    merged = {program_key(p): p for p in load_memory(agent_name, kind)}
+    for program in programs:
+        merged[program_key(program)] = program
+    for key in removed:
+        merged.pop(tuple(key), None)
+    data = list(merged.values())
+    save_memory(agent_name, data, kind)
+    return data
+
+
+def _comparable(value):
+    # Lists compare regardless of order, like the DeepDiff(ignore_order=True) this replaced
+    if isinstance(value, list):
+        return sorted(json.dumps(item, sort_keys=True) for item in value)
+    return value
+
+
+def iter_changes(old, new, ignore=IGNORED_FIELDS):
+    """Yield one change record per program that differs between two lists.
+
+    Both lists are joined on (university, program_name) through a dict, so
+    the diff is linear in the number of programs. Records look like
+    ``{"key": [university, program_name], "change": "added" | "removed" |
+    "changed", "fields": {field: {"old": ..., "new": ...}}}``.
+    """
+    old_by_key = {program_key(p): p for p in old}
+    seen = set()
+    for program in new:
+        key = program_key(program)
+        if key in seen:
+            continue
+        seen.add(key)
+        before = old_by_key.get(key)
+        if before is None:
+            yield {"key": list(key), "change": "added", "fields": {
+                field: {"old": None, "new": value}
+                for field, value in program.items() if field not in KEY_FIELDS and field not in ignore
+            }}
+            continue
+        if before == program:
+            continue
+        fields = {}
+        for field in before.keys() | program.keys():
+            if field in KEY_FIELDS or field in ignore:
+                continue
+            old_value, new_value = before.get(field), program.get(field)
+            # Only fall back to the order-insensitive comparison when values differ
+            if old_value != new_value and _comparable(old_value) != _comparable(new_value):
+                fields[field] = {"old": old_value, "new": new_value}
+        if fields:
+            yield {"key": list(key), "change": "changed", "fields": fields}
+    for key, program in old_by_key.items():
+        if key not in seen:
+            yield {"key": list(key), "change": "removed", "fields": {}}
+
+
+def corrections_from_changes(changes):
+    """Turn change records into {program_name: {field: corrected value}} for the learning step."""
+    corrections = {}
+    for change in changes:
+        if change["change"] != "changed":
+            continue
+        fields = {f: v["new"] for f, v in change["fields"].items() if f in CORRECTED_FIELDS}
+        if fields:
+            corrections[change["key"][1]] = fields
+    return corrections
+
+
 def compare_outputs(agent_name):
+    """Diff the agent's output against its corrected copy and append the changes to diffs.jsonl."""
     raw = load_memory(agent_name, "output")
     corrected = load_memory(agent_name, "corrected")
-    diff = DeepDiff(raw, corrected, ignore_order=True)
-    
-    with open(f"memory/{agent_name}/diffs.json", "w", encoding="utf-8") as f:
-        json.dump(diff, f, indent=2)
-    
-    return diff
+    os.makedirs(f"memory/{agent_name}", exist_ok=True)
+    changes = []
+    diffed_at = datetime.utcnow().isoformat()
+    with open(f"memory/{agent_name}/diffs.jsonl", "a", encoding="utf-8") as f:
+        for change in iter_changes(raw, corrected):
+            changes.append(change)
+            f.write(json.dumps({**change, "at": diffed_at}, ensure_ascii=False, separators=(",", ":")) + "\n")
+    return changes
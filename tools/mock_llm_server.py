@@ -0,0 +1,307 @@
+# tools/mock_llm_server.py - Local OpenAI-compatible stand-in for the Groq API
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+DEGREE_LINE = re.compile(
+    r"\b(Bachelor|Bachelors|Master|Doctor|Diploma|Certificate|BS|BSc|BSN|BBA|BA|MS|MSc|MBA|MPhil|PhD|MBBS|BDS|Pharm[\- ]?D|LLB)\b",
+    re.IGNORECASE
+)
+
+
+def prompt_hash(payload: dict) -> str:
+    """Key a completion request by model and messages, ignoring transport options."""
+    key = {"model": payload.get("model"), "messages": payload.get("messages", [])}
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def default_responder(payload: dict) -> str:
+    """Answer an extraction prompt with a plausible JSON array of programs.
+
+    Lines of the page content that mention a degree become programs, which
+    gives benchmarks a response whose size tracks the input like the real model.
+    """
+    messages = payload.get("messages", [])
+    prompt = messages[-1]["content"] if messages else ""
+    url_match = re.search(r"^URL: (\S+)", prompt, re.MULTILINE)
+    url = url_match.group(1) if url_match else ""
+
+    programs = []
+    seen = set()
+    for line in re.split(r"\n| \| ", prompt):
+        line = line.strip()
+        if len(line) < 6 or len(line) > 120 or line.lower() in seen or line.startswith("-"):
+            continue
+        if not DEGREE_LINE.search(line):
+            continue
+        seen.add(line.lower())
+        programs.append({
+            "program_name": line,
+            "category": "masters" if re.search(r"\b(Master|MS|MSc|MBA|MPhil)\b", line, re.I) else "undergraduate",
+            "admission_open": True,
+            "application_deadline": None,
+            "link": url,
+            "source_text": line,
+        })
+    return json.dumps(programs, indent=2)
+
+
+class MockLLMServer:
+    """Threaded OpenAI-compatible chat-completions server for offline runs.
+
+    Responses come, in order, from the replay directory (keyed by prompt
+    hash), from the real upstream API when recording, or from ``responder``.
+    Latency, rate limiting and streaming behave like the hosted API so the
+    extractor's retry and streaming paths can be exercised and benchmarked.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        chunk_delay: float = 0.0,
+        chunk_size: int = 16,
+        rate_limit_every: int = 0,
+        rate_limit_probability: float = 0.0,
+        responder=None,
+        replay_dir: str = None,
+        record: bool = False,
+        upstream_url: str = "https://api.groq.com/openai/v1/chat/completions",
+        upstream_key: str = None,
+        seed: int = None,
+    ):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.chunk_delay = chunk_delay
+        self.chunk_size = chunk_size
+        self.rate_limit_every = rate_limit_every
+        self.rate_limit_probability = rate_limit_probability
+        self.responder = responder or default_responder
+        self.replay_dir = replay_dir
+        self.record = record
+        self.upstream_url = upstream_url
+        self.upstream_key = upstream_key or os.getenv("GROQ_API_KEY")
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+        self._seen_prompts = set()
+        self.stats = {
+            "requests": 0, "unique_prompts": 0, "rate_limited": 0,
+            "replayed": 0, "recorded": 0, "generated": 0, "streamed": 0,
+        }
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1/chat/completions"
+
+    def start(self):
+        if self.replay_dir:
+            os.makedirs(self.replay_dir, exist_ok=True)
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler_class())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count(self, key: str) -> int:
+        with self._lock:
+            self.stats[key] += 1
+            return self.stats[key]
+
+    def _should_rate_limit(self, request_number: int) -> bool:
+        if self.rate_limit_every and request_number % self.rate_limit_every == 0:
+            return True
+        with self._lock:
+            return self._random.random() < self.rate_limit_probability
+
+    def _replay_path(self, key: str) -> str:
+        return os.path.join(self.replay_dir, f"{key}.json")
+
+    def completion_text(self, payload: dict) -> str:
+        """Resolve the completion text for a request (replay, record or generate)."""
+        key = prompt_hash(payload)
+        if self.replay_dir and os.path.exists(self._replay_path(key)):
+            with open(self._replay_path(key), encoding="utf-8") as f:
+                self._count("replayed")
+                return json.load(f)["content"]
+
+        if self.record and self.replay_dir:
+            content = self._fetch_upstream(payload)
+            with open(self._replay_path(key), "w", encoding="utf-8") as f:
+                json.dump({"model": payload.get("model"), "messages": payload.get("messages"), "content": content},
+                          f, indent=2, ensure_ascii=False)
+            self._count("recorded")
+            return content
+
+        self._count("generated")
+        return self.responder(payload)
+
+    def _fetch_upstream(self, payload: dict) -> str:
+        if not self.upstream_key:
+            raise ValueError("GROQ_API_KEY not set; cannot record upstream responses")
+        body = {k: v for k, v in payload.items() if k != "stream"}
+        response = httpx.post(
+            self.upstream_url,
+            headers={"Authorization": f"Bearer {self.upstream_key}", "Content-Type": "application/json"},
+            json=body,
+            timeout=120.0,
+        )
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, body: dict, headers: dict = None):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+                    return
+
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    self._send_json(400, {"error": {"message": "Invalid JSON body"}})
+                    return
+
+                request_number = server._count("requests")
+                key = prompt_hash(payload)
+                with server._lock:
+                    if key not in server._seen_prompts:
+                        server._seen_prompts.add(key)
+                        server.stats["unique_prompts"] += 1
+                if server._should_rate_limit(request_number):
+                    server._count("rate_limited")
+                    self._send_json(
+                        429,
+                        {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                        {"Retry-After": "1"},
+                    )
+                    return
+
+                delay = server.latency + (server._random.uniform(0, server.jitter) if server.jitter else 0.0)
+                if delay:
+                    time.sleep(delay)
+
+                try:
+                    content = server.completion_text(payload)
+                except Exception as e:
+                    self._send_json(502, {"error": {"message": f"Upstream error: {e}"}})
+                    return
+
+                usage = {
+                    "prompt_tokens": sum(len(m.get("content", "")) for m in payload.get("messages", [])) // 4,
+                    "completion_tokens": len(content) // 4,
+                }
+                usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+                if payload.get("stream"):
+                    server._count("streamed")
+                    self._stream(payload, content)
+                    return
+
+                self._send_json(200, {
+                    "id": f"mock-{request_number}",
+                    "object": "chat.completion",
+                    "model": payload.get("model"),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                    "usage": usage,
+                })
+
+            def _stream(self, payload: dict, content: str):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                for i in range(0, len(content), server.chunk_size):
+                    chunk = {
+                        "object": "chat.completion.chunk",
+                        "model": payload.get("model"),
+                        "choices": [{"index": 0, "delta": {"content": content[i:i + server.chunk_size]}}],
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                    if server.chunk_delay:
+                        time.sleep(server.chunk_delay)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local OpenAI-compatible mock of the Groq API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before each response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency in seconds")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="Seconds between streamed chunks")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Answer every Nth request with 429")
+    parser.add_argument("--rate-limit-probability", type=float, default=0.0)
+    parser.add_argument("--replay-dir", default=None, help="Directory of recorded responses keyed by prompt hash")
+    parser.add_argument("--record", action="store_true", help="Forward misses to the real API and save them")
+    args = parser.parse_args()
+
+    server = MockLLMServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        chunk_delay=args.chunk_delay,
+        rate_limit_every=args.rate_limit_every,
+        rate_limit_probability=args.rate_limit_probability,
+        replay_dir=args.replay_dir,
+        record=args.record,
+    ).start()
+    print(f"🧪 Mock LLM server listening on {server.url} (set GROQ_API_URL to use it)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
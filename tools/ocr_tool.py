@@ -0,0 +1,58 @@
+# tools/ocr_tool.py - OCR for scanned PDF pages with pytesseract and OpenCV
+import pdfplumber
+
+try:
+    import pytesseract
+except ImportError:
+    pytesseract = None
+
+try:
+    import cv2
+    import numpy as np
+except ImportError:
+    cv2 = None
+
+DEFAULT_OCR_SETTINGS = {"dpi": 300, "lang": "eng", "psm": 6, "preprocess": True}
+
+
+def ocr_available() -> bool:
+    if pytesseract is None:
+        return False
+    try:
+        pytesseract.get_tesseract_version()
+    except Exception:
+        return False
+    return True
+
+
+def preprocess_image(image):
+    """Grayscale and binarize a page image; OpenCV's Otsu threshold when available."""
+    if cv2 is None:
+        return image.convert("L")
+    gray = cv2.cvtColor(np.array(image.convert("RGB")), cv2.COLOR_RGB2GRAY)
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return binary
+
+
+def ocr_image(image, settings: dict = None) -> str:
+    settings = {**DEFAULT_OCR_SETTINGS, **(settings or {})}
+    if pytesseract is None:
+        raise RuntimeError("pytesseract is not installed")
+    if settings["preprocess"]:
+        image = preprocess_image(image)
+    return pytesseract.image_to_string(image, lang=settings["lang"], config=f"--psm {settings['psm']}")
+
+
+def ocr_pdf_page(path: str, index: int, settings: dict = None) -> str:
+    """Render one PDF page and OCR it.
+
+    Takes a path and page index rather than an image so it can run in a
+    worker process: only the small arguments and the text cross the
+    process boundary.
+    """
+    settings = {**DEFAULT_OCR_SETTINGS, **(settings or {})}
+    with pdfplumber.open(path, pages=[index + 1]) as pdf:
+        page = pdf.pages[0]
+        image = page.to_image(resolution=settings["dpi"]).original
+        page.close()
+    return ocr_image(image, settings)
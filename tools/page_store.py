@@ -0,0 +1,288 @@
+# tools/page_store.py - Append-only compressed store for scraped pages
+import json
+import logging
+import os
+import struct
+
+from tools.codec import codec_for, compress, decompress
+
+logger = logging.getLogger(__name__)
+
+# Record header: body length, URL length, codec; the URL follows uncompressed
+_header = struct.Struct(">IHB")
+
+# Page fields moved into the blob store when one is attached
+BLOB_FIELDS = ("html", "text")
+
+
+class PageStore:
+    """Scraped pages in append-only segment files with an in-memory URL index.
+
+    Each page is one length-prefixed record compressed on its own (zstd when
+    ``zstandard`` is installed, gzip otherwise), so agents append pages as
+    they are scraped and readers stream or seek to single pages without
+    loading the rest. Segments roll over at ``segment_size`` bytes. The URL
+    index is rebuilt on open by hopping over record headers; a torn record
+    left by a crash is truncated away. Re-appending a URL supersedes the
+    older record.
+
+    With ``blob_dir`` set, the large html and text fields are kept in a
+    shared BlobStore and records hold only their ``<field>_hash``, so pages
+    repeated across agents and runs are stored once. The blob directory is
+    remembered in ``meta.json`` for readers that only know the store path.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_size: int = 64 * 1024 * 1024,
+        compression: str = None,
+        blob_dir: str = None,
+    ):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.codec = codec_for(compression)
+        self._index = {}
+        self._writer = None
+        os.makedirs(directory, exist_ok=True)
+        self.blobs = self._open_blobs(blob_dir)
+        self._load_index()
+
+    def _open_blobs(self, blob_dir: str):
+        meta_path = os.path.join(self.directory, "meta.json")
+        if blob_dir is None and os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                blob_dir = json.load(f).get("blob_dir")
+        if blob_dir is None:
+            return None
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({"blob_dir": blob_dir}, f)
+        from tools.blob_store import BlobStore
+        return BlobStore(blob_dir)
+
+    def _segments(self) -> list:
+        return sorted(name for name in os.listdir(self.directory) if name.endswith(".seg"))
+
+    def _segment_path(self, segment: str) -> str:
+        return os.path.join(self.directory, segment)
+
+    def _load_index(self):
+        for segment in self._segments():
+            path = self._segment_path(segment)
+            size = os.path.getsize(path)
+            with open(path, "rb") as f:
+                offset = 0
+                while offset < size:
+                    header = f.read(_header.size)
+                    if len(header) < _header.size:
+                        break
+                    body_length, url_length, _ = _header.unpack(header)
+                    end = offset + _header.size + url_length + body_length
+                    if end > size:
+                        break
+                    url = f.read(url_length).decode("utf-8")
+                    self._index[url] = (segment, offset)
+                    f.seek(body_length, os.SEEK_CUR)
+                    offset = end
+            if offset < size:
+                logger.warning(f"⚠️ Truncating torn record at {path}:{offset}")
+                with open(path, "r+b") as f:
+                    f.truncate(offset)
+
+    def _open_writer(self):
+        segments = self._segments()
+        segment = segments[-1] if segments else "pages-00001.seg"
+        if segments and os.path.getsize(self._segment_path(segment)) >= self.segment_size:
+            segment = f"pages-{len(segments) + 1:05d}.seg"
+        self._writer = (segment, open(self._segment_path(segment), "ab"))
+
+    def append(self, page: dict):
+        """Write one page (needs a "url" key) and flush it to disk."""
+        if self._writer is None or self._writer[1].tell() >= self.segment_size:
+            self.close()
+            self._open_writer()
+        if self.blobs is not None:
+            page = self._to_blobs(page)
+        segment, f = self._writer
+        url = page["url"].encode("utf-8")
+        body = compress(json.dumps(page, ensure_ascii=False).encode("utf-8"), self.codec)
+        offset = f.tell()
+        f.write(_header.pack(len(body), len(url), self.codec) + url + body)
+        f.flush()
+        self._index[page["url"]] = (segment, offset)
+
+    def _to_blobs(self, page: dict) -> dict:
+        record = dict(page)
+        for field in BLOB_FIELDS:
+            if isinstance(record.get(field), str):
+                record[f"{field}_hash"] = self.blobs.put(record.pop(field))
+        # The record being replaced no longer holds its blobs
+        if page["url"] in self._index:
+            self._release(self._read_entry(self._index[page["url"]], resolve=False))
+        return record
+
+    def _release(self, record: dict):
+        for field in BLOB_FIELDS:
+            if record.get(f"{field}_hash"):
+                self.blobs.release(record[f"{field}_hash"])
+
+    def _resolve(self, record: dict) -> dict:
+        for field in BLOB_FIELDS:
+            digest = record.pop(f"{field}_hash", None)
+            if digest:
+                record[field] = self.blobs.get(digest)
+        return record
+
+    def _read(self, f, offset: int, resolve: bool = True) -> dict:
+        f.seek(offset)
+        body_length, url_length, codec = _header.unpack(f.read(_header.size))
+        f.seek(url_length, os.SEEK_CUR)
+        record = json.loads(decompress(f.read(body_length), codec))
+        if resolve and self.blobs is not None:
+            record = self._resolve(record)
+        return record
+
+    def _read_entry(self, entry: tuple, resolve: bool = True) -> dict:
+        if self._writer is not None:
+            self._writer[1].flush()
+        segment, offset = entry
+        with open(self._segment_path(segment), "rb") as f:
+            return self._read(f, offset, resolve)
+
+    def get(self, url: str, resolve: bool = True):
+        """Return the page for a URL; ``resolve=False`` leaves blob hashes in place."""
+        entry = self._index.get(url)
+        if entry is None:
+            return None
+        return self._read_entry(entry, resolve)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def urls(self) -> list:
+        return list(self._index)
+
+    def __iter__(self):
+        """Stream the latest version of every page in write order."""
+        if self._writer is not None:
+            self._writer[1].flush()
+        by_segment = {}
+        for segment, offset in self._index.values():
+            by_segment.setdefault(segment, []).append(offset)
+        for segment in sorted(by_segment):
+            with open(self._segment_path(segment), "rb") as f:
+                for offset in sorted(by_segment[segment]):
+                    yield self._read(f, offset)
+
+    def clear(self):
+        """Drop every page, e.g. before a fresh crawl.
+
+        Blob references are released but the blobs stay until ``gc``.
+        """
+        if self.blobs is not None:
+            for entry in list(self._index.values()):
+                self._release(self._read_entry(entry, resolve=False))
+        self.close()
+        for segment in self._segments():
+            os.remove(self._segment_path(segment))
+        self._index.clear()
+
+    def gc(self) -> dict:
+        """Delete blobs no page references any more."""
+        return self.blobs.gc() if self.blobs is not None else {"removed": 0, "bytes": 0}
+
+    def close(self):
+        if self._writer is not None:
+            self._writer[1].close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PageRecord:
+    """A scraped page as the crawl keeps it in memory once it is in a PageStore.
+
+    Only the URL and small metadata are held; the HTML is never kept, and
+    ``text`` and any other page field are read back from the store when
+    asked for, so a crawl's memory stays flat however many pages it
+    scrapes. Supports ``record["text"]`` and ``record.get(...)`` like the
+    page dicts it replaces.
+    """
+
+    __slots__ = ("url", "title", "timestamp", "load_time", "text_length", "_store")
+
+    def __init__(self, url: str, store: PageStore, title: str = "", timestamp: float = None,
+                 load_time: float = None, text_length: int = 0):
+        self.url = url
+        self.title = title
+        self.timestamp = timestamp
+        self.load_time = load_time
+        self.text_length = text_length
+        self._store = store
+
+    @classmethod
+    def from_page(cls, page: dict, store: PageStore) -> "PageRecord":
+        return cls(
+            page["url"], store, title=page.get("title") or "", timestamp=page.get("timestamp"),
+            load_time=page.get("load_time"), text_length=len(page.get("text") or ""),
+        )
+
+    def page(self) -> dict:
+        """The full page as stored, html and text included."""
+        page = self._store.get(self.url)
+        if page is None:
+            raise KeyError(f"{self.url} is no longer in {self._store.directory}")
+        return page
+
+    def _text(self):
+        # Read only the text blob: resolving the whole page would load the HTML too
+        record = self._store.get(self.url, resolve=False)
+        if record is None:
+            raise KeyError(f"{self.url} is no longer in {self._store.directory}")
+        if record.get("text_hash") and self._store.blobs is not None:
+            return self._store.blobs.get(record["text_hash"])
+        return record.get("text")
+
+    @property
+    def text(self) -> str:
+        return self._text() or ""
+
+    def __getitem__(self, key: str):
+        if key in ("url", "title", "timestamp", "load_time"):
+            return getattr(self, key)
+        if key == "text":
+            text = self._text()
+            if text is None:
+                raise KeyError(key)
+            return text
+        return self.page()[key]
+
+    def get(self, key: str, default=None):
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return default if value is None else value
+
+    def __repr__(self):
+        return f"PageRecord({self.url!r}, text_length={self.text_length})"
+
+
+def load_pages(path: str):
+    """Iterate pages from a page store directory or a legacy scraped_pages.json."""
+    if os.path.isdir(path):
+        store = PageStore(path)
+        try:
+            yield from store
+        finally:
+            store.close()
+        return
+    with open(path, encoding="utf-8") as f:
+        yield from json.load(f)
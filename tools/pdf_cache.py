@@ -0,0 +1,122 @@
+# tools/pdf_cache.py - Per-page cache of PDF text-layer and OCR results
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from tools.pdf_parser import open_mmap
+
+
+def file_hash(path: str) -> str:
+    """SHA-256 of a file's bytes, hashed straight from a memory map."""
+    if os.path.getsize(path) == 0:
+        return hashlib.sha256().hexdigest()
+    with open_mmap(path) as mapped:
+        return hashlib.sha256(mapped).hexdigest()
+
+
+def settings_key(settings: dict = None) -> str:
+    """Stable key for OCR settings; text-layer results use "text"."""
+    if settings is None:
+        return "text"
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+class PDFPageCache:
+    """Extracted page text and layout keyed by (hash, page index, OCR settings).
+
+    The PDF extractor stores text-layer results under the file's hash and
+    OCR results under each scanned page's own content fingerprint (index
+    0), so an unchanged file skips parsing and OCR entirely and a
+    republished prospectus only re-OCRs the pages that changed. Changing OCR
+    settings changes the key, so stale results are never served. Entries
+    are evicted least-recently-used once the cached text exceeds
+    ``max_bytes``.
+    """
+
+    def __init__(self, path: str = "memory/pdf_cache.db", max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS pdf_pages (
+                file_hash TEXT NOT NULL,
+                page_index INTEGER NOT NULL,
+                settings TEXT NOT NULL,
+                source TEXT NOT NULL,
+                text TEXT NOT NULL,
+                layout TEXT,
+                fingerprint TEXT,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (file_hash, page_index, settings)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS pdf_pages_last_used ON pdf_pages (last_used);
+        """)
+        self._size = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM pdf_pages").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, digest: str, index: int, settings: dict = None):
+        """Return {"text", "source", "layout", "fingerprint"} or None, and mark the entry as used."""
+        key = (digest, index, settings_key(settings))
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                "SELECT source, text, layout, fingerprint FROM pdf_pages WHERE file_hash = ? AND page_index = ? AND settings = ?", key
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.conn.execute(
+                "UPDATE pdf_pages SET last_used = ? WHERE file_hash = ? AND page_index = ? AND settings = ?",
+                (time.time(), *key),
+            )
+        return {"source": row[0], "text": row[1], "layout": json.loads(row[2]) if row[2] else None, "fingerprint": row[3]}
+
+    def put(self, digest: str, index: int, settings: dict, page: dict):
+        layout = json.dumps(page["layout"]) if page.get("layout") is not None else None
+        size = len(page["text"].encode("utf-8")) + len(layout or "")
+        key = (digest, index, settings_key(settings))
+        with self._lock, self.conn:
+            previous = self.conn.execute(
+                "SELECT size FROM pdf_pages WHERE file_hash = ? AND page_index = ? AND settings = ?", key
+            ).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pdf_pages (file_hash, page_index, settings, source, text, layout, fingerprint, size, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (*key, page["source"], page["text"], layout, page.get("fingerprint"), size, time.time()),
+            )
+            self._size += size - (previous[0] if previous else 0)
+            self._evict()
+
+    def _evict(self):
+        while self._size > self.max_bytes:
+            rows = self.conn.execute(
+                "SELECT file_hash, page_index, settings, size FROM pdf_pages ORDER BY last_used LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for digest, index, settings, size in rows:
+                self.conn.execute(
+                    "DELETE FROM pdf_pages WHERE file_hash = ? AND page_index = ? AND settings = ?",
+                    (digest, index, settings),
+                )
+                self._size -= size
+                if self._size <= self.max_bytes:
+                    break
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM pdf_pages").fetchone()[0]
+        return {"entries": entries, "bytes": self._size, "hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,185 @@
+# tools/pdf_downloader.py - Streaming, resumable downloads of prospectus PDFs
+import hashlib
+import json
+import logging
+import os
+from urllib.parse import urlparse
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+
+
+def is_pdf_link(href: str) -> bool:
+    return urlparse(href or "").path.lower().endswith(".pdf")
+
+
+def _range_start(content_range: str):
+    """First byte of a ``Content-Range: bytes start-end/total`` header, or None."""
+    try:
+        return int(content_range.split()[1].split("-")[0])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PDFDownloader:
+    """Download PDFs to ``directory`` in chunks, never holding a file in memory.
+
+    Files are written to ``<name>.part`` and renamed once complete. If a
+    previous attempt left a partial file, the download resumes with a
+    ``Range`` request when the server supports it and starts over
+    otherwise. Responses that are not PDFs or that exceed ``max_bytes``
+    (by Content-Length or by bytes actually received) are abandoned.
+
+    A cached file is revalidated before it is reused: with a conditional GET
+    on the ETag/Last-Modified saved next to it, or by comparing sizes with a
+    HEAD request when the server sent neither, so a prospectus republished
+    at the same URL is downloaded again. If revalidation fails the cached
+    copy is used.
+    """
+
+    def __init__(
+        self,
+        directory: str = "memory/pdfs",
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        timeout: float = 60.0,
+        chunk_size: int = 64 * 1024,
+        client: httpx.AsyncClient = None,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self._client = client
+        self._owns_client = client is None
+        self.timeout = timeout
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, url: str) -> str:
+        name = os.path.basename(urlparse(url).path) or "document.pdf"
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()[:12]
+        return os.path.join(self.directory, f"{digest}-{name}")
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout, follow_redirects=True)
+        return self._client
+
+    @staticmethod
+    def _meta_path(path: str) -> str:
+        return f"{path}.meta.json"
+
+    def _load_validators(self, path: str) -> dict:
+        try:
+            with open(self._meta_path(path), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_validators(self, path: str, response: httpx.Response):
+        validators = {
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+        }
+        with open(self._meta_path(path), "w", encoding="utf-8") as f:
+            json.dump(validators, f)
+
+    def _conditional_headers(self, path: str) -> dict:
+        validators = self._load_validators(path)
+        headers = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        return headers
+
+    async def _same_size(self, url: str, path: str) -> bool:
+        """HEAD check for servers that send no validators: unchanged unless the size differs."""
+        client = await self._get_client()
+        try:
+            response = await client.head(url)
+        except httpx.HTTPError as e:
+            logger.warning(f"⚠️ Could not revalidate {url}, using the cached copy: {e}")
+            return True
+        length = response.headers.get("content-length")
+        return not response.is_success or length is None or int(length) == os.path.getsize(path)
+
+    async def download(self, url: str):
+        """Return the local path of the PDF, or None if it was rejected or failed."""
+        path = self.path_for(url)
+        if not os.path.exists(path):
+            return await self._fetch(url, path)
+        conditional = self._conditional_headers(path)
+        if not conditional and await self._same_size(url, path):
+            return path
+        # A 304 keeps the cached file; a changed PDF replaces it once fully downloaded
+        return await self._fetch(url, path, conditional=conditional) or path
+
+    async def _fetch(self, url: str, path: str, resume: bool = True, conditional: dict = None):
+        """Download ``url`` to ``path``, resuming a partial file unless ``resume`` is False."""
+        part_path = f"{path}.part"
+        offset = os.path.getsize(part_path) if resume and os.path.exists(part_path) else 0
+        headers = dict(conditional or {})
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+
+        client = await self._get_client()
+        restart = False
+        try:
+            async with client.stream("GET", url, headers=headers) as response:
+                if response.status_code == 304:
+                    return path
+                if response.status_code == 416:
+                    # The partial file already holds everything
+                    os.replace(part_path, path)
+                    return path
+                response.raise_for_status()
+                if response.status_code == 206 and _range_start(response.headers.get("content-range")) != offset:
+                    # Appending bytes from anywhere else would corrupt the file
+                    logger.warning(f"⚠️ {url} did not resume at byte {offset}, starting over")
+                    restart = True
+                else:
+                    if response.status_code != 206:
+                        offset = 0
+                    complete = await self._write_part(url, response, part_path, offset)
+        except httpx.HTTPError as e:
+            # Keep the partial file so the next attempt can resume it
+            logger.warning(f"⚠️ Error downloading {url} after {offset} bytes: {e}")
+            return None
+
+        if restart:
+            os.remove(part_path)
+            return await self._fetch(url, path, resume=False, conditional=conditional)
+        if not complete:
+            # Rejected content is not worth resuming
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            return None
+        os.replace(part_path, path)
+        self._save_validators(path, response)
+        return path
+
+    async def _write_part(self, url: str, response: httpx.Response, part_path: str, offset: int) -> bool:
+        length = response.headers.get("content-length")
+        if length and offset + int(length) > self.max_bytes:
+            logger.warning(f"⚠️ Skipping {url}: {offset + int(length)} bytes exceeds limit")
+            return False
+        received = offset
+        with open(part_path, "ab" if offset else "wb") as f:
+            async for chunk in response.aiter_bytes(self.chunk_size):
+                if received == 0 and not chunk.startswith(b"%PDF"):
+                    logger.warning(f"⚠️ Skipping {url}: not a PDF")
+                    return False
+                received += len(chunk)
+                if received > self.max_bytes:
+                    logger.warning(f"⚠️ Aborting {url}: more than {self.max_bytes} bytes")
+                    return False
+                f.write(chunk)
+        logger.info(f"📥 Downloaded {url} ({received} bytes)")
+        return True
+
+    async def close(self):
+        if self._client is not None and self._owns_client:
+            await self._client.aclose()
+            self._client = None
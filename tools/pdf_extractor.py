@@ -0,0 +1,105 @@
+# tools/pdf_extractor.py - Page-wise PDF text extraction with selective, parallel OCR
+import logging
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from tools.ocr_tool import DEFAULT_OCR_SETTINGS, ocr_available, ocr_pdf_page
+from tools.pdf_cache import PDFPageCache, file_hash
+from tools.pdf_parser import has_usable_text, iter_text_layer
+
+logger = logging.getLogger(__name__)
+
+
+def iter_pdf_pages(
+    path: str,
+    ocr: bool = True,
+    max_workers: int = None,
+    max_in_flight: int = None,
+    ocr_settings: dict = None,
+    cache: PDFPageCache = None,
+    layout: bool = False,
+):
+    """Yield ``{"index", "text", "source", "layout"}`` for each page of a PDF, in page order.
+
+    The text layer is read lazily in this process. Only pages without a
+    usable text layer are rendered and OCR'd, in a process pool so scanned
+    prospectuses use every core. At most ``max_in_flight`` OCR pages are
+    pending and finished pages are yielded as soon as everything before them
+    is done, so memory is bounded by the window rather than the page count.
+    ``source`` is "text", "ocr" or "empty" (no text layer and OCR off or
+    failed).
+
+    With a ``cache``, text-layer results are looked up by file hash, page
+    index and ``layout`` before parsing, and OCR results by the page's content fingerprint
+    and the OCR settings before rendering.
+    """
+    settings = {**DEFAULT_OCR_SETTINGS, **(ocr_settings or {})}
+    if ocr and not ocr_available():
+        logger.warning("⚠️ Tesseract is not available; scanned pages will be skipped")
+        ocr = False
+    max_workers = max_workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or max_workers * 2
+    # Text pages queue behind slow OCR pages; cap how many can wait
+    max_buffered = max_in_flight * 4
+
+    executor = None
+    window = deque()
+    in_flight = 0
+    digest = file_hash(path) if cache is not None else None
+    # Text-layer entries read with layout are cached apart from plain ones, which lack the layout
+    text_settings = {"source": "text", "layout": True} if layout else None
+    lookup = (lambda index: cache.get(digest, index, text_settings)) if cache is not None else None
+
+    def ready(entry):
+        return not hasattr(entry[1], "result") or entry[1].done()
+
+    def pop():
+        nonlocal in_flight
+        index, value, fingerprint = window.popleft()
+        if not hasattr(value, "result"):
+            return value
+        in_flight -= 1
+        try:
+            page = {"index": index, "text": value.result(), "source": "ocr", "layout": None}
+        except Exception as e:
+            logger.warning(f"⚠️ OCR failed on page {index + 1} of {path}: {e}")
+            return {"index": index, "text": "", "source": "empty", "layout": None}
+        if cache is not None and fingerprint:
+            cache.put(fingerprint, 0, settings, page)
+        return page
+
+    try:
+        for entry in iter_text_layer(path, layout=layout, lookup=lookup):
+            index, text, fingerprint = entry["index"], entry["text"], entry["fingerprint"]
+            usable = has_usable_text(text)
+            if cache is not None and not entry["cached"]:
+                cache.put(digest, index, text_settings, {**entry, "source": "text" if usable else "empty"})
+            cached_ocr = None
+            if not usable and ocr and cache is not None and fingerprint:
+                cached_ocr = cache.get(fingerprint, 0, settings)
+
+            if usable:
+                window.append((index, {"index": index, "text": text, "source": "text", "layout": entry["layout"]}, None))
+            elif cached_ocr is not None:
+                window.append((index, {"index": index, "text": cached_ocr["text"], "source": "ocr", "layout": None}, None))
+            elif ocr:
+                if executor is None:
+                    executor = ProcessPoolExecutor(max_workers=max_workers)
+                window.append((index, executor.submit(ocr_pdf_page, path, index, settings), fingerprint))
+                in_flight += 1
+            else:
+                window.append((index, {"index": index, "text": text, "source": "empty", "layout": entry["layout"]}, None))
+
+            while window and (ready(window[0]) or in_flight >= max_in_flight or len(window) >= max_buffered):
+                yield pop()
+        while window:
+            yield pop()
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def extract_text_from_pdf(path: str, **kwargs) -> str:
+    """Whole-document text, pages separated by newlines."""
+    return "\n".join(page["text"] for page in iter_pdf_pages(path, **kwargs))
@@ -0,0 +1,76 @@
+# tools/pdf_parser.py - Lazy page-by-page access to a PDF's text layer
+import hashlib
+import mmap
+from contextlib import contextmanager
+
+import pdfplumber
+from pdfminer.pdftypes import resolve1
+
+# Pages with fewer letters/digits than this are treated as scanned and sent to OCR
+MIN_TEXT_CHARS = 40
+
+
+def has_usable_text(text: str, min_chars: int = MIN_TEXT_CHARS) -> bool:
+    return sum(1 for ch in text or "" if ch.isalnum()) >= min_chars
+
+
+@contextmanager
+def open_mmap(path: str):
+    """Map a PDF read-only; pdfminer reads it like a file and the OS pages it in on demand."""
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def page_count(path: str) -> int:
+    with open_mmap(path) as mapped, pdfplumber.open(mapped) as pdf:
+        return len(pdf.pages)
+
+
+def page_fingerprint(page) -> str:
+    """Hash of a page's raw content streams and images, without decoding them.
+
+    Identifies a scanned page across re-published files, so its OCR result
+    can be reused even when other pages of the PDF changed.
+    """
+    digest = hashlib.sha256()
+    contents = page.page_obj.contents or []
+    for stream in contents:
+        digest.update(resolve1(stream).get_rawdata() or b"")
+    xobjects = resolve1((page.page_obj.resources or {}).get("XObject")) or {}
+    for name in sorted(xobjects):
+        obj = resolve1(xobjects[name])
+        if hasattr(obj, "get_rawdata"):
+            digest.update(obj.get_rawdata() or b"")
+    return digest.hexdigest()
+
+
+def iter_text_layer(path: str, layout: bool = False, lookup=None):
+    """Yield ``{"index", "text", "layout", "fingerprint"}`` for each page in order.
+
+    The file is memory-mapped and pages are parsed one at a time with their
+    layout caches released before the next one, so memory stays flat on
+    prospectuses with hundreds of pages. With ``layout`` the text lines'
+    bounding boxes are included. ``fingerprint`` is only computed for
+    pages without usable text. If
+    ``lookup(index)`` returns a cached entry the page is not parsed at all
+    and the entry is yielded with ``"cached": True``.
+    """
+    with open_mmap(path) as mapped, pdfplumber.open(mapped) as pdf:
+        for index, page in enumerate(pdf.pages):
+            cached = lookup(index) if lookup else None
+            if cached is not None:
+                yield {**cached, "index": index, "cached": True}
+                continue
+            try:
+                text = page.extract_text() or ""
+                lines = None
+                if layout:
+                    lines = [
+                        {"text": line["text"], "bbox": [round(line[k], 1) for k in ("x0", "top", "x1", "bottom")]}
+                        for line in page.extract_text_lines()
+                    ]
+                fingerprint = None if has_usable_text(text) else page_fingerprint(page)
+            finally:
+                page.close()
+            yield {"index": index, "text": text, "layout": lines, "fingerprint": fingerprint, "cached": False}
@@ -1,32 +1,162 @@
 # tools/university_scraper_agent.py
+import asyncio
+import json
+import os
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from core.agent_registry import university_for
+from core.corrections import CorrectionIndex
+from core.metrics import host_of, metrics
+from database.program_sync import ProgramSync
+from tools.page_store import PageRecord, PageStore
+from tools.pdf_downloader import PDFDownloader, is_pdf_link
+
+
 class UniversityScraperAgent:
     def __init__(self, supabase_client):
         self.supabase_client = supabase_client
         self.name = "base_agent"
-        self.known_programs = []
+        self.known_programs = CorrectionIndex()
         self.visited = set()
         self.scraped_pages = []
+        self._program_sync = None
+        self._page_store = None
+        self.pdf_links = set()
 
     def compare_outputs(self, structured_data: list):
         print(f"ℹ️ Comparing {len(structured_data)} extracted programs for {self.name}...")
         university = self.get_university_name()
         for program in structured_data:
             program["university"] = university
-            # Apply corrections if available
-            corrected = self.known_programs.get(program["program_name"])
-            if corrected:
-                for field in ["category", "admission_open", "deadlines"]:
-                    if field in corrected:
-                        print(f"ℹ️ Applying correction: {program['program_name']} {field} from {program[field]} to {corrected[field]}")
-                        program[field] = corrected[field]
-            self.supabase_client.upsert_extracted_program(program)
-        print(f"✅ Upserted {len(structured_data)} programs to Supabase for {self.name}.")
+            # Corrections are matched on normalized names in one lookup per program
+            for field, old, new in self.known_programs.apply(program):
+                print(f"ℹ️ Applying correction: {program['program_name']} {field} from {old} to {new}")
+        unmatched = self.known_programs.unmatched()
+        if unmatched:
+            print(f"ℹ️ {len(unmatched)} corrections for {university} matched no extracted program.")
+        summary = self.program_sync.sync(university, structured_data)
+        for outcome in summary["outcomes"]:
+            if outcome["status"] != "upserted":
+                print(f"⚠️ {outcome['status']}: {outcome['program_name']} ({outcome['error']})")
+        print(
+            f"✅ Synced {len(structured_data)} programs for {self.name}: {summary['inserted']} new, "
+            f"{summary['updated']} changed, {summary['deleted']} removed, {summary['unchanged']} unchanged."
+        )
+        return summary["outcomes"]
+
+    @property
+    def program_sync(self) -> ProgramSync:
+        """Change-detecting writer, created on first use so it picks up the agent's name."""
+        if getattr(self, "_program_sync", None) is None:
+            self._program_sync = ProgramSync(self.supabase_client, state_path=f"memory/{self.name}/sync_state.json")
+        return self._program_sync
+
+    @property
+    def page_store(self) -> PageStore:
+        """Append-only store the crawl writes pages to as they arrive.
+
+        HTML and text go to the blob store shared by all agents, so pages
+        that did not change between runs are not stored again.
+        """
+        if getattr(self, "_page_store", None) is None:
+            self._page_store = PageStore(f"memory/{self.name}/pages", blob_dir="memory/blobs")
+        return self._page_store
+
+    def collect_garbage(self) -> dict:
+        """Delete blobs that no stored page references any more.
+
+        Each crawl starts by clearing the page store, which only releases
+        its blob references; run after the crawl, this frees the content
+        the new crawl did not store again.
+        """
+        freed = self.page_store.gc()
+        if freed["removed"]:
+            print(f"🧹 Removed {freed['removed']} unreferenced blobs ({freed['bytes']} bytes)")
+        return freed
+
+    def _store_page(self, page_data: dict) -> PageRecord:
+        """Write the page to the page store and keep only a compact record of it.
+
+        ``scraped_pages`` holds PageRecords, which read text back from the
+        store on demand; the page dict itself is the caller's to drop.
+        """
+        self.page_store.append(page_data)
+        record = PageRecord.from_page(page_data, self.page_store)
+        self.scraped_pages.append(record)
+        return record
+
+    @staticmethod
+    def _page_anchors(page_data: dict) -> list:
+        """Return the page's anchors as {"text", "href"} dicts.
+
+        Pages scraped in DOM mode already carry absolute links; otherwise the
+        anchors are parsed out of the cleaned HTML.
+        """
+        if page_data.get("links") is not None:
+            return page_data["links"]
+        if not page_data.get("html"):
+            return []
+        with metrics.span("link_discovery", host=host_of(page_data.get("url"))):
+            soup = BeautifulSoup(page_data["html"], "html.parser")
+            return [
+                {"text": a.get_text().strip(), "href": a["href"].strip()}
+                for a in soup.find_all("a", href=True)
+            ]
+
+    @staticmethod
+    def _pdf_links(anchors: list, base_url: str) -> set:
+        """Absolute URLs of the PDFs linked from a page."""
+        return {urljoin(base_url, a["href"]) for a in anchors if is_pdf_link(a["href"])}
+
+    async def process_pdf_links(self, pdf_links, max_pdfs: int = 10) -> list:
+        """Download linked prospectus PDFs and extract their programs.
+
+        PDFs are streamed to memory/pdfs and parsed off the event loop by
+        PDFAgent; the programs are saved to memory/<agent>/pdf_programs.json
+        for main.py to merge with the LLM extraction (an empty list when the
+        crawl found none, so an older run's PDFs are not merged again).
+        """
+        programs = []
+        if pdf_links:
+            programs = await self._extract_pdf_programs(pdf_links, max_pdfs)
+
+        os.makedirs(f"memory/{self.name}", exist_ok=True)
+        with open(f"memory/{self.name}/pdf_programs.json", "w", encoding="utf-8") as f:
+            json.dump(programs, f, indent=2, ensure_ascii=False)
+        print(f"📄 Extracted {len(programs)} programs from {min(len(pdf_links), max_pdfs)} linked PDFs for {self.name}.")
+        return programs
+
+    async def _extract_pdf_programs(self, pdf_links, max_pdfs: int) -> list:
+        from agents.pdf_agent import PDFAgent
+        from tools.pdf_cache import PDFPageCache
+
+        university = self.get_university_name()
+        downloader = PDFDownloader()
+        # One cache connection for every PDF in the crawl
+        cache = PDFPageCache()
+        programs = []
+        try:
+            for url in sorted(pdf_links)[:max_pdfs]:
+                path = await downloader.download(url)
+                if not path:
+                    continue
+                found = await asyncio.to_thread(PDFAgent(path, cache=cache).extract_programs)
+                for program in found:
+                    programs.append({
+                        "university": university,
+                        "program_name": program["program_name"],
+                        "category": program["category"],
+                        "admission_open": False,
+                        "deadlines": [],
+                        "source_text": program["program_name"],
+                        "source_url": url,
+                    })
+        finally:
+            await downloader.close()
+            cache.close()
+        return programs
 
     def get_university_name(self):
-        if self.name == "ziauddin_agent":
-            return "Ziauddin University"
-        elif self.name == "iqra_agent":
-            return "Iqra University"
-        elif self.name == "nust_agent":
-            return "NUST"
-        return "Unknown University"
\ No newline at end of file
+        return university_for(self.name)
\ No newline at end of file
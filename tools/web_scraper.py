@@ -4,12 +4,131 @@ import random
 import json
 from playwright.async_api import async_playwright, Browser, Page
 from playwright_stealth import stealth_async
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception
 from bs4 import BeautifulSoup
 import time
+from core.metrics import host_of, metrics
+from tools.fetch_outcome import (
+    CHALLENGE, CIRCUIT_OPEN, DNS, HTTP_STATUS, SOFT_404, FetchError, HostCircuitBreaker,
+    classify_exception, classify_page, classify_status,
+)
+
+# Runs inside Chromium and returns only the useful parts of the page: visible
+# text blocks in document order, tables as arrays of rows and anchors with
+# hrefs already resolved against the document base URL.
+DOM_EXTRACTION_SCRIPT = """
+() => {
+    const SKIP_TAGS = new Set([
+        "SCRIPT", "STYLE", "NOSCRIPT", "IFRAME", "TEMPLATE", "SVG", "CANVAS",
+        "HEADER", "FOOTER", "NAV", "ASIDE", "FORM", "BUTTON", "INPUT", "SELECT", "TEXTAREA"
+    ]);
+    const clean = (s) => (s || "").replace(/\\s+/g, " ").trim();
+    const styleCache = new Map();
+    const styleOf = (el) => {
+        let st = styleCache.get(el);
+        if (!st) {
+            st = getComputedStyle(el);
+            styleCache.set(el, st);
+        }
+        return st;
+    };
+    const isHidden = (el) => {
+        const st = styleOf(el);
+        return st.display === "none" || st.visibility === "hidden" || el.hidden;
+    };
+    const isBlock = (el) => {
+        const display = styleOf(el).display;
+        return !display.startsWith("inline") && display !== "contents";
+    };
+
+    const blocks = [];
+    const tables = [];
+    const byElement = new Map();
+
+    const walk = (el) => {
+        if (SKIP_TAGS.has(el.tagName) || isHidden(el)) return;
+        if (el.tagName === "TABLE") {
+            const rows = [];
+            for (const row of el.rows) {
+                const cells = Array.from(row.cells, (c) => clean(c.innerText));
+                if (cells.some((c) => c)) rows.push(cells);
+            }
+            if (rows.length) {
+                tables.push(rows);
+                for (const cells of rows) blocks.push(cells.filter((c) => c).join(" | "));
+            }
+            return;
+        }
+        for (const child of el.childNodes) {
+            if (child.nodeType === Node.TEXT_NODE) {
+                const text = clean(child.textContent);
+                if (!text) continue;
+                let owner = el;
+                while (owner !== document.body && !isBlock(owner)) owner = owner.parentElement;
+                let idx = byElement.get(owner);
+                if (idx === undefined || idx !== blocks.length - 1) {
+                    byElement.set(owner, blocks.length);
+                    blocks.push(text);
+                } else {
+                    blocks[idx] += " " + text;
+                }
+            } else if (child.nodeType === Node.ELEMENT_NODE) {
+                walk(child);
+            }
+        }
+    };
+    if (document.body) walk(document.body);
+
+    const links = [];
+    for (const a of document.querySelectorAll("a[href]")) {
+        if (!a.href.startsWith("http")) continue;
+        links.push({ text: clean(a.innerText), href: a.href });
+    }
+
+    return { title: document.title, blocks: blocks.filter((b) => b), tables, links };
+}
+"""
+
+# Cheap probe used instead of page.content() for challenge/block/soft-404
+# detection: the title, the start of the visible text and any challenge markers.
+DOM_PROBE_SCRIPT = """
+() => {
+    const marker = document.querySelector(
+        "#challenge-form, #cf-challenge-running, .cf-browser-verification"
+    ) ? "cf-challenge" : "";
+    const text = document.body ? document.body.innerText.slice(0, 5000) : "";
+    return { title: document.title, marker, text };
+}
+"""
+
+
+def _retry_url(retry_state) -> str:
+    return retry_state.kwargs.get("url") or (retry_state.args[1] if len(retry_state.args) > 1 else "")
+
+
+def _count_fetch_retry(retry_state):
+    metrics.incr("fetch_retries", host=host_of(_retry_url(retry_state)))
+
+
+def _is_retryable(error: BaseException) -> bool:
+    return isinstance(error, FetchError) and error.retryable
+
+
+def _circuit_open(retry_state) -> bool:
+    # Don't keep retrying a host that other failures have just cut off
+    scraper = retry_state.args[0]
+    return scraper.breaker.is_open(host_of(_retry_url(retry_state)))
+
 
 class WebScraper:
-    def __init__(self):
+    def __init__(self, extraction_mode: str = "html", navigation_timeout: float = 60.0,
+                 breaker: HostCircuitBreaker = None):
+        if extraction_mode not in ("html", "dom"):
+            raise ValueError(f"Unknown extraction mode: {extraction_mode}")
+        self.extraction_mode = extraction_mode
+        self.navigation_timeout = navigation_timeout
+        # Shared by every fetch, so one dead or blocking host is skipped after a few failures
+        self.breaker = breaker or HostCircuitBreaker()
         self.browser = None
         self.context = None
         self.user_agents = [
@@ -57,13 +176,62 @@ class WebScraper:
             timezone_id='Asia/Karachi',
         )
 
+    async def get_page_data(self, url: str, mode: str = None) -> dict:
+        """Scrape page with improved stealth and advanced HTML cleaning.
+
+        ``mode`` overrides the scraper's extraction mode: "html" returns the
+        cleaned HTML and its text, "dom" extracts text blocks, tables and
+        absolute links inside the browser and returns no HTML at all.
+        Returns None if the page can't be used; ``fetch_page`` raises a
+        FetchError saying why instead.
+        """
+        try:
+            return await self.fetch_page(url, mode)
+        except FetchError as e:
+            print(f"❌ Failed to load page: {e}")
+            return None
+
     @retry(
-        stop=stop_after_attempt(3),
+        stop=stop_after_attempt(3) | _circuit_open,
         wait=wait_exponential(multiplier=2, min=4, max=20),
-        retry=retry_if_exception_type((Exception,))
+        retry=retry_if_exception(_is_retryable),
+        before_sleep=_count_fetch_retry,
+        reraise=True,
     )
-    async def get_page_data(self, url: str) -> dict:
-        """Scrape page with improved stealth and advanced HTML cleaning"""
+    async def fetch_page(self, url: str, mode: str = None) -> dict:
+        """Fetch one page or raise a FetchError classifying the failure.
+
+        Only timeouts, connection errors and 429/5xx responses are retried.
+        Failures that point at the host (those, DNS errors, challenges that
+        don't clear, blocks) count towards its circuit breaker; while the
+        circuit is open the host's pages fail fast with CIRCUIT_OPEN.
+        """
+        mode = mode or self.extraction_mode
+        host = host_of(url)
+        trial = self.breaker.state(host) == "half_open"
+        if not self.breaker.allow(host):
+            metrics.incr("fetch_failures", host=host, outcome=CIRCUIT_OPEN)
+            raise FetchError(url, CIRCUIT_OPEN, f"{host} failed repeatedly")
+        try:
+            page_data = await self._load_page(url, mode)
+        except FetchError as e:
+            metrics.incr("fetch_failures", host=host, outcome=e.outcome)
+            if e.host_failure:
+                if self.breaker.record_failure(host, trip=e.outcome == DNS):
+                    print(f"⛔ Circuit opened for {host} after {e.outcome}; skipping it for {self.breaker.reset_timeout:.0f}s")
+                    metrics.incr("circuit_opened", host=host)
+            elif e.outcome in (SOFT_404, HTTP_STATUS):
+                # The host answered; only this page is bad
+                self.breaker.record_success(host)
+            raise
+        finally:
+            if trial:
+                # A trial that was cancelled or hit some other error must not hold the circuit open
+                self.breaker.end_trial(host)
+        self.breaker.record_success(host)
+        return page_data
+
+    async def _load_page(self, url: str, mode: str) -> dict:
         if not self.context:
             await self.setup()
         
@@ -74,98 +242,143 @@ class WebScraper:
             
             print(f"⏳ Loading page: {url}")
             start_time = time.time()
+            host = host_of(url)
             
-            await page.goto(
-                url, 
-                wait_until="networkidle",  # Wait for all content to load
-                timeout=180000
-            )
-            
-            await page.wait_for_timeout(5000)  # Extra wait for dynamic content
-            
-            content = await page.content()
-            if self._is_cloudflare_challenge(content):
+            with metrics.span("fetch", host=host):
+                response = await page.goto(
+                    url, 
+                    wait_until="networkidle",  # Wait for all content to load
+                    timeout=self.navigation_timeout * 1000
+                )
+                
+                await page.wait_for_timeout(5000)  # Extra wait for dynamic content
+
+            status = response.status if response else None
+            probe = await page.evaluate(DOM_PROBE_SCRIPT)
+            outcome = classify_page(probe["title"], probe["text"], probe["marker"])
+            if outcome == CHALLENGE:
                 print(f"🔄 Cloudflare challenge detected, waiting...")
-                await self._handle_cloudflare_challenge(page)
-                content = await page.content()
-            
-            if self._is_blocked(content):
-                print(f"❌ Page blocked or showing error for {url}")
-                return None
-            
-            # Clean the HTML with BeautifulSoup
-            soup = BeautifulSoup(content, "html.parser")
-            # Remove Elementor-specific and other noisy elements
-            for elem in soup(["script", "style", "noscript", "iframe", "link", "meta", "header", "footer", 
-                              "nav", "aside", "form", "button", "input", 
-                              "div.elementor-widget-container", "div.elementor-column-gap-default"]):
-                elem.decompose()
-            # Remove empty or irrelevant elements
-            for elem in soup.find_all():
-                text = elem.get_text(strip=True)
-                if not text or len(text) < 10 or "elementor" in elem.get("class", []):
-                    elem.decompose()
-            cleaned_html = str(soup)
-            
-            # Extract text content
-            text_content = soup.get_text(separator=" | ", strip=True)
-            
-            title = await page.title()
+                if not await self._handle_cloudflare_challenge(page):
+                    raise FetchError(url, CHALLENGE, "challenge did not clear")
+                # The challenge page's status no longer applies once it clears
+                status = None
+                probe = await page.evaluate(DOM_PROBE_SCRIPT)
+                outcome = classify_page(probe["title"], probe["text"], probe["marker"])
+            outcome = classify_status(status) or outcome
+            if outcome:
+                metrics.incr("pages_blocked", host=host, outcome=outcome)
+                raise FetchError(url, outcome, probe["title"], status=status)
+
+            if mode == "dom":
+                page_data = await self._extract_dom_page(page, url)
+            else:
+                page_data = await self._extract_html_page(page, url)
+
             load_time = time.time() - start_time
-            
-            print(f"✅ Successfully scraped: {url} (text length: {len(text_content)}, load time: {load_time:.2f}s)")
-            
-            return {
-                "url": url,
-                "title": title,
-                "text": text_content,
-                "html": cleaned_html,
-                "timestamp": time.time(),
-                "load_time": load_time
-            }
-            
+            page_data["load_time"] = load_time
+            metrics.incr("pages_fetched", host=host, mode=mode)
+
+            print(f"✅ Successfully scraped: {url} (text length: {len(page_data['text'])}, load time: {load_time:.2f}s)")
+
+            return page_data
+
+        except FetchError:
+            raise
         except Exception as e:
-            print(f"❌ Failed to load page {url}: {str(e)}")
-            return None
+            raise classify_exception(url, e) from e
         finally:
             await page.close()
 
+    async def _extract_html_page(self, page: Page, url: str) -> dict:
+        """Fetch the rendered HTML and clean it in Python."""
+        content = await page.content()
+        with metrics.span("clean_html", host=host_of(url)):
+            cleaned_html, text_content = self._clean_html(content)
+        title = await page.title()
+
+        return {
+            "url": url,
+            "title": title,
+            "text": text_content,
+            "html": cleaned_html,
+            "timestamp": time.time(),
+        }
+
+    async def _extract_dom_page(self, page: Page, url: str) -> dict:
+        """Extract text blocks, tables and links inside the browser."""
+        with metrics.span("dom_extract", host=host_of(url)):
+            result = await page.evaluate(DOM_EXTRACTION_SCRIPT)
+        return self._page_data_from_dom(url, result)
+
+    @staticmethod
+    def _page_data_from_dom(url: str, result: dict) -> dict:
+        """Build a page dict from the DOM extraction script's result."""
+        blocks = result.get("blocks") or []
+        return {
+            "url": url,
+            "title": result.get("title", ""),
+            "text": " | ".join(blocks),
+            "html": None,
+            "blocks": blocks,
+            "tables": result.get("tables") or [],
+            "links": result.get("links") or [],
+            "timestamp": time.time(),
+        }
+
+    @staticmethod
+    def _clean_html(content: str) -> tuple:
+        """Strip noisy elements and return the cleaned HTML and its text."""
+        soup = BeautifulSoup(content, "html.parser")
+        # Remove Elementor-specific and other noisy elements
+        for elem in soup(["script", "style", "noscript", "iframe", "link", "meta", "header", "footer",
+                          "nav", "aside", "form", "button", "input",
+                          "div.elementor-widget-container", "div.elementor-column-gap-default"]):
+            elem.decompose()
+        # Remove empty or irrelevant elements
+        for elem in soup.find_all():
+            text = elem.get_text(strip=True)
+            if not text or len(text) < 10 or "elementor" in elem.get("class", []):
+                elem.decompose()
+        cleaned_html = str(soup)
+
+        # Extract text content
+        text_content = soup.get_text(separator=" | ", strip=True)
+        return cleaned_html, text_content
+
     def _is_cloudflare_challenge(self, html: str) -> bool:
+        # Bare "cloudflare" or "Ray ID:" also match pages that merely load cdnjs or sit behind Cloudflare
         indicators = [
             "Verify you are human",
             "cf-challenge",
             "cf-browser-verification",
             "Just a moment",
-            "cloudflare",
-            "Ray ID:",
             "Enable JavaScript and cookies to continue"
         ]
         html_lower = html.lower()
         return any(indicator.lower() in html_lower for indicator in indicators)
 
-    def _is_blocked(self, html: str) -> bool:
-        error_indicators = [
-            "403 Forbidden",
-            "Access Denied",
-            "Blocked",
-            "Not Found",
-            "Page Not Found",
-            "Server Error"
-        ]
-        html_lower = html.lower()
-        return any(indicator.lower() in html_lower for indicator in error_indicators)
+    async def _handle_cloudflare_challenge(self, page: Page) -> bool:
+        """Wait for a challenge to clear; False if it is still showing."""
+        host = host_of(page.url)
+        metrics.incr("cloudflare_challenges", host=host)
+        with metrics.span("cloudflare_wait", host=host):
+            return await self._wait_for_cloudflare(page)
 
-    async def _handle_cloudflare_challenge(self, page: Page):
+    async def _wait_for_cloudflare(self, page: Page) -> bool:
         try:
             print("⏳ Waiting for Cloudflare challenge to complete...")
             
             for i in range(60):  # Extend timeout to 60 seconds
                 await page.wait_for_timeout(1000)
-                content = await page.content()
+                try:
+                    content = await page.content()
+                except Exception:
+                    # The challenge reloads the page; try again once it has navigated
+                    continue
                 
                 if not self._is_cloudflare_challenge(content):
                     print("✅ Cloudflare challenge completed")
-                    return
+                    return True
                 
                 try:
                     verify_button = await page.query_selector('input[type="checkbox"], input[type="button"][value*="Verify"]')
@@ -176,9 +389,11 @@ class WebScraper:
                     pass
             
             print("⚠️ Cloudflare challenge timeout")
+            metrics.incr("cloudflare_timeouts", host=host_of(page.url))
             
         except Exception as e:
             print(f"⚠️ Error handling Cloudflare challenge: {e}")
+        return False
 
     async def close(self):
         if self.context: